@@ -0,0 +1,148 @@
+import logging
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.services.profile_queries import (
+    BIG_FIVE_TRAITS,
+    answer_distribution,
+    find_users_by_answer,
+    find_users_by_traits,
+)
+from app.services.trait_resolver import trait_resolution_report
+
+# Configure logger to capture application logs
+logger = logging.getLogger(__name__)
+
+
+def parse_trait_range(trait: str, value: str):
+    """
+    Parse a "min:max" trait range where either bound may be omitted.
+
+    Args:
+        trait (str): The trait the range applies to (used in error messages).
+        value (str): e.g. "0.6:", ":0.3" or "0.2:0.8".
+
+    Returns:
+        tuple: (minimum or None, maximum or None).
+    """
+    minimum, separator, maximum = value.partition(":")
+    try:
+        if not separator:
+            raise ValueError
+        return (
+            float(minimum) if minimum else None,
+            float(maximum) if maximum else None,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "lang": "en",
+                "message": f"Invalid range for {trait}, expected min:max",
+                "data": {},
+            },
+        )
+
+
+def users_by_answer(db: Session, question_id: str, answer: str, limit, offset):
+    """
+    List users whose answer to a question contains the given value.
+
+    Args:
+        db (Session): The database session.
+        question_id (str): The question ID.
+        answer (str): The answer, or one option of a multi-select answer.
+        limit (int): Page size.
+        offset (int): Page offset.
+
+    Returns:
+        dict: Total match count and the page of user IDs.
+    """
+    try:
+        data = find_users_by_answer(db, question_id, answer, limit, offset)
+    except Exception as e:
+        logger.error(f"Answer query failed for question {question_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={"lang": "en", "message": "Technical issue", "data": {}},
+        )
+    return {"lang": "en", "message": "Users retrieved successfully", "data": data}
+
+
+def answers_distribution(db: Session, question_id: str):
+    """
+    Count users per answer to a question.
+
+    Returns:
+        dict: Answers with their user counts, most common first.
+    """
+    try:
+        rows = answer_distribution(db, question_id)
+    except Exception as e:
+        logger.error(f"Answer distribution failed for question {question_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={"lang": "en", "message": "Technical issue", "data": {}},
+        )
+    return {
+        "lang": "en",
+        "message": "Answer distribution retrieved successfully",
+        "data": [{"answer": answer, "count": count} for answer, count in rows],
+    }
+
+
+def users_by_traits(db: Session, ranges: dict, dominant, limit, offset):
+    """
+    List users whose Big Five scores fall within the given ranges.
+
+    Args:
+        db (Session): The database session.
+        ranges (dict): trait -> "min:max" strings; unset traits are ignored.
+        dominant (str): Optionally require this to be the highest trait.
+        limit (int): Page size.
+        offset (int): Page offset.
+
+    Returns:
+        dict: Total match count and the page of user IDs.
+    """
+    if dominant is not None and dominant not in BIG_FIVE_TRAITS:
+        raise HTTPException(
+            status_code=400,
+            detail={"lang": "en", "message": "Unknown trait", "data": {}},
+        )
+    parsed = {
+        trait: parse_trait_range(trait, value)
+        for trait, value in ranges.items()
+        if value
+    }
+
+    try:
+        data = find_users_by_traits(db, parsed, dominant, limit, offset)
+    except Exception as e:
+        logger.error(f"Trait query failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={"lang": "en", "message": "Technical issue", "data": {}},
+        )
+    return {"lang": "en", "message": "Users retrieved successfully", "data": data}
+
+
+def trait_resolution_stats(db: Session, days: int):
+    """
+    Report how tip traits were resolved per day and the trait-service calls saved.
+
+    Returns:
+        dict: Per-day counts by source, service calls made and calls avoided.
+    """
+    try:
+        report = trait_resolution_report(db, days)
+    except Exception as e:
+        logger.error(f"Trait resolution report failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={"lang": "en", "message": "Technical issue", "data": {}},
+        )
+    return {
+        "lang": "en",
+        "message": "Trait resolution statistics retrieved successfully",
+        "data": report,
+    }
@@ -1,11 +1,14 @@
 import logging
-import os
-import json
 from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from dotenv import load_dotenv
 from app.models.behavior import UserBehavior
 from app.schemas.behavior import SubmitBehaviorsRequest
+from app.services.big_five_generator import mark_big_five_stale
+from app.services.big_five_refresh import schedule_big_five_refresh
+from app.services.catalog import get_catalog
+from app.utils.http_cache import PrecomputedJSON
 
 # Configure logger to capture application logs
 logger = logging.getLogger(__name__)
@@ -14,69 +17,145 @@ logging.basicConfig(
 )
 
 
-def load_behaviors():
+def get_behaviors(catalog=None):
     """
-    Loads all eating behaviors from environment variables into a list.
-    Returns:
-        list: A list of behavior data dictionaries.
+    Returns all behavior types in a response format.
     """
-    behaviors = []
-    i = 1
-    while True:
-        behavior_data = os.getenv(f"BEHAVIOR_{i}")
-        if not behavior_data:
-            break
-        behaviors.append(json.loads(behavior_data))
-        i += 1
-    return behaviors
+    catalog = catalog or get_catalog()
+    return {
+        "lang": "en",
+        "message": "Behaviors retrieved successfully",
+        "data": list(catalog.behaviors),
+        "version": catalog.version,
+    }
 
 
-BEHAVIORS = load_behaviors()
+def get_behaviors_body(catalog=None):
+    """
+    Returns the behavior list response pre-serialized for the current catalog.
+    """
+    catalog = catalog or get_catalog()
+    return catalog.rendered(
+        "behavior-list", lambda: PrecomputedJSON(get_behaviors(catalog))
+    )
 
 
-def get_behaviors():
+def _behavior_changes(existing_rows, desired):
     """
-    Returns all behavior types in a response format.
+    Diff a user's stored behaviors against the submitted ones.
+
+    Args:
+        existing_rows (list): (id, behavior_id, behavior_title, first_priority,
+            high_priority) tuples currently stored for the user.
+        desired (dict): behavior_id -> new column values.
+
+    Returns:
+        tuple: (rows to insert, rows to update by id, ids to delete).
     """
-    return {
-        "lang": "en",
-        "message": "Behaviors retrieved successfully",
-        "data": BEHAVIORS,
-    }
+    to_insert, to_update, to_delete = [], [], []
+    existing_ids = set()
+    for row_id, behavior_id, title, first_priority, high_priority in existing_rows:
+        wanted = desired.get(behavior_id)
+        if wanted is None or behavior_id in existing_ids:
+            # Removed from the submission (or a duplicate left from before the
+            # unique constraint existed)
+            to_delete.append(row_id)
+            continue
+        existing_ids.add(behavior_id)
+        if (title, first_priority, high_priority) != (
+            wanted["behavior_title"],
+            wanted["first_priority"],
+            wanted["high_priority"],
+        ):
+            to_update.append({"id": row_id, **wanted})
+
+    for behavior_id, wanted in desired.items():
+        if behavior_id not in existing_ids:
+            to_insert.append({"behavior_id": behavior_id, **wanted})
+    return to_insert, to_update, to_delete
 
 
 def submit_behaviors(payload: SubmitBehaviorsRequest, db: Session, user):
+    """
+    Replace the user's behavior selection with the submitted list.
+
+    Only the difference is written: new behaviors are inserted, changed ones
+    updated and dropped ones deleted, each with one bulk statement, in a single
+    transaction. Rows that did not change are left untouched (including their
+    catalog_version).
+    """
     if not user:
         raise HTTPException(
             status_code=401, detail={"lang": "en", "message": "Unauthorized"}
         )
 
-    try:
-        # Clear existing behaviors for fresh submission (optional, or use upsert)
-        db.query(UserBehavior).filter(UserBehavior.user_id == user.id).delete()
-
-        for item in payload.behavior_list:
-            behavior_data = os.getenv(f"BEHAVIOR_{item.behavior_id}")
-            if not behavior_data:
-                raise HTTPException(
-                    status_code=404,
-                    detail={"lang": "en", "message": "Behavior not found"},
-                )
-
-            behavior_json = json.loads(behavior_data)
-            new_behavior = UserBehavior(
-                user_id=user.id,
-                behavior_id=item.behavior_id,
-                behavior_title=behavior_json["behavior_title"],
-                first_priority=item.first_priority,
-                high_priority=item.high_priority,
+    catalog = get_catalog()
+
+    # Validate everything before touching the database; later items win
+    desired = {}
+    for item in payload.behavior_list:
+        behavior_json = catalog.get_behavior(item.behavior_id)
+        if not behavior_json:
+            raise HTTPException(
+                status_code=404,
+                detail={"lang": "en", "message": "Behavior not found"},
             )
-            db.add(new_behavior)
+        desired[str(item.behavior_id)] = {
+            "behavior_title": behavior_json["behavior_title"],
+            "first_priority": item.first_priority,
+            "high_priority": item.high_priority,
+            "catalog_version": catalog.version,
+        }
+
+    def apply_changes():
+        existing_rows = db.execute(
+            select(
+                UserBehavior.id,
+                UserBehavior.behavior_id,
+                UserBehavior.behavior_title,
+                UserBehavior.first_priority,
+                UserBehavior.high_priority,
+            )
+            .where(UserBehavior.user_id == user.id)
+            .order_by(UserBehavior.id)
+        ).all()
+        to_insert, to_update, to_delete = _behavior_changes(existing_rows, desired)
+
+        if to_delete:
+            db.execute(delete(UserBehavior).where(UserBehavior.id.in_(to_delete)))
+        if to_update:
+            # Bulk UPDATE by primary key, one executemany round trip
+            db.execute(update(UserBehavior), to_update)
+        if to_insert:
+            db.execute(
+                insert(UserBehavior),
+                [{"user_id": user.id, **row} for row in to_insert],
+            )
+        if to_insert or to_update or to_delete:
+            mark_big_five_stale(db, user.id)
+        return {
+            "added": len(to_insert),
+            "updated": len(to_update),
+            "removed": len(to_delete),
+        }
 
-        db.commit()
-        return {"message": "Behaviors submitted successfully"}
+    try:
+        try:
+            changes = apply_changes()
+            db.commit()
+        except IntegrityError:
+            # A concurrent submission inserted one of the same behaviors first;
+            # diffing again turns that insert into an update.
+            db.rollback()
+            changes = apply_changes()
+            db.commit()
+
+        if any(changes.values()):
+            schedule_big_five_refresh(user.id)
+        return {"message": "Behaviors submitted successfully", "data": changes}
 
     except Exception as e:
+        db.rollback()
         logger.error(f"Behavior submission failed: {e}")
         raise HTTPException(
             status_code=500, detail={"lang": "en", "message": "Technical issue"}
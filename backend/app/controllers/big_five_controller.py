@@ -1,7 +1,10 @@
 import logging
 from fastapi import HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.big_five_traits import BigFiveTraits
+from app.services.big_five_generator import BIG_FIVE_REFRESH_RESULTS
+from app.services.model_output import parse_stats
 
 # Logger setup
 logger = logging.getLogger(__name__)
@@ -33,7 +36,7 @@ def get_user_big_five_traits(db: Session, user):
             db.query(BigFiveTraits).filter(BigFiveTraits.user_id == user.id).first()
         )
 
-        if not traits_data:
+        if not traits_data or traits_data.big_five_data is None:
             raise HTTPException(
                 status_code=404, detail="Big Five traits data not found for this user"
             )
@@ -54,3 +57,38 @@ def get_user_big_five_traits(db: Session, user):
             status_code=500,
             detail="Technical error while retrieving Big Five traits data",
         )
+
+
+def get_big_five_generation_stats(db: Session):
+    """
+    Report Big Five generation health for operators.
+
+    Returns:
+        Dictionary with stored rows per status, this process's model output
+        parse outcomes and failure rate, and how many refreshed users were
+        recomputed versus skipped because their inputs had not changed.
+    """
+    try:
+        rows = (
+            db.query(BigFiveTraits.status, func.count())
+            .group_by(BigFiveTraits.status)
+            .all()
+        )
+    except Exception as e:
+        logger.error(f"Failed to count Big Five rows by status: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Technical error while retrieving Big Five statistics",
+        )
+
+    return {
+        "message": "Big Five generation statistics retrieved successfully",
+        "data": {
+            "rows_by_status": {status: count for status, count in rows},
+            "parse": parse_stats(),
+            "refresh": {
+                result: count
+                for (result,), count in BIG_FIVE_REFRESH_RESULTS.snapshot().items()
+            },
+        },
+    }
@@ -1,25 +1,163 @@
-import uuid
-from pathlib import Path
+import asyncio
 import base64
-from sqlalchemy.orm import Session
+import logging
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, selectinload
 from datetime import datetime
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
 from app.models import User, FoodUpdate, FoodImage
 from app.schemas.food_update import FoodUpdatePayload
+from app.services.image_processing import content_type_for_key, process_upload
+from app.storage import aio as media_io
+from app.storage import media_url, INLINE_IMAGE_BASE64
+from app.storage.blobs import (
+    blob_digest,
+    blob_key,
+    discard_unreferenced_blobs,
+    reference_blobs,
+)
 from app.utils.get_current_time import get_current_time
 
-# Directories for image uploads
-UPLOAD_DIR = Path("Images/Food Images")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+logger = logging.getLogger(__name__)
 
 
-def post_food_update_controller(
+async def load_food_images_base64(images) -> dict:
+    """
+    Fetch and base64-encode many food images without blocking the event loop.
+
+    Reads run on the media I/O pool with bounded concurrency. Images saved before
+    the blob store existed keep their flat file path in `image_path` until
+    `scripts/rehome_food_images.py` moves them, and are read by path.
+
+    Args:
+        images (list[FoodImage]): The food image rows to load.
+
+    Returns:
+        dict: Mapping of image id to its base64 string, or None if unreadable.
+              Empty when INLINE_IMAGE_BASE64 is disabled.
+    """
+    if not INLINE_IMAGE_BASE64:
+        return {}
+
+    stored = await media_io.read_many(
+        [image.image_path for image in images if image.blob_hash]
+    )
+
+    raw = {}
+    for image in images:
+        if image.blob_hash:
+            raw[image.id] = stored.get(image.image_path)
+        else:
+            try:
+                raw[image.id] = await media_io.read_path(image.image_path)
+            except Exception:
+                raw[image.id] = None  # Handle potential missing files gracefully
+
+    def encode_all():
+        return {
+            image_id: base64.b64encode(data).decode("utf-8") if data else None
+            for image_id, data in raw.items()
+        }
+
+    # Encoding several megabytes is CPU work; keep it off the event loop
+    return await run_in_threadpool(encode_all)
+
+
+def food_image_data_uri(image: FoodImage, base64_encoded):
+    """Wrap a base64-encoded image in a data URI carrying its stored MIME type."""
+    if not base64_encoded:
+        return None
+    return f"data:{content_type_for_key(image.image_path)};base64,{base64_encoded}"
+
+
+def food_image_url(image: FoodImage):
+    """Return a time-limited GET URL for a blob-stored image, if available."""
+    return media_url(image.image_path) if image.blob_hash else None
+
+
+async def _prepare_image(image_upload) -> dict:
+    """
+    Decode and normalise one uploaded image, then stage it unless already stored.
+
+    Args:
+        image_upload (FoodImageUpload): The uploaded base64 image.
+
+    Returns:
+        dict: digest, storage key, size, content type and the staged handle
+              (None if an identical blob is already stored, in which case the
+              bytes are kept as "data" in case that blob is deleted meanwhile).
+    """
+    uploaded = await run_in_threadpool(base64.b64decode, image_upload.base64_file)
+
+    # Strip metadata, fix orientation, cap dimensions and re-encode
+    image_data, content_type, extension = await process_upload(uploaded)
+
+    digest = await run_in_threadpool(blob_digest, image_data)
+    key = blob_key(digest, extension)
+    staged = None
+    if not await media_io.exists(key):
+        staged = await media_io.stage(image_data)
+    return {
+        "digest": digest,
+        "key": key,
+        "size": len(image_data),
+        "content_type": content_type,
+        "staged": staged,
+        "data": image_data if staged is None else None,
+    }
+
+
+def _blob_entries(items):
+    return [
+        (item["digest"], item["key"], item["size"], item["content_type"])
+        for item in items
+    ]
+
+
+async def _discard_images(db: Session, prepared, promoted):
+    """
+    Undo the storage side effects of a failed post.
+
+    Staged files are dropped. Promoted files are removed only if no committed
+    `ImageBlob` row references them, checked under the blob row locks, since a
+    concurrent upload of the same photo may be committing it meanwhile.
+    """
+    await asyncio.gather(
+        *(
+            media_io.discard_staged(item["staged"])
+            for item in prepared
+            if item["staged"] is not None and item not in promoted
+        ),
+        return_exceptions=True,
+    )
+    if not promoted:
+        return
+
+    def discard_promoted():
+        try:
+            discard_unreferenced_blobs(db, _blob_entries(promoted))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to clean up images of a failed post: {e}")
+
+    await run_in_threadpool(discard_promoted)
+
+
+async def post_food_update_controller(
     current_user: User, food_update: FoodUpdatePayload, db: Session
 ):
     """
     Handle posting a food update with an optional set of images.
 
+    The post is created in a single transaction: all images are decoded and
+    written to staging files in parallel, the FoodUpdate, FoodImage and blob
+    reference rows are inserted in bulk, staged files are renamed into place,
+    and only then is the transaction committed. Any failure rolls back the rows
+    and removes the files, so no orphaned post or image is left behind.
+
     Args:
         current_user (User): The authenticated user.
         food_update (FoodUpdatePayload): The food update payload.
@@ -28,51 +166,85 @@ def post_food_update_controller(
     Returns:
         dict: Success message with description and images uploaded.
     """
-    # Create a new FoodUpdate record
-    food_update_record = FoodUpdate(
-        user_id=current_user.id,
-        description=food_update.description,
-        created_at=get_current_time(),
+    user_id = current_user.id
+    uploads = food_update.images or []
+
+    # Decode, hash and stage every image concurrently
+    results = await asyncio.gather(
+        *(_prepare_image(upload) for upload in uploads), return_exceptions=True
     )
-    db.add(food_update_record)
-    db.commit()
+    prepared = [result for result in results if isinstance(result, dict)]
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        await _discard_images(db, prepared, [])
+        raise HTTPException(
+            status_code=400, detail=f"Failed to process image: {str(errors[0])}"
+        )
 
-    # Handle the images if any
-    if food_update.images:
-        for image in food_update.images:
-            try:
-                image_data = base64.b64decode(image.base64_file)
-                unique_id = uuid.uuid4().hex
-                file_name = f"{food_update_record.id}_{unique_id}.jpg"
-                file_location = UPLOAD_DIR / file_name
-
-                # Save the image to disk
-                with open(file_location, "wb") as file:
-                    file.write(image_data)
-
-                # Add image entry to FoodImage table
-                food_image = FoodImage(
-                    food_update_id=food_update_record.id, image_path=str(file_location)
+    def insert_rows():
+        # Create a new FoodUpdate record
+        record = FoodUpdate(
+            user_id=user_id,
+            description=food_update.description,
+            created_at=get_current_time(),
+        )
+        db.add(record)
+        db.flush()
+
+        if prepared:
+            # Blob rows first: food_images.blob_hash references them
+            reference_blobs(db, _blob_entries(prepared))
+            db.execute(
+                insert(FoodImage),
+                [
+                    {
+                        "food_update_id": record.id,
+                        "image_path": item["key"],
+                        "blob_hash": item["digest"],
+                    }
+                    for item in prepared
+                ],
+            )
+        return record.id
+
+    promoted = []
+    try:
+        # Blob rows stay locked until commit, so no cleanup can delete their
+        # bytes between the checks below and the commit
+        await run_in_threadpool(insert_rows)
+
+        # Make the files visible before the rows that point at them commit
+        for item in prepared:
+            if item["staged"] is not None:
+                await media_io.commit_staged(
+                    item["staged"], item["key"], item["content_type"]
                 )
-                db.add(food_image)
+                promoted.append(item)
+            elif not await media_io.exists(item["key"]):
+                # Deleted by a failed post's cleanup since it was checked
+                await media_io.write(item["key"], item["data"], item["content_type"])
+                promoted.append(item)
 
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400, detail=f"Failed to process image: {str(e)}"
-                )
-        db.commit()
+        await run_in_threadpool(db.commit)
+
+    except Exception as e:
+        logger.error(f"Food update creation failed for user {user_id}: {e}")
+        await run_in_threadpool(db.rollback)
+        await _discard_images(db, prepared, promoted)
+        raise HTTPException(status_code=500, detail="Failed to save food update")
 
     return {
         "lang": "en",
         "message": "Food update posted successfully",
         "data": {
             "description": food_update.description,
-            "images": [str(image.image_path) for image in food_update_record.images],
+            "images": [item["key"] for item in prepared],
+            "image_urls": [media_url(item["key"]) for item in prepared],
         },
     }
 
 
-def get_user_food_updates_controller(current_user: User, db: Session):
+async def get_user_food_updates_controller(current_user: User, db: Session):
     """
     Fetch all food updates associated with the authenticated user.
 
@@ -83,33 +255,36 @@ def get_user_food_updates_controller(current_user: User, db: Session):
     Returns:
         dict: Success message with a list of food updates and their associated images.
     """
-    # Fetch food updates for the user
-    food_updates = (
-        db.query(FoodUpdate)
-        .filter(FoodUpdate.user_id == current_user.id)
-        .order_by(FoodUpdate.created_at.desc())
-        .all()
-    )
+
+    def fetch_food_updates():
+        return (
+            db.query(FoodUpdate)
+            .options(selectinload(FoodUpdate.images))
+            .filter(FoodUpdate.user_id == current_user.id)
+            .order_by(FoodUpdate.created_at.desc())
+            .all()
+        )
+
+    # Fetch food updates for the user, with their images, off the event loop
+    food_updates = await run_in_threadpool(fetch_food_updates)
 
     if not food_updates:
         raise HTTPException(status_code=200, detail="No food updates found")
 
+    # Load every image of every post in one concurrent batch
+    all_images = [image for food_update in food_updates for image in food_update.images]
+    encoded_images = await load_food_images_base64(all_images)
+
     # Format the response with description and associated images
     food_updates_response = []
     for food_update in food_updates:
-        images = []
-        for image in food_update.images:
-            try:
-                with open(image.image_path, "rb") as img_file:
-                    base64_encoded = base64.b64encode(img_file.read()).decode("utf-8")
-                    images.append(base64_encoded)
-            except Exception as e:
-                images.append(None)  # Handle potential missing files gracefully
-
         food_updates_response.append(
             {
                 "description": food_update.description,
-                "images": images,
+                "images": [
+                    encoded_images.get(image.id) for image in food_update.images
+                ],
+                "image_urls": [food_image_url(image) for image in food_update.images],
                 "created_at": food_update.created_at.isoformat(),
             }
         )
@@ -121,7 +296,7 @@ def get_user_food_updates_controller(current_user: User, db: Session):
     }
 
 
-def get_user_uploaded_images_controller(current_user: User, db: Session):
+async def get_user_uploaded_images_controller(current_user: User, db: Session):
     """
     Fetch all uploaded food images for the logged-in user in a frontend-friendly format.
 
@@ -130,47 +305,41 @@ def get_user_uploaded_images_controller(current_user: User, db: Session):
         db (Session): The database session.
 
     Returns:
-        dict: Success message with a list of image objects (id, path, base64, uploaded_at, food_update_id).
+        dict: Success message with a list of image objects (id, path, base64, url, uploaded_at, food_update_id).
     """
-    food_images = (
-        db.query(FoodImage)
-        .join(FoodUpdate, FoodUpdate.id == FoodImage.food_update_id)
-        .filter(FoodUpdate.user_id == current_user.id)
-        .order_by(FoodImage.id.desc())
-        .all()
-    )
+
+    def fetch_food_images():
+        return (
+            db.query(FoodImage)
+            .join(FoodUpdate, FoodUpdate.id == FoodImage.food_update_id)
+            .options(joinedload(FoodImage.food_update))
+            .filter(FoodUpdate.user_id == current_user.id)
+            .order_by(FoodImage.id.desc())
+            .all()
+        )
+
+    food_images = await run_in_threadpool(fetch_food_images)
 
     if not food_images:
         raise HTTPException(status_code=200, detail="No uploaded images found")
 
+    encoded_images = await load_food_images_base64(food_images)
+
     images_data = []
     for image in food_images:
-        try:
-            with open(image.image_path, "rb") as img_file:
-                base64_encoded = base64.b64encode(img_file.read()).decode("utf-8")
-                image_object = {
-                    "id": image.id,
-                    "image_path": image.image_path,
-                    "base64_image": f"data:image/jpeg;base64,{base64_encoded}",
-                    "uploaded_at": image.food_update.created_at.isoformat()
-                    if image.food_update
-                    else None,
-                    "food_update_id": image.food_update_id,
-                }
-                images_data.append(image_object)
-        except Exception:
-            # Handle missing image file
-            images_data.append(
-                {
-                    "id": image.id,
-                    "image_path": image.image_path,
-                    "base64_image": None,
-                    "uploaded_at": image.food_update.created_at.isoformat()
-                    if image.food_update
-                    else None,
-                    "food_update_id": image.food_update_id,
-                }
-            )
+        base64_encoded = encoded_images.get(image.id)
+        images_data.append(
+            {
+                "id": image.id,
+                "image_path": image.image_path,
+                "base64_image": food_image_data_uri(image, base64_encoded),
+                "image_url": food_image_url(image),
+                "uploaded_at": image.food_update.created_at.isoformat()
+                if image.food_update
+                else None,
+                "food_update_id": image.food_update_id,
+            }
+        )
 
     return {
         "lang": "en",
@@ -179,7 +348,7 @@ def get_user_uploaded_images_controller(current_user: User, db: Session):
     }
 
 
-def get_food_update_images_by_id_controller(food_update_id: int, db: Session):
+async def get_food_update_images_by_id_controller(food_update_id: int, db: Session):
     """
     Fetch all uploaded food images for a specific food update post by its ID, including the food update description.
 
@@ -188,37 +357,38 @@ def get_food_update_images_by_id_controller(food_update_id: int, db: Session):
         db (Session): The database session.
 
     Returns:
-        dict: Success message with the food update description and a list of image objects (id, path, base64, uploaded_at).
+        dict: Success message with the food update description and a list of image objects (id, path, base64, url, uploaded_at).
     """
+
+    def fetch_food_update():
+        return (
+            db.query(FoodUpdate)
+            .options(selectinload(FoodUpdate.images))
+            .filter(FoodUpdate.id == food_update_id)
+            .first()
+        )
+
     # Fetch the food update record
-    food_update = db.query(FoodUpdate).filter(FoodUpdate.id == food_update_id).first()
+    food_update = await run_in_threadpool(fetch_food_update)
 
     if not food_update:
         raise HTTPException(status_code=404, detail="Food update not found")
 
     # Fetch associated images
+    encoded_images = await load_food_images_base64(food_update.images)
+
     images_data = []
     for image in food_update.images:
-        try:
-            with open(image.image_path, "rb") as img_file:
-                base64_encoded = base64.b64encode(img_file.read()).decode("utf-8")
-                image_object = {
-                    "id": image.id,
-                    "image_path": image.image_path,
-                    "base64_image": f"data:image/jpeg;base64,{base64_encoded}",
-                    "uploaded_at": food_update.created_at.isoformat(),
-                }
-                images_data.append(image_object)
-        except Exception:
-            # Handle missing image file
-            images_data.append(
-                {
-                    "id": image.id,
-                    "image_path": image.image_path,
-                    "base64_image": None,
-                    "uploaded_at": food_update.created_at.isoformat(),
-                }
-            )
+        base64_encoded = encoded_images.get(image.id)
+        images_data.append(
+            {
+                "id": image.id,
+                "image_path": image.image_path,
+                "base64_image": food_image_data_uri(image, base64_encoded),
+                "image_url": food_image_url(image),
+                "uploaded_at": food_update.created_at.isoformat(),
+            }
+        )
 
     return {
         "lang": "en",
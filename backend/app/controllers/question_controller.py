@@ -1,11 +1,14 @@
 import logging
-import os
-import json
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from app.models.question import QuestionAnswer
 from app.schemas.question import SubmitAnswersRequest
+from app.services.big_five_generator import mark_big_five_stale
+from app.services.big_five_refresh import schedule_big_five_refresh
+from app.services.catalog import get_catalog
+from app.services.question_catalog import AnswerValidationError
+from app.utils.http_cache import PrecomputedJSON
 
 # Configure logger to capture application logs
 logger = logging.getLogger(__name__)
@@ -17,45 +20,39 @@ logging.basicConfig(
 load_dotenv()
 
 
-def load_questions():
+def get_questions(catalog=None):
     """
-    Loads all questions from environment variables into a list.
+    Retrieves a dictionary of questions with a success message.
 
-    The questions are expected to be stored in environment variables
-    with the key format QUESTION_<i>, where <i> is an integer.
+    Args:
+        catalog (CatalogSnapshot, optional): Catalog to list, default the current one.
 
     Returns:
-        list: A list of question data parsed from the environment variables.
+        dict: A dictionary containing language, message, and the list of questions.
     """
-    questions = []
-    i = 1
-    while True:
-        question_data = os.getenv(f"QUESTION_{i}")
-        if not question_data:
-            break
-        questions.append(
-            json.loads(question_data)
-        )  # Parse each question from JSON format
-        i += 1
-    return questions
-
-
-# Load all available questions from the environment
-QUESTIONS = load_questions()
+    catalog = catalog or get_catalog()
+    return {
+        "lang": "en",
+        "message": "Questions retrieved successfully",
+        "data": list(catalog.questions),
+        "version": catalog.version,
+    }
 
 
-def get_questions():
+def get_questions_body(catalog=None):
     """
-    Retrieves a dictionary of questions with a success message.
+    Returns the question list response pre-serialized for the current catalog.
+
+    Args:
+        catalog (CatalogSnapshot, optional): Catalog to render, default the current one.
 
     Returns:
-        dict: A dictionary containing language, message, and the list of questions.
+        PrecomputedJSON: The `get_questions` payload as JSON and compressed bytes.
     """
-    return {
-        "lang": "en",
-        "message": "Questions retrieved successfully",
-        "data": QUESTIONS,
-    }
+    catalog = catalog or get_catalog()
+    return catalog.rendered(
+        "question-list", lambda: PrecomputedJSON(get_questions(catalog))
+    )
 
 
 def submit_answers(payload: SubmitAnswersRequest, db: Session, user):
@@ -79,6 +76,9 @@ def submit_answers(payload: SubmitAnswersRequest, db: Session, user):
             detail={"lang": "en", "message": "Unauthorized", "data": {}},
         )
 
+    # Validate the whole submission against one catalog version
+    catalog = get_catalog()
+
     try:
         user_question = (
             db.query(QuestionAnswer).filter(QuestionAnswer.user_id == user.id).first()
@@ -91,130 +91,37 @@ def submit_answers(payload: SubmitAnswersRequest, db: Session, user):
 
         answer_data = {}
         for item in payload.answer_list:
-            question_data = os.getenv(f"QUESTION_{item.question_id}")
-            if not question_data:
-                logger.error(
-                    f"Question with ID {item.question_id} not found in environment variables"
-                )
-                raise HTTPException(
-                    status_code=404,
-                    detail={"lang": "en", "message": "Question not found", "data": {}},
+            try:
+                question_text, answer_value = catalog.question_catalog.validate(
+                    item.question_id, item.answer
                 )
-
-            question_json = json.loads(question_data)
-            question_type = question_json.get("question_type")
-
-            # Handle different question types
-            if question_type == "TEXT":
-                answer_value = item.answer  # Free text response
-            elif question_type in ["RADIO", "DROPDOWN"]:
-                if item.answer not in question_json["options"]:
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "lang": "en",
-                            "message": "Invalid selection",
-                            "data": {},
-                        },
-                    )
-                answer_value = item.answer
-            elif question_type == "MULTI_SELECT_DROPDOWN":
-                selected_options = set(item.answer)  # Expecting list input
-                valid_options = set(question_json["options"])
-                if not selected_options.issubset(valid_options):
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "lang": "en",
-                            "message": "Invalid selection",
-                            "data": {},
-                        },
-                    )
-                answer_value = item.answer
-            elif question_type == "NUMBER":
-                min_val, max_val = question_json["range"]
-                if not (min_val <= int(item.answer) <= max_val):
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "lang": "en",
-                            "message": "Value out of range",
-                            "data": {},
-                        },
-                    )
-                answer_value = item.answer
-            elif question_type == "SLIDER":
-                min_val, max_val = question_json["range"]
-                if not (min_val <= int(item.answer) <= max_val):
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "lang": "en",
-                            "message": "Value out of range",
-                            "data": {},
-                        },
-                    )
-                answer_value = item.answer
-            elif question_type == "DROPDOWN_TEXT":
-                selected_option, text_value = (
-                    item.answer.values()
-                )  # Expecting tuple (selected option, text)
-                if selected_option not in question_json["options"]:
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "lang": "en",
-                            "message": "Invalid selection",
-                            "data": {},
-                        },
-                    )
-                answer_value = {"selected_option": selected_option, "text": text_value}
-            elif question_type == "DROPDOWN_CHECKBOX":
-                selected_option, checkboxes = (
-                    item.answer.values()
-                )  # Expecting tuple (selected option, list of checked values)
-                if selected_option not in question_json["options"]:
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "lang": "en",
-                            "message": "Invalid selection",
-                            "data": {},
-                        },
-                    )
-                if not set(checkboxes).issubset(set(question_json["checkbox_options"])):
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "lang": "en",
-                            "message": "Invalid checkbox selection",
-                            "data": {},
-                        },
-                    )
-                answer_value = {
-                    "selected_option": selected_option,
-                    "checkboxes": checkboxes,
-                }
-            else:
+            except AnswerValidationError as e:
+                if e.status_code == 404:
+                    logger.error(f"Question with ID {item.question_id} not found")
                 raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "lang": "en",
-                        "message": "Invalid question type",
-                        "data": {},
-                    },
+                    status_code=e.status_code,
+                    detail={"lang": "en", "message": e.message, "data": {}},
                 )
 
             answer_data[str(item.question_id)] = {
-                "question": question_json["question_text"],
+                "question": question_text,
                 "answer": answer_value,
             }
 
+        # Only a real change in answers invalidates the user's traits
+        answers_changed = user_question.question_data != answer_data
         user_question.question_data = answer_data
+        user_question.catalog_version = catalog.version
+        if answers_changed:
+            mark_big_five_stale(db, user.id)
         db.commit()
+        if answers_changed:
+            schedule_big_five_refresh(user.id)
 
         return {"message": "Answers submitted successfully", "data": answer_data}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting answers for user {user.id}: {str(e)}")
         raise HTTPException(
@@ -13,9 +13,36 @@ from app.schemas.user import UserCreate, UserUpdate, UploadProfilePicture
 from app.utils.auth import hash_password, verify_password
 from app.utils.email import send_email
 from app.utils.get_current_time import get_current_time
+from app.storage import aio as media_io
+from app.storage import media_url
+from starlette.concurrency import run_in_threadpool
 
-UPLOAD_DIR = Path("Images/Profile Image")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Storage key prefix for profile pictures
+PROFILE_PICTURE_PREFIX = "profiles"
+
+# Profile pictures saved before the storage backend existed still hold a
+# working-directory path under this folder instead of a storage key.
+LEGACY_PROFILE_DIR = Path("Images/Profile Image")
+
+
+def is_legacy_profile_picture(profile_picture: str) -> bool:
+    """Return True if `profile_picture` is a pre-storage working-directory path."""
+    return Path(profile_picture).parent == LEGACY_PROFILE_DIR
+
+
+async def read_profile_picture(profile_picture: str) -> bytes:
+    """
+    Read a profile picture by its stored reference (storage key or legacy path).
+
+    Args:
+        profile_picture (str): Value of `User.profile_picture`.
+
+    Returns:
+        bytes: The raw image contents. Raises FileNotFoundError if missing.
+    """
+    if is_legacy_profile_picture(profile_picture):
+        return await media_io.read_path(profile_picture)
+    return await media_io.read(profile_picture)
 
 
 def register_user_controller(user: UserCreate, db: Session):
@@ -240,7 +267,7 @@ def profile_details_controller(current_user: User):
     }
 
 
-def upload_profile_picture_controller(
+async def upload_profile_picture_controller(
     current_user: User, profile_picture: UploadProfilePicture, db: Session
 ):
     """
@@ -262,28 +289,34 @@ def upload_profile_picture_controller(
 
     # Define file extension based on the image type
     file_extension = "jpg"  # Default to 'jpg' or handle it dynamically if required
-    file_name = f"{current_user.id}_profile.{file_extension}"
-    file_location = UPLOAD_DIR / file_name
+    storage_key = f"{PROFILE_PICTURE_PREFIX}/{current_user.id}_profile.{file_extension}"
 
-    # Save the decoded image to a file
-    with open(file_location, "wb") as file:
-        file.write(image_data)
+    # Save the decoded image to the configured media storage
+    await media_io.write(storage_key, image_data)
 
     # Encode the image as Base64 for response
     encoded_string = base64.b64encode(image_data).decode("utf-8")
 
-    # Update user record with the new profile picture path
-    current_user.profile_picture = str(file_location)
-    db.commit()
+    def save_profile_picture():
+        # Update user record with the new profile picture storage key
+        current_user.profile_picture = storage_key
+        db.commit()
+        return current_user.email
+
+    email = await run_in_threadpool(save_profile_picture)
 
     return {
         "lang": "en",
         "message": "Profile picture uploaded successfully",
-        "data": {"email": current_user.email, "profile_picture": f"{encoded_string}"},
+        "data": {
+            "email": email,
+            "profile_picture": f"{encoded_string}",
+            "profile_picture_url": media_url(storage_key),
+        },
     }
 
 
-def get_profile_picture_controller(current_user: User, db: Session):
+async def get_profile_picture_controller(current_user: User, db: Session):
     """
     Fetch and return the profile picture as a Base64 string.
 
@@ -297,20 +330,25 @@ def get_profile_picture_controller(current_user: User, db: Session):
     if not current_user.profile_picture:
         raise HTTPException(status_code=404, detail="Profile picture not found")
 
-    file_path = Path(current_user.profile_picture)
-
-    if not file_path.exists():
+    try:
+        # Read image and encode as Base64
+        image_data = await read_profile_picture(current_user.profile_picture)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Profile picture not found")
 
     try:
-        # Read image and encode as Base64
-        with open(file_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
+        encoded_string = base64.b64encode(image_data).decode("utf-8")
 
+        is_legacy = is_legacy_profile_picture(current_user.profile_picture)
         return {
             "lang": "en",
             "message": "Profile picture fetched successfully",
-            "data": {"profile_picture": f"{encoded_string}"},
+            "data": {
+                "profile_picture": f"{encoded_string}",
+                "profile_picture_url": None
+                if is_legacy
+                else media_url(current_user.profile_picture),
+            },
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error encoding image: {str(e)}")
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from app.models import BigFiveTraits
 from app.models.goal import UserGoal
 from app.schemas.goal import CreateUserGoalRequest
-from app.services.big_five_generator import generate_user_big_five_traits
+from app.services.big_five_generator import request_big_five_generation
 from app.services.tips_generator import generate_user_tips
 from app.utils.get_current_time import get_current_time
 
@@ -82,8 +82,8 @@ def get_user_goal_today(background_tasks: BackgroundTasks, db: Session, user):
         big_five_data = (
             db.query(BigFiveTraits).filter(BigFiveTraits.user_id == user.id).first()
         )
-        if not big_five_data:
-            background_tasks.add_task(generate_user_big_five_traits, user, db)
+        # Generates only if missing or a failed attempt is due for retry
+        request_big_five_generation(background_tasks, user.id, big_five_data)
 
         today = date.today()
         goal = (
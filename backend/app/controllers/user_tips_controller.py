@@ -1,17 +1,39 @@
 import os
+import asyncio
 import logging
+import time
 from datetime import datetime, date
 from fastapi import HTTPException, BackgroundTasks
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.database import SessionLocal
 from app.models.tips import UserTips
 from app.models.goal import UserGoal
-from app.services.tips_generator import generate_user_tips
+from app.pubsub import get_broker
+from app.services.tips_generator import (
+    generate_user_tips,
+    tip_generation_in_progress,
+    tips_topic,
+)
 from app.utils.get_current_time import get_current_time
+from app.utils.metrics import Counter
+from app.utils.sse import sse_comment, sse_event
 
 load_dotenv()
 
+# How long a tip stream waits for a generation, and how often it sends a
+# keep-alive comment meanwhile (seconds)
+TIPS_STREAM_TIMEOUT = float(os.getenv("TIPS_STREAM_TIMEOUT", 120))
+TIPS_STREAM_KEEPALIVE = float(os.getenv("TIPS_STREAM_KEEPALIVE", 15))
+
+TIP_STREAMS = Counter(
+    "tip_streams_total",
+    "Tip streams by how they ended",
+    labelnames=("outcome",),
+)
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -102,9 +124,16 @@ def get_user_tips_today(background_tasks: BackgroundTasks, db: Session, user):
                 "data": None,
             }
 
+        # A goal change is already generating the tip; don't start a second one
+        if tip_generation_in_progress(user.id):
+            return {
+                "message": "Your tip is being generated.",
+                "data": None,
+            }
+
         # Goal exists but tip missing → generate tip NOW
         logger.info(f"Goal set for user {user.id}, but no tip exists. Generating new tip now.")
-        generate_user_tips(user.id, db)
+        generate_user_tips(user.id, db, rerun_if_running=False)
 
         # Fetch again
         new_tip = (
@@ -130,4 +159,124 @@ def get_user_tips_today(background_tasks: BackgroundTasks, db: Session, user):
 
     except Exception as e:
         logger.error(f"User tips retrieval failed: {e}")
-        raise HTTPException(status_code=500, detail="Technical issue")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Technical issue")
+
+def _today_tip_and_goal(user_id):
+    """Return (today's tip text or None, whether a goal is set for today)."""
+    today = date.today()
+    start = datetime.combine(today, datetime.min.time())
+    end = datetime.combine(today, datetime.max.time())
+    db = SessionLocal()
+    try:
+        tip = (
+            db.query(UserTips.tips_text)
+            .filter(
+                UserTips.user_id == user_id,
+                UserTips.created_at >= start,
+                UserTips.created_at <= end,
+            )
+            .first()
+        )
+        if tip:
+            return tip.tips_text, True
+        has_goal = (
+            db.query(UserGoal.id)
+            .filter(
+                UserGoal.user_id == user_id,
+                UserGoal.created_at >= start,
+                UserGoal.created_at <= end,
+            )
+            .first()
+            is not None
+        )
+        return None, has_goal
+    finally:
+        db.close()
+
+
+def _generate_in_background(user_id):
+    db = SessionLocal()
+    try:
+        generate_user_tips(user_id, db, rerun_if_running=False)
+    finally:
+        db.close()
+
+
+def _outcome_event(message):
+    """The SSE event for a published generation outcome."""
+    event = message.get("event", "failed")
+    if event == "tip":
+        return sse_event("tip", {"tips_text": message.get("tips_text")})
+    if event == "no_goal":
+        return sse_event(
+            "no_goal", {"message": "Please set your daily goal to receive a tip."}
+        )
+    return sse_event("failed", {"message": "No tip could be generated."})
+
+
+async def stream_user_tip_today(user_id):
+    """
+    Server-sent events delivering today's tip once it exists.
+
+    Subscribes to the user's tip topic before looking at the database, so a
+    generation finishing in between is not missed. Sends `tip` right away when
+    today's tip is stored and `no_goal` when no goal is set. Otherwise waits for
+    the running generation (starting one if no worker sharing the broker runs
+    one), forwarding the cleaned text as `token` events while the LLM writes
+    it, and then its outcome: `tip`, `failed` or `no_goal`, or `timeout` after
+    TIPS_STREAM_TIMEOUT seconds. The stream ends after the outcome.
+
+    A stream joining mid-generation only gets the remaining tokens, and a
+    goal change restarts the generation without tokens; the `tip` event always
+    carries the full stored text, which replaces what the tokens showed.
+
+    Args:
+        user_id (int): The authenticated user's id.
+
+    Yields:
+        str: SSE frames, with keep-alive comments while waiting.
+    """
+    outcome = "disconnected"
+    try:
+        async with get_broker().subscribe(tips_topic(user_id)) as subscription:
+            yield sse_comment("subscribed")
+            tip_text, has_goal = await run_in_threadpool(_today_tip_and_goal, user_id)
+            if tip_text:
+                outcome = "stored"
+                yield sse_event("tip", {"tips_text": tip_text})
+                return
+            if not has_goal:
+                outcome = "no_goal"
+                yield _outcome_event({"event": "no_goal"})
+                return
+
+            # A blocking round trip with the Redis broker; keep it off the loop
+            if not await run_in_threadpool(tip_generation_in_progress, user_id):
+                # Runs on its own session; the stream does not wait for the call
+                asyncio.get_running_loop().run_in_executor(
+                    None, _generate_in_background, user_id
+                )
+
+            deadline = time.monotonic() + TIPS_STREAM_TIMEOUT
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    outcome = "timeout"
+                    yield sse_event(
+                        "timeout", {"message": "The tip is taking longer than usual."}
+                    )
+                    return
+                message = await subscription.get(
+                    timeout=min(TIPS_STREAM_KEEPALIVE, remaining)
+                )
+                if message is None:
+                    yield sse_comment()
+                    continue
+                if message.get("event") == "token":
+                    yield sse_event("token", {"text": message.get("text", "")})
+                    continue
+                outcome = f"pushed_{message.get('event', 'failed')}"
+                yield _outcome_event(message)
+                return
+    finally:
+        TIP_STREAMS.inc(outcome=outcome)
@@ -9,7 +9,10 @@ from .user import User
 from .question import QuestionAnswer
 from .otp import OTP
 from .food_update import FoodUpdate, FoodImage
+from .image_blob import ImageBlob
 from .behavior import UserBehavior
 from .goal import UserGoal
 from .tips import UserTips
 from .big_five_traits import BigFiveTraits
+from .catalog import CatalogVersion
+from .trait_prediction import TraitPrediction, TraitResolutionDay
@@ -1,12 +1,18 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, UniqueConstraint
 from app.database import Base
 
 
 class UserBehavior(Base):
     __tablename__ = "user_behaviors"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "behavior_id", name="uq_user_behaviors_user_behavior"
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     behavior_id = Column(String)
     behavior_title = Column(String)
     first_priority = Column(Boolean, default=False)
     high_priority = Column(Boolean, default=False)
+    catalog_version = Column(String(64), nullable=True)
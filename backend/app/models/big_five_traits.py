@@ -1,11 +1,46 @@
-from sqlalchemy import Column, Integer, ForeignKey, JSON, String
+from sqlalchemy import Column, Integer, ForeignKey, String, Index, DateTime
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.types import JSONDocument
+
+BIG_FIVE_TRAITS = (
+    "extraversion",
+    "agreeableness",
+    "conscientiousness",
+    "neuroticism",
+    "openness",
+)
+
+# Generation states: scores available, the last generation failed and will be
+# retried after `next_attempt_at`, or scores available but the user's answers
+# or behaviors changed since they were computed
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+STATUS_STALE = "stale"
 
 
 class BigFiveTraits(Base):
     __tablename__ = "big_five_traits"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
-    big_five_data = Column(JSON, nullable=False, default={})
-    max_value = Column(String, nullable=False)
+    big_five_data = Column(JSONDocument, nullable=True, default={})
+    max_value = Column(String, nullable=True)
+    status = Column(String(16), nullable=False, default=STATUS_READY)
+    attempts = Column(Integer, nullable=False, default=0)  # Failures since last success
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    input_fingerprint = Column(String(64), nullable=True)  # SHA-256 of the feature text
+
+    # Range filters on single traits use the per-trait expression indexes
+    # created in migration 9d2f4b7c1e58 (Postgres only)
+    __table_args__ = (
+        Index(
+            "ix_big_five_traits_big_five_data",
+            "big_five_data",
+            postgresql_using="gin",
+            postgresql_ops={"big_five_data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # The refresher sweeps stale rows oldest first
+        Index("ix_big_five_traits_status_updated_at", "status", "updated_at"),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from app.database import Base
+from app.utils.get_current_time import get_current_time
+
+
+class CatalogVersion(Base):
+    """A published question/behavior catalog, used when CATALOG_SOURCE=database."""
+
+    __tablename__ = "catalog_versions"
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(String(64), unique=True, nullable=False)
+    document = Column(JSON, nullable=False)  # {"questions": [...], "behaviors": [...]}
+    created_at = Column(DateTime, default=get_current_time)
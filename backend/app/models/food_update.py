@@ -25,5 +25,10 @@ class FoodImage(Base):
     id = Column(Integer, primary_key=True, index=True)
     food_update_id = Column(Integer, ForeignKey("food_updates.id"), nullable=False)
     image_path = Column(String, nullable=False)  # Store the image file path
+    # Set once the image lives in the content-addressed blob store; image_path
+    # then holds the blob's storage key instead of a flat file path.
+    blob_hash = Column(
+        String(64), ForeignKey("image_blobs.hash"), nullable=True, index=True
+    )
 
     food_update = relationship("FoodUpdate", back_populates="images")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+from app.utils.get_current_time import get_current_time
+
+
+class ImageBlob(Base):
+    __tablename__ = "image_blobs"
+
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the stored bytes
+    storage_key = Column(String, nullable=False)
+    content_type = Column(String, nullable=False, default="image/jpeg")
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=get_current_time)
@@ -1,11 +1,23 @@
-from sqlalchemy import Column, Integer, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.types import JSONDocument
 
 
 class QuestionAnswer(Base):
     __tablename__ = "question_answers"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
-    question_data = Column(JSON, nullable=False, default={})  #
+    question_data = Column(JSONDocument, nullable=False, default={})  #
+    catalog_version = Column(String(64), nullable=True)  # Catalog the answers used
     user = relationship("User", back_populates="question_answer")
+
+    __table_args__ = (
+        # Serves containment lookups such as "answered X to question 7"
+        Index(
+            "ix_question_answers_question_data",
+            "question_data",
+            postgresql_using="gin",
+            postgresql_ops={"question_data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -0,0 +1,38 @@
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from app.database import Base
+from app.models.types import JSONDocument
+from app.utils.get_current_time import get_current_time
+
+
+class TraitPrediction(Base):
+    """A trait-service prediction cached per user and normalized goal text."""
+
+    __tablename__ = "trait_predictions"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    text_hash = Column(String(64), nullable=False)  # SHA-256 of the normalized text
+    dominant_trait = Column(String, nullable=False)
+    trait_scores = Column(JSONDocument, nullable=True)
+    created_at = Column(DateTime, default=get_current_time)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "text_hash", name="uq_trait_predictions_user_text"),
+    )
+
+
+class TraitResolutionDay(Base):
+    """How dominant traits were resolved on a given day, one row per source."""
+
+    __tablename__ = "trait_resolution_days"
+    day = Column(Date, primary_key=True)
+    source = Column(String(16), primary_key=True)  # big_five, cache, service, fallback
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,25 @@
+from sqlalchemy import JSON
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
+
+# Generic JSON everywhere, stored as JSONB on Postgres so documents can be
+# GIN-indexed and filtered in SQL (containment, key extraction, jsonpath).
+# None is stored as SQL NULL, not the JSON value null, so `IS NULL` finds it.
+JSONDocument = JSON(none_as_null=True).with_variant(
+    JSONB(none_as_null=True), "postgresql"
+)
+
+
+def dialect_insert(db):
+    """
+    Return the ON CONFLICT-capable `insert` for the session's database.
+
+    Raises:
+        RuntimeError: If the database is neither Postgres nor SQLite.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"Upsert is not supported on {dialect}")
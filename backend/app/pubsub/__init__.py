@@ -0,0 +1,56 @@
+import logging
+import os
+import threading
+
+from app.pubsub.base import Broker, Subscription
+from app.pubsub.memory import MemoryBroker
+
+logger = logging.getLogger(__name__)
+
+# Which broker carries push notifications (e.g. finished tips): "memory" within
+# one process, or "redis" shared by every worker
+PUBSUB_BACKEND = os.getenv("PUBSUB_BACKEND", "memory").lower()
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def _create_broker() -> Broker:
+    if PUBSUB_BACKEND == "redis":
+        from app.pubsub.redis import RedisBroker
+
+        return RedisBroker(
+            os.getenv("PUBSUB_REDIS_URL", "redis://localhost:6379/0"),
+            prefix=os.getenv("PUBSUB_PREFIX", "mindful-eating:"),
+        )
+    if PUBSUB_BACKEND == "memory":
+        return MemoryBroker()
+    raise ValueError(f"Unknown PUBSUB_BACKEND: {PUBSUB_BACKEND}")
+
+
+def get_broker() -> Broker:
+    """
+    Return the process-wide pub/sub broker, creating it on first use.
+
+    Returns:
+        Broker: The configured broker implementation.
+    """
+    global _broker
+    if _broker is None:
+        # Publishers and subscribers must share one in-memory broker
+        with _broker_lock:
+            if _broker is None:
+                _broker = _create_broker()
+    return _broker
+
+
+def publish(topic: str, message: dict) -> None:
+    """
+    Publish `message` to `topic`, logging instead of raising on broker errors.
+
+    Push delivery is best effort: clients still find the result in the database.
+    """
+    try:
+        get_broker().publish(topic, message)
+    except Exception as e:
+        logger.warning(f"Publishing to {topic} failed: {e}")
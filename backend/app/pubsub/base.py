@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class Subscription(ABC):
+    """
+    Messages published to one topic after the subscription was entered.
+
+    Use as an async context manager; messages published before `__aenter__`
+    returns are not delivered.
+    """
+
+    @abstractmethod
+    async def __aenter__(self) -> "Subscription":
+        """Start receiving messages."""
+
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Stop receiving messages and release the subscription."""
+
+    @abstractmethod
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Return the next message, or None if none arrives within `timeout`."""
+
+
+class Broker(ABC):
+    """
+    Topic-based publish/subscribe between request handlers and background work.
+
+    Messages are JSON-serializable dicts. Delivery is at most once and only to
+    subscribers present at publish time, so subscribers must check the current
+    state (e.g. the database) after subscribing and before waiting.
+
+    Brokers also hold expiring markers (`claim`/`release`), visible to the same
+    processes as their messages, so work announced on a topic can be started
+    by exactly one of them.
+    """
+
+    @abstractmethod
+    def publish(self, topic: str, message: dict) -> None:
+        """Send `message` to the current subscribers of `topic`; thread-safe."""
+
+    @abstractmethod
+    def subscribe(self, topic: str) -> Subscription:
+        """Return a subscription to `topic`, to be entered with `async with`."""
+
+    @abstractmethod
+    def claim(self, key: str, ttl: float) -> Optional[str]:
+        """
+        Set marker `key` for `ttl` seconds unless it is set.
+
+        Returns:
+            str | None: A token identifying this claim, or None if already set.
+        """
+
+    @abstractmethod
+    def release(self, key: str, token: Optional[str] = None) -> bool:
+        """
+        Clear marker `key`; True if it was set.
+
+        With `token`, only the claim that returned it is cleared, so a holder
+        whose claim expired cannot clear a newer holder's.
+        """
+
+    @abstractmethod
+    def is_claimed(self, key: str) -> bool:
+        """Whether marker `key` is set and has not expired."""
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Optional
+
+from app.pubsub.base import Broker, Subscription
+
+
+class _MemorySubscription(Subscription):
+    def __init__(self, broker, topic):
+        self._broker = broker
+        self._topic = topic
+        self._queue = None
+        self._loop = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._broker._add(self._topic, self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._broker._remove(self._topic, self)
+
+    def deliver(self, message):
+        # Publishers run on worker threads; the queue belongs to the event loop
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        except RuntimeError:
+            pass  # The loop is closed; the subscriber is gone
+
+    async def get(self, timeout: Optional[float] = None):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryBroker(Broker):
+    """
+    Broker within one process.
+
+    Subscribers only see messages published by the same process, so with
+    several workers use a shared broker (PUBSUB_BACKEND=redis) instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._claims = {}  # key -> (monotonic expiry time, token)
+
+    def _add(self, topic, subscription):
+        with self._lock:
+            self._subscribers[topic].add(subscription)
+
+    def _remove(self, topic, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(topic, ()))
+
+    def publish(self, topic: str, message: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def subscribe(self, topic: str) -> Subscription:
+        return _MemorySubscription(self, topic)
+
+    def claim(self, key: str, ttl: float) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            expires, _ = self._claims.get(key, (now, None))
+            if expires > now:
+                return None
+            token = uuid.uuid4().hex
+            self._claims[key] = (now + ttl, token)
+            return token
+
+    def release(self, key: str, token: Optional[str] = None) -> bool:
+        with self._lock:
+            expires, held = self._claims.get(key, (0, None))
+            if token is not None and held != token:
+                return False
+            self._claims.pop(key, None)
+            return expires > time.monotonic()
+
+    def is_claimed(self, key: str) -> bool:
+        with self._lock:
+            expires, _ = self._claims.get(key, (0, None))
+            return expires > time.monotonic()
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Optional
+
+from app.pubsub.base import Broker, Subscription
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, broker, topic):
+        self._broker = broker
+        self._topic = topic
+        self._client = None
+        self._pubsub = None
+
+    async def __aenter__(self):
+        self._client = self._broker.async_client()
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        # Returns once the server has confirmed the subscription
+        await self._pubsub.subscribe(self._broker.channel(self._topic))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self._pubsub.unsubscribe()
+            await self._pubsub.aclose()
+        finally:
+            await self._client.aclose()
+
+    async def get(self, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            # get_message returns None for subscribe confirmations and on timeout
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=1.0 if remaining is None else min(remaining, 1.0),
+            )
+            if message is not None and message["type"] == "message":
+                return json.loads(message["data"])
+            await asyncio.sleep(0)
+
+
+# Delete a marker only if it still holds the releasing claim's token
+_RELEASE_CLAIM = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBroker(Broker):
+    """Broker over Redis PUBLISH/SUBSCRIBE, shared by every worker process."""
+
+    def __init__(self, url: str, prefix: str = "mindful-eating:"):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as e:
+            raise RuntimeError(
+                "PUBSUB_BACKEND=redis requires the redis package to be installed"
+            ) from e
+
+        self.url = url
+        self.prefix = prefix
+        self._async_redis = redis.asyncio
+        # Publishers run on worker threads, so they share one blocking client
+        self._client = redis.Redis.from_url(url)
+        self._release_claim = self._client.register_script(_RELEASE_CLAIM)
+
+    def channel(self, topic: str) -> str:
+        return f"{self.prefix}{topic}"
+
+    def async_client(self):
+        return self._async_redis.Redis.from_url(self.url)
+
+    def publish(self, topic: str, message: dict) -> None:
+        self._client.publish(self.channel(topic), json.dumps(message))
+
+    def subscribe(self, topic: str) -> Subscription:
+        return _RedisSubscription(self, topic)
+
+    def claim(self, key: str, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        claimed = self._client.set(
+            self.channel(key), token, nx=True, px=max(int(ttl * 1000), 1)
+        )
+        return token if claimed else None
+
+    def release(self, key: str, token: Optional[str] = None) -> bool:
+        if token is None:
+            return bool(self._client.delete(self.channel(key)))
+        return bool(self._release_claim(keys=[self.channel(key)], args=[token]))
+
+    def is_claimed(self, key: str) -> bool:
+        return bool(self._client.exists(self.channel(key)))
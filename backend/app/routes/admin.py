@@ -0,0 +1,215 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from app.controllers.big_five_controller import get_big_five_generation_stats
+from app.controllers.analytics_controller import (
+    answers_distribution,
+    trait_resolution_stats,
+    users_by_answer,
+    users_by_traits,
+)
+from app.database import get_db
+from app.services.catalog import get_catalog, reload_catalog
+from app.utils import profiling, query_stats
+from app.utils.auth import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def catalog_summary(catalog):
+    return {
+        "version": catalog.version,
+        "source": catalog.source,
+        "loaded_at": catalog.loaded_at.isoformat(),
+        "questions": len(catalog.questions),
+        "behaviors": len(catalog.behaviors),
+    }
+
+
+@router.get("/catalog", response_model=dict)
+def get_catalog_status():
+    return {
+        "lang": "en",
+        "message": "Catalog status retrieved successfully",
+        "data": catalog_summary(get_catalog()),
+    }
+
+
+@router.post("/catalog/reload", response_model=dict)
+def reload_catalog_endpoint():
+    try:
+        catalog, changed = reload_catalog()
+    except Exception as e:
+        # The previous version keeps serving when the new one fails to load
+        raise HTTPException(
+            status_code=422,
+            detail={"lang": "en", "message": f"Catalog reload failed: {e}", "data": {}},
+        )
+    return {
+        "lang": "en",
+        "message": "Catalog reloaded" if changed else "Catalog unchanged",
+        "data": {"changed": changed, **catalog_summary(catalog)},
+    }
+
+
+@router.get("/answers/users", response_model=dict)
+def get_users_by_answer(
+    question_id: str,
+    answer: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    try:
+        return users_by_answer(db, question_id, answer, limit, offset)
+    except HTTPException as e:
+        raise e
+
+
+@router.get("/answers/distribution", response_model=dict)
+def get_answer_distribution(question_id: str, db: Session = Depends(get_db)):
+    try:
+        return answers_distribution(db, question_id)
+    except HTTPException as e:
+        raise e
+
+
+@router.get("/traits/users", response_model=dict)
+def get_users_by_traits(
+    extraversion: str = None,
+    agreeableness: str = None,
+    conscientiousness: str = None,
+    neuroticism: str = None,
+    openness: str = None,
+    dominant: str = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Trait ranges are "min:max" with either bound optional, e.g. openness=0.6:
+    """
+    ranges = {
+        "extraversion": extraversion,
+        "agreeableness": agreeableness,
+        "conscientiousness": conscientiousness,
+        "neuroticism": neuroticism,
+        "openness": openness,
+    }
+    try:
+        return users_by_traits(db, ranges, dominant, limit, offset)
+    except HTTPException as e:
+        raise e
+
+
+@router.get("/big-five/stats", response_model=dict)
+def get_big_five_stats(db: Session = Depends(get_db)):
+    try:
+        return get_big_five_generation_stats(db)
+    except HTTPException as e:
+        raise e
+
+
+@router.get("/traits/resolution-stats", response_model=dict)
+def get_trait_resolution_stats(
+    days: int = Query(7, ge=1, le=90), db: Session = Depends(get_db)
+):
+    try:
+        return trait_resolution_stats(db, days)
+    except HTTPException as e:
+        raise e
+
+
+@router.get("/profiling", response_model=dict)
+def get_profiling_status():
+    return {
+        "lang": "en",
+        "message": "Profiling status retrieved successfully",
+        "data": profiling.profiling_status(),
+    }
+
+
+@router.post("/profiling/arm", response_model=dict)
+def arm_route_profiling(
+    route: str,
+    method: str = "GET",
+    count: int = Query(1, ge=1, le=100),
+):
+    """
+    Profile the next `count` requests to a route template, e.g.
+    route=/tips/get-user-tips.
+    """
+    profiling.arm_route(method, route, count)
+    return {
+        "lang": "en",
+        "message": f"Profiling the next {count} {method.upper()} {route} requests",
+        "data": profiling.profiling_status(),
+    }
+
+
+@router.delete("/profiling/arm", response_model=dict)
+def disarm_route_profiling(route: str, method: str = "GET"):
+    if not profiling.disarm_route(method, route):
+        raise HTTPException(
+            status_code=404,
+            detail={"lang": "en", "message": "Route is not armed", "data": {}},
+        )
+    return {
+        "lang": "en",
+        "message": "Route profiling disarmed",
+        "data": profiling.profiling_status(),
+    }
+
+
+@router.put("/profiling/slow-threshold", response_model=dict)
+def set_slow_request_threshold(threshold_ms: float = Query(..., ge=0)):
+    """Profile every request slower than `threshold_ms`; 0 turns this off."""
+    profiling.set_slow_threshold(threshold_ms)
+    return {
+        "lang": "en",
+        "message": "Slow request threshold updated",
+        "data": profiling.profiling_status(),
+    }
+
+
+@router.get("/profiling/profiles/{name}")
+def download_profile(name: str):
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"lang": "en", "message": "Profile not found", "data": {}},
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@router.get("/queries", response_model=dict)
+def get_query_stats(
+    route: str = None,
+    sort: str = Query("total", pattern="^(total|mean|p95|max|calls|rows)$"),
+    limit: int = Query(20, ge=1, le=500),
+):
+    """
+    SQL fingerprints ranked by database time, overall or for one route template,
+    e.g. route=/tips/get-user-tips.
+    """
+    return {
+        "lang": "en",
+        "message": "Query statistics retrieved successfully",
+        "data": query_stats.query_report(limit, route, sort),
+    }
+
+
+@router.get("/queries/slow", response_model=dict)
+def get_slow_queries(limit: int = Query(50, ge=1, le=100)):
+    return {
+        "lang": "en",
+        "message": "Slow queries retrieved successfully",
+        "data": query_stats.slow_queries(limit),
+    }
+
+
+@router.delete("/queries", response_model=dict)
+def reset_query_statistics():
+    query_stats.reset_query_stats()
+    return {"lang": "en", "message": "Query statistics reset", "data": {}}
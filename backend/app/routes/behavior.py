@@ -1,21 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.controllers.behavior_controller import (
     submit_behaviors,
-    get_behaviors,
+    get_behaviors_body,
     get_user_behaviors,
 )
 from app.database import get_db
+from app.services.catalog import CATALOG_CACHE_MAX_AGE
 from app.schemas.behavior import SubmitBehaviorsRequest
 from app.utils.auth import get_current_user
+from app.utils.http_cache import cached_json_response
 
 router = APIRouter()
 
 
 @router.get("/behavior-list", response_model=dict)
-def get_behavior_question_list():
+async def get_behavior_question_list(request: Request):
+    # Served from bytes serialized once per catalog version; no I/O here
     try:
-        return get_behaviors()
+        return cached_json_response(
+            request, get_behaviors_body(), CATALOG_CACHE_MAX_AGE
+        )
     except HTTPException as e:
         raise e
 
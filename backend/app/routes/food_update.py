@@ -8,51 +8,58 @@ from app.controllers.food_update_controller import (
     get_user_uploaded_images_controller,
     get_food_update_images_by_id_controller,
 )
-from app.schemas.food_update import FoodUpdatePayload
+from app.schemas.food_update import (
+    FoodUpdateImagesResponse,
+    FoodUpdatePayload,
+    FoodUpdatesResponse,
+    UploadedImagesResponse,
+)
 from app.utils.auth import get_current_user
 
 router = APIRouter()
 
 
 @router.post("/food-update", response_model=dict)
-def post_food_update(
+async def post_food_update(
     food_update: FoodUpdatePayload,  # Expecting description and base64 images
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),  # Get the authenticated user
 ):
     try:
-        return post_food_update_controller(current_user, food_update, db)
+        return await post_food_update_controller(current_user, food_update, db)
     except HTTPException as e:
         raise e
 
 
-@router.get("/user-food-updates", response_model=dict)
-def get_user_food_updates(
+@router.get("/user-food-updates", response_model=FoodUpdatesResponse)
+async def get_user_food_updates(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),  # Get the authenticated user
 ):
     try:
-        return get_user_food_updates_controller(current_user, db)
+        return await get_user_food_updates_controller(current_user, db)
     except HTTPException as e:
         raise e
 
 
-@router.get("/user-uploaded-images", response_model=dict)
-def get_user_uploaded_images(
+@router.get("/user-uploaded-images", response_model=UploadedImagesResponse)
+async def get_user_uploaded_images(
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
     try:
-        return get_user_uploaded_images_controller(current_user, db)
+        return await get_user_uploaded_images_controller(current_user, db)
     except HTTPException as e:
         raise e
 
 
-@router.get("/food-update/{food_update_id}", response_model=dict)
-def get_food_update_images(
+@router.get(
+    "/food-update/{food_update_id}", response_model=FoodUpdateImagesResponse
+)
+async def get_food_update_images(
     food_update_id: int = Path(..., description="The ID of the food update post"),
     db: Session = Depends(get_db),
 ):
     try:
-        return get_food_update_images_by_id_controller(food_update_id, db)
+        return await get_food_update_images_by_id_controller(food_update_id, db)
     except HTTPException as e:
         raise e
@@ -0,0 +1,47 @@
+import mimetypes
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.storage import get_storage
+from app.storage.local import LocalStorage
+
+router = APIRouter()
+
+# Not every platform's mimetypes table knows these image formats
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+
+@router.get("/{key:path}")
+def get_media(
+    key: str,
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    """
+    Serve a locally stored media object through a signed, expiring URL.
+
+    This is the local-disk counterpart of an S3 presigned GET URL; the links are
+    produced by `app.storage.media_url`.
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    if not storage.verify_url(key, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired media URL")
+
+    try:
+        path = storage.path(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Not found")
+
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"Cache-Control": "private, max-age=86400, immutable"},
+    )
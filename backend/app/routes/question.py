@@ -1,23 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.controllers.question_controller import (
     submit_answers,
-    get_questions,
+    get_questions_body,
     check_submission,
     get_user_answers,
 )
 from app.database import get_db
+from app.services.catalog import CATALOG_CACHE_MAX_AGE
 from typing import List
 from app.schemas.question import SubmitAnswersRequest
 from app.utils.auth import get_current_user
+from app.utils.http_cache import cached_json_response
 
 router = APIRouter()
 
 
 @router.get("/question-list", response_model=dict)
-def get_question_list():
+async def get_question_list(request: Request):
+    # Served from bytes serialized once per catalog version; no I/O here
     try:
-        return get_questions()
+        return cached_json_response(
+            request, get_questions_body(), CATALOG_CACHE_MAX_AGE
+        )
     except HTTPException as e:
         raise e
 
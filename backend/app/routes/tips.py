@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.controllers.user_tips_controller import (
     create_or_update_user_tips,
     get_user_tips_today,
+    stream_user_tip_today,
 )
 from app.database import get_db
 from app.schemas.tips import CreateUserTipsRequest
 from app.utils.auth import get_current_user
+from app.utils.sse import SSE_HEADERS, SSE_MEDIA_TYPE
 
 router = APIRouter()
 
@@ -33,3 +36,19 @@ def get_user_tips_endpoint(
         return get_user_tips_today(background_tasks, db, user=user)
     except HTTPException as e:
         raise e
+
+
+@router.get("/stream-user-tip", response_class=StreamingResponse)
+async def stream_user_tip_endpoint(user=Depends(get_current_user)):
+    """
+    Push today's tip as server-sent events instead of polling /get-user-tips.
+
+    Subscribe once after submitting the goal: while the tip is generated the
+    stream sends its text as `token` events, then one `tip`, `no_goal`,
+    `failed` or `timeout` event, and closes.
+    """
+    return StreamingResponse(
+        stream_user_tip_today(user.id),
+        media_type=SSE_MEDIA_TYPE,
+        headers=SSE_HEADERS,
+    )
@@ -1,6 +1,8 @@
 import os
+import logging
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.controllers.user_controller import (
@@ -22,9 +24,14 @@ from app.schemas.user import (
     UploadProfilePicture,
     ForgetPasswordRequest,
     PasswordResetRequest,
+    ProfileDetailsResponse,
+    ProfilePictureResponse,
 )
-from app.services.ollama_service import generate_result
+from app.services.ollama_service import generate_result, stream_result
 from app.utils.auth import get_current_user
+from app.utils.sse import SSE_HEADERS, SSE_MEDIA_TYPE, iterate_in_thread, sse_event
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -57,7 +64,7 @@ def update_user_profile(
         raise e
 
 
-@router.get("/profile-details", response_model=dict)
+@router.get("/profile-details", response_model=ProfileDetailsResponse)
 def get_profile_details(current_user: User = Depends(get_current_user)):
     try:
         return profile_details_controller(current_user)
@@ -66,24 +73,24 @@ def get_profile_details(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/upload-profile-picture", response_model=dict)
-def upload_profile_picture(
+async def upload_profile_picture(
     profile_picture: UploadProfilePicture,  # Expecting a base64-encoded string instead of a file
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),  # Get the authenticated user
 ):
     try:
-        return upload_profile_picture_controller(current_user, profile_picture, db)
+        return await upload_profile_picture_controller(current_user, profile_picture, db)
     except HTTPException as e:
         raise e
 
 
-@router.get("/profile-picture", response_model=dict)
-def get_profile_picture(
+@router.get("/profile-picture", response_model=ProfilePictureResponse)
+async def get_profile_picture(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),  # Get user from token
 ):
     try:
-        return get_profile_picture_controller(current_user, db)
+        return await get_profile_picture_controller(current_user, db)
     except HTTPException as e:
         raise e
 
@@ -120,3 +127,36 @@ def chat(request: ChatRequest):
     chat_model = os.getenv("TIPS_GENERATOR_MODEL")
     result = generate_result(prompt=request.prompt, model=chat_model)
     return ChatResponse(response=result)
+
+
+def _emit_result(emit, prompt, model):
+    for piece in stream_result(prompt, model):
+        emit(piece)
+
+
+async def _chat_events(prompt, model):
+    pieces = []
+    try:
+        async for piece in iterate_in_thread(_emit_result, prompt, model):
+            pieces.append(piece)
+            yield sse_event("token", {"text": piece})
+    except Exception as e:
+        logger.error(f"Failed to stream chat reply: {e}")
+        yield sse_event("error", {"message": f"Tip generation failed due to: {e}"})
+        return
+    yield sse_event("done", {"response": "".join(pieces)})
+
+
+@router.post("/chat/stream", response_class=StreamingResponse)
+async def chat_stream(request: ChatRequest):
+    """
+    /chat as server-sent events: the reply's text in `token` events as the
+    model writes it, then `done` with the whole reply ({"response": ...}), or
+    `error` if the model failed mid-reply.
+    """
+    chat_model = os.getenv("TIPS_GENERATOR_MODEL")
+    return StreamingResponse(
+        _chat_events(request.prompt, chat_model),
+        media_type=SSE_MEDIA_TYPE,
+        headers=SSE_HEADERS,
+    )
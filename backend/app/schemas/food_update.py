@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 
 
 class FoodImageUpload(BaseModel):
@@ -9,3 +10,48 @@ class FoodImageUpload(BaseModel):
 class FoodUpdatePayload(BaseModel):
     description: Optional[str] = None
     images: Optional[List[FoodImageUpload]] = None
+
+
+# Response bodies of the gallery endpoints. Typed models are validated and
+# serialized by pydantic-core instead of being walked as generic dicts.
+class FoodImageItem(BaseModel):
+    id: int
+    image_path: str
+    base64_image: Optional[str] = None  # data URI, None if not inlined
+    image_url: Optional[str] = None
+    uploaded_at: Optional[str] = None
+
+
+class UploadedImageItem(FoodImageItem):
+    food_update_id: int
+
+
+class UploadedImagesResponse(BaseModel):
+    lang: str
+    message: str
+    data: List[UploadedImageItem]
+
+
+class FoodUpdateItem(BaseModel):
+    description: Optional[str] = None
+    images: List[Optional[str]]  # base64, None if not inlined
+    image_urls: List[Optional[str]]
+    created_at: str
+
+
+class FoodUpdatesResponse(BaseModel):
+    lang: str
+    message: str
+    data: List[FoodUpdateItem]
+
+
+class FoodUpdateImages(BaseModel):
+    description: Optional[str] = None
+    created_at: datetime
+    images: List[FoodImageItem]
+
+
+class FoodUpdateImagesResponse(BaseModel):
+    lang: str
+    message: str
+    data: FoodUpdateImages
@@ -48,6 +48,42 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class ProfileDetails(BaseModel):
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    username: Optional[str] = None
+    dob: Optional[date] = None
+    age: Optional[int] = None
+    gender_of_birth: Optional[str] = None
+    current_gender: Optional[str] = None
+    occupation: Optional[str] = None
+    lifestyle_type: Optional[str] = None
+    country: Optional[str] = None
+    state: Optional[str] = None
+    city: Optional[str] = None
+    cultural_religious_dietary_influence: Optional[str] = None
+    profile_submission: Optional[bool] = None
+
+
+class ProfileDetailsResponse(BaseModel):
+    lang: str
+    message: str
+    data: ProfileDetails
+
+
+class ProfilePicture(BaseModel):
+    profile_picture: str  # base64
+    profile_picture_url: Optional[str] = None
+
+
+class ProfilePictureResponse(BaseModel):
+    lang: str
+    message: str
+    data: ProfilePicture
+
+
 class UploadProfilePicture(BaseModel):
     base64_file: str
 
@@ -1,29 +1,45 @@
 import os
-import ast
+import json
+import hashlib
 import logging
-from app.models import UserBehavior, QuestionAnswer, BigFiveTraits
+import threading
+from datetime import timedelta
+from app.database import SessionLocal
+from app.models import User, UserBehavior, QuestionAnswer, BigFiveTraits
+from app.models.big_five_traits import STATUS_FAILED, STATUS_READY, STATUS_STALE
+from app.models.types import dialect_insert
+from app.services.model_output import (
+    BIG_FIVE_PARSE_RESULTS,
+    ModelOutputError,
+    parse_big_five_output,
+)
 from app.services.ollama_service import generate_result
-from sqlalchemy.exc import SQLAlchemyError
+from app.utils.get_current_time import get_current_time
+from app.utils.metrics import Counter
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects import postgresql
 
 MOCK = os.getenv("MOCK", "false").lower() in ("true", "True")
 
+# Backoff between retries of a failed generation: base * 2^(attempt - 1), capped
+BIG_FIVE_RETRY_BASE_SECONDS = int(os.getenv("BIG_FIVE_RETRY_BASE_SECONDS", 60))
+BIG_FIVE_RETRY_MAX_SECONDS = int(os.getenv("BIG_FIVE_RETRY_MAX_SECONDS", 6 * 3600))
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Users handled by refresh_big_five_batch: recomputed, skipped or failed
+BIG_FIVE_REFRESH_RESULTS = Counter(
+    "big_five_refresh_total",
+    "Users processed by Big Five refreshes, by outcome",
+    labelnames=("result",),
+)
 
-def generate_big5_personality_prompt(input_text=""):
-    """
-    Generate a prompt for Big Five personality analysis from the given input text.
-
-    Args:
-        input_text (str): The input text containing user info, Q&A, and behaviors.
 
-    Returns:
-        str: A formatted prompt instructing the model to return Big Five trait scores in JSON.
-    """
-    prompt_text = f"""
+# The Big Five prompt, formatted once per user with their input text
+BIG5_PROMPT_TEMPLATE = """
 You are an expert Personality Psychologist with over 10 years of experience in personality analysis.
 You specialize in predicting the Big Five personality traits (Extraversion, Agreeableness, Conscientiousness,
 Neuroticism, and Openness).
@@ -44,13 +60,64 @@ Task:
 Input Text:
 {input_text}
 """
-    return prompt_text
+
+# Layout of the input text; the Q&A and behavior lines are joined in separately
+BIG5_INPUT_TEMPLATE = (
+    "{full_name}, {occupation}\n"
+    "Description: {full_name} is a {age}-year-old {occupation_lower} from "
+    "{location}. They lead a {lifestyle_lower} lifestyle and follow a {diet} diet.\n"
+    "\n"
+    "Demographics:\n"
+    "Age: {age}\n"
+    "Gender: {gender}\n"
+    "Location: {location}\n"
+    "Occupation: {occupation}\n"
+    "Lifestyle: {lifestyle}\n"
+    "Dietary Influence: {diet}\n"
+    "\n"
+    "\n"
+    "Some Questions and Answers about the user:\n"
+    "{qa_lines}\n"
+    "\n"
+    "Observed Behaviors of the user:\n"
+    "{behavior_lines}\n"
+)
+
+# Profile columns the prompt uses, loaded alongside answers and behaviors
+PROFILE_COLUMNS = (
+    User.id,
+    User.first_name,
+    User.last_name,
+    User.age,
+    User.occupation,
+    User.current_gender,
+    User.gender_of_birth,
+    User.city,
+    User.country,
+    User.lifestyle_type,
+    User.cultural_religious_dietary_influence,
+)
+
+
+def generate_big5_personality_prompt(input_text=""):
+    """
+    Generate a prompt for Big Five personality analysis from the given input text.
+
+    Args:
+        input_text (str): The input text containing user info, Q&A, and behaviors.
+
+    Returns:
+        str: A formatted prompt instructing the model to return Big Five trait scores in JSON.
+    """
+    return BIG5_PROMPT_TEMPLATE.format(input_text=input_text)
 
 
 def prepare_big5_input_text(user, formatted_answers, formatted_behavior):
     """
     Prepare the input text used in the prompt by formatting user details, answers, and behaviors.
 
+    Missing profile fields are rendered as "N/A" (or left empty for the location).
+
     Args:
         user (dict): Dictionary containing user profile fields.
         formatted_answers (list): List of dicts with user questions and answers.
@@ -59,48 +126,401 @@ def prepare_big5_input_text(user, formatted_answers, formatted_behavior):
     Returns:
         str: A compiled input text used in Big Five trait prompt.
     """
-    full_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-    occupation = user.get("occupation", "N/A")
-    age = user.get("age", "N/A")
-    gender = user.get("current_gender", user.get("gender_of_birth", "N/A"))
-    city = user.get("city", "")
-    country = user.get("country", "")
-    location = f"{city}, {country}".strip(", ")
-    lifestyle = user.get("lifestyle_type", "N/A")
-    diet = user.get("cultural_religious_dietary_influence", "N/A")
-
-    description = (
-        f"{full_name} is a {age}-year-old {occupation.lower()} from {location}. "
-        f"They lead a {lifestyle.lower()} lifestyle and follow a {diet} diet."
+    first_name = user.get("first_name") or ""
+    last_name = user.get("last_name") or ""
+    occupation = user.get("occupation") or "N/A"
+    lifestyle = user.get("lifestyle_type") or "N/A"
+    city = user.get("city") or ""
+    country = user.get("country") or ""
+
+    return BIG5_INPUT_TEMPLATE.format(
+        full_name=f"{first_name} {last_name}".strip(),
+        occupation=occupation,
+        occupation_lower=occupation.lower(),
+        age=user.get("age") or "N/A",
+        gender=user.get("current_gender") or user.get("gender_of_birth") or "N/A",
+        location=f"{city}, {country}".strip(", "),
+        lifestyle=lifestyle,
+        lifestyle_lower=lifestyle.lower(),
+        diet=user.get("cultural_religious_dietary_influence") or "N/A",
+        qa_lines="".join(
+            f"Q: {qa['question']}\nA: {qa['answer']}\n" for qa in formatted_answers
+        ),
+        behavior_lines="".join(
+            f"- {b['behavior_title']} "
+            f"({'High Priority' if b['high_priority'] else 'Normal Priority'})\n"
+            for b in formatted_behavior
+        ),
     )
 
-    demographics = f"""Demographics:
-Age: {age}
-Gender: {gender}
-Location: {location}
-Occupation: {occupation}
-Lifestyle: {lifestyle}
-Dietary Influence: {diet}"""
 
-    qa_section = "\nSome Questions and Answers about the user:\n"
-    for qa in formatted_answers:
-        qa_section += f"Q: {qa['question']}\nA: {qa['answer']}\n"
+def format_answers(question_data):
+    """Flatten stored question data into question/answer pairs."""
+    return [
+        {
+            "question": answer_info.get("question", ""),
+            "answer": answer_info.get("answer", ""),
+        }
+        for answer_info in (question_data or {}).values()
+    ]
+
+
+def _behaviors_aggregate(dialect):
+    """Correlated subquery returning each user's behaviors as one JSON array."""
+    if dialect == "postgresql":
+        aggregate = func.json_agg(
+            postgresql.aggregate_order_by(
+                func.json_build_object(
+                    "behavior_title",
+                    UserBehavior.behavior_title,
+                    "high_priority",
+                    UserBehavior.high_priority,
+                ),
+                UserBehavior.id,
+            )
+        )
+    else:
+        aggregate = func.json_group_array(
+            func.json_object(
+                "behavior_title",
+                UserBehavior.behavior_title,
+                "high_priority",
+                UserBehavior.high_priority,
+            )
+        )
+    return (
+        select(aggregate)
+        .where(UserBehavior.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
 
-    behavior_section = "Observed Behaviors of the user:\n"
-    for b in formatted_behavior:
-        priority = "High Priority" if b["high_priority"] else "Normal Priority"
-        behavior_section += f"- {b['behavior_title']} ({priority})\n"
 
-    input_text = f"""{full_name}, {occupation}
-Description: {description}
+def load_big5_inputs(db, user_ids):
+    """
+    Load profile, answers and behaviors for many users in a single query.
 
-{demographics}
+    Answers come from a join on `question_answers`; behaviors are aggregated
+    into a JSON array per user inside the same statement.
 
-{qa_section}
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_ids (list[int]): The users to load.
 
-{behavior_section}
-"""
-    return input_text
+    Returns:
+        dict: user_id -> (profile dict, formatted_answers, formatted_behavior).
+    """
+    dialect = db.get_bind().dialect.name
+    rows = db.execute(
+        select(
+            *PROFILE_COLUMNS,
+            QuestionAnswer.question_data,
+            _behaviors_aggregate(dialect).label("behaviors"),
+        )
+        .outerjoin(QuestionAnswer, QuestionAnswer.user_id == User.id)
+        .where(User.id.in_(user_ids))
+    ).mappings()
+
+    inputs = {}
+    for row in rows:
+        behaviors = row["behaviors"]
+        if isinstance(behaviors, str):  # SQLite returns the array as JSON text
+            behaviors = json.loads(behaviors)
+        profile = {column.key: row[column.key] for column in PROFILE_COLUMNS}
+        inputs[row["id"]] = (
+            profile,
+            format_answers(row["question_data"]),
+            behaviors or [],
+        )
+    return inputs
+
+
+def build_big5_prompt(profile, formatted_answers, formatted_behavior):
+    """Render the full Big Five prompt for one user's loaded inputs."""
+    return generate_big5_personality_prompt(
+        prepare_big5_input_text(profile, formatted_answers, formatted_behavior)
+    )
+
+
+def big5_fingerprint(input_text):
+    """Hash of a user's feature text, stored with their traits to detect changes."""
+    return hashlib.sha256(input_text.encode("utf-8")).hexdigest()
+
+
+MOCK_BIG_FIVE_RESULT = {
+    "extraversion": 0.2739933746925895,
+    "agreeableness": 0.3336660866251377,
+    "conscientiousness": 0.6416602892067943,
+    "neuroticism": 0.6780137551729286,
+    "openness": 0.338040651768266,
+}
+
+
+def infer_big_five_scores(big_five_prompt):
+    """
+    Run the Big Five model on a prompt.
+
+    Returns:
+        dict: The five trait names mapped to scores in [0, 1].
+
+    Raises:
+        ModelOutputError: If the model call fails or its reply has no valid scores.
+    """
+    if MOCK:
+        return dict(MOCK_BIG_FIVE_RESULT)
+
+    big_five_model = os.getenv("BIG_FIVE_MODEL", "local-big5")
+    try:
+        ollama_result_text = generate_result(big_five_prompt, big_five_model)
+    except Exception as e:
+        BIG_FIVE_PARSE_RESULTS.inc(result="model_error")
+        raise ModelOutputError("model_error", f"Model call failed: {e}")
+    return parse_big_five_output(ollama_result_text)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retry number `attempts` (exponential, capped)."""
+    delay = BIG_FIVE_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return min(delay, BIG_FIVE_RETRY_MAX_SECONDS)
+
+
+def upsert_big_five_traits(db, results, fingerprints=None):
+    """
+    Insert or replace Big Five rows for many users in one statement.
+
+    Stored rows become ready and their failure state is cleared.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        results (dict): user_id -> trait scores.
+        fingerprints (dict): user_id -> fingerprint of the feature text the
+            scores were computed from.
+    """
+    if not results:
+        return
+    fingerprints = fingerprints or {}
+    now = get_current_time()
+    rows = [
+        {
+            "user_id": user_id,
+            "big_five_data": scores,
+            "max_value": max(scores, key=scores.get),
+            "input_fingerprint": fingerprints.get(user_id),
+            "status": STATUS_READY,
+            "attempts": 0,
+            "last_error": None,
+            "next_attempt_at": None,
+            "updated_at": now,
+        }
+        for user_id, scores in results.items()
+    ]
+
+    statement = dialect_insert(db)(BigFiveTraits).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[BigFiveTraits.user_id],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column != "user_id"
+            },
+        )
+    )
+
+
+def record_big_five_failures(db, failures):
+    """
+    Store failed generations so they are retried later instead of on every request.
+
+    Each failure bumps the user's attempt count and schedules the next attempt
+    with exponential backoff. A user who already has scores keeps them (and
+    their status); a user without scores is marked failed.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        failures (dict): user_id -> error message.
+    """
+    if not failures:
+        return
+    previous_attempts = dict(
+        db.query(BigFiveTraits.user_id, BigFiveTraits.attempts).filter(
+            BigFiveTraits.user_id.in_(list(failures))
+        )
+    )
+    now = get_current_time()
+    rows = []
+    for user_id, error in failures.items():
+        attempts = (previous_attempts.get(user_id) or 0) + 1
+        rows.append(
+            {
+                "user_id": user_id,
+                "big_five_data": None,
+                "max_value": None,
+                "status": STATUS_FAILED,
+                "attempts": attempts,
+                "last_error": str(error)[:500],
+                "next_attempt_at": now + timedelta(seconds=retry_delay(attempts)),
+                "updated_at": now,
+            }
+        )
+
+    statement = dialect_insert(db)(BigFiveTraits).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[BigFiveTraits.user_id],
+            set_={
+                "status": case(
+                    (BigFiveTraits.big_five_data.is_(None), STATUS_FAILED),
+                    else_=BigFiveTraits.status,
+                ),
+                "attempts": statement.excluded.attempts,
+                "last_error": statement.excluded.last_error,
+                "next_attempt_at": statement.excluded.next_attempt_at,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    )
+
+
+def needs_big_five_generation(traits, now=None):
+    """
+    Decide whether a user's traits should be (re)generated now.
+
+    Args:
+        traits (BigFiveTraits): The user's row, or None if there is none.
+        now (datetime): Current time; defaults to get_current_time().
+
+    Returns:
+        bool: True if there is no row, or a failed row is due for its retry.
+    """
+    if traits is None:
+        return True
+    if traits.status == STATUS_FAILED:
+        now = now or get_current_time()
+        return traits.next_attempt_at is None or traits.next_attempt_at <= now
+    return False
+
+
+def mark_big_five_stale(db, user_id):
+    """
+    Flag a user's traits for recomputation after their answers or behaviors change.
+
+    Ready rows keep serving their scores until the refresh lands; a failed row
+    becomes due for retry immediately, since its inputs are now different. The
+    caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): The user whose inputs changed.
+    """
+    now = get_current_time()
+    db.execute(
+        update(BigFiveTraits)
+        .where(
+            BigFiveTraits.user_id == user_id,
+            BigFiveTraits.status == STATUS_READY,
+        )
+        .values(status=STATUS_STALE, updated_at=now)
+    )
+    db.execute(
+        update(BigFiveTraits)
+        .where(
+            BigFiveTraits.user_id == user_id,
+            BigFiveTraits.status == STATUS_FAILED,
+        )
+        .values(next_attempt_at=now)
+    )
+
+
+def _infer_from_text(input_text):
+    """
+    Run inference on one user's feature text.
+
+    Returns:
+        tuple: (scores, None) on success, or (None, error message).
+    """
+    try:
+        return infer_big_five_scores(generate_big5_personality_prompt(input_text)), None
+    except ModelOutputError as e:
+        return None, f"{e.reason}: {e.message}"
+    except Exception as e:
+        return None, str(e)
+
+
+def refresh_big_five_batch(db, user_ids, map_func=map, skip_unchanged=False):
+    """
+    Compute and store Big Five traits for a batch of users.
+
+    Inputs for the whole batch are loaded in one query. With `skip_unchanged`,
+    users whose feature text still matches the stored fingerprint are not sent
+    to the model; their row is simply marked ready again. Results are upserted
+    and failures recorded for retry. The caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_ids (list[int]): The users to refresh.
+        map_func (callable): `map`-like function used to run inference, e.g. a
+            thread pool's `map` for concurrent requests.
+        skip_unchanged (bool): Reuse scores whose inputs have not changed.
+
+    Returns:
+        dict: Number of users recomputed, skipped and failed.
+    """
+    inputs = load_big5_inputs(db, user_ids)
+    texts = {
+        user_id: prepare_big5_input_text(*user_inputs)
+        for user_id, user_inputs in inputs.items()
+    }
+    fingerprints = {
+        user_id: big5_fingerprint(text) for user_id, text in texts.items()
+    }
+
+    unchanged = []
+    if skip_unchanged and texts:
+        stored = dict(
+            db.query(BigFiveTraits.user_id, BigFiveTraits.input_fingerprint).filter(
+                BigFiveTraits.user_id.in_(list(texts)),
+                BigFiveTraits.big_five_data.is_not(None),
+            )
+        )
+        unchanged = [
+            user_id
+            for user_id, fingerprint in fingerprints.items()
+            if stored.get(user_id) == fingerprint
+        ]
+
+    skipped = set(unchanged)
+    pending = [user_id for user_id in texts if user_id not in skipped]
+    outcomes = map_func(_infer_from_text, [texts[user_id] for user_id in pending])
+
+    results, failures = {}, {}
+    for user_id, (scores, error) in zip(pending, outcomes):
+        if scores is not None:
+            results[user_id] = scores
+        else:
+            failures[user_id] = error
+
+    upsert_big_five_traits(db, results, fingerprints)
+    record_big_five_failures(db, failures)
+    if unchanged:
+        db.execute(
+            update(BigFiveTraits)
+            .where(
+                BigFiveTraits.user_id.in_(unchanged),
+                BigFiveTraits.status == STATUS_STALE,
+            )
+            .values(status=STATUS_READY)
+        )
+
+    counts = {
+        "recomputed": len(results),
+        "skipped": len(unchanged),
+        "failed": len(failures),
+    }
+    for result, count in counts.items():
+        if count:
+            BIG_FIVE_REFRESH_RESULTS.inc(count, result=result)
+    return counts
 
 
 def generate_user_big_five_traits(user, db):
@@ -108,98 +528,62 @@ def generate_user_big_five_traits(user, db):
     Generate and store Big Five personality traits for a given user using their profile,
     answers, and behaviors. Handles all exceptions gracefully.
 
+    A reply without valid scores is recorded as a failed attempt with a retry
+    time rather than silently discarded.
+
     Args:
         user (User): SQLAlchemy user model instance.
         db (Session): SQLAlchemy database session.
     """
+    user_id = user.id
     try:
-        excluded_keys = {
-            "_sa_instance_state",
-            "hashed_password",
-            "id",
-            "profile_picture",
-            "profile_submission",
-            "state",
-        }
-        user_data = {k: v for k, v in user.__dict__.items() if k not in excluded_keys}
-
-        # Get user's question-answer data
-        formatted_answers = []
-        try:
-            user_question = (
-                db.query(QuestionAnswer)
-                .filter(QuestionAnswer.user_id == user.id)
-                .first()
-            )
-            if user_question and user_question.question_data:
-                for _, answer_info in user_question.question_data.items():
-                    formatted_answers.append(
-                        {
-                            "question": answer_info.get("question", ""),
-                            "answer": answer_info.get("answer", ""),
-                        }
-                    )
-        except Exception as e:
-            logger.warning(f"Failed to load question-answer data: {e}")
-
-        # Get user's behaviors
-        formatted_behavior = []
-        try:
-            behaviors = (
-                db.query(UserBehavior).filter(UserBehavior.user_id == user.id).all()
-            )
-            formatted_behavior = [
-                {"behavior_title": b.behavior_title, "high_priority": b.high_priority}
-                for b in behaviors
-            ]
-        except Exception as e:
-            logger.warning(f"Failed to load user behavior data: {e}")
-
-        # Prepare input and generate result
-        input_text = prepare_big5_input_text(
-            user_data, formatted_answers, formatted_behavior
-        )
-        big_five_prompt = generate_big5_personality_prompt(input_text)
-
-        try:
-            if MOCK:
-                ollama_result = {
-                    "extraversion": 0.2739933746925895,
-                    "agreeableness": 0.3336660866251377,
-                    "conscientiousness": 0.6416602892067943,
-                    "neuroticism": 0.6780137551729286,
-                    "openness": 0.338040651768266,
-                }
-            else:
-                # big_five_model = os.getenv("BIG_FIVE_MODEL")
-                # ollama_result_text = generate_result(big_five_prompt, big_five_model)
-                # ollama_result = ast.literal_eval(ollama_result_text)
-                big_five_model = os.getenv("BIG_FIVE_MODEL", "local-big5")
-                ollama_result_text = generate_result(big_five_prompt, big_five_model)  # now local
-                ollama_result = ast.literal_eval(ollama_result_text)
-
-        except Exception as e:
-            # logger.error(f"Failed to generate result from Ollama: {e}")
-            return  # Skip DB entry if no result
-
-        if not isinstance(ollama_result, dict):
-            logger.error("Ollama result is not in expected dict format.")
-            return
-
-        max_trait = max(ollama_result, key=ollama_result.get)
-
-        # Save to DB
-        try:
-            big_five_entry = BigFiveTraits(
-                user_id=user.id, big_five_data=ollama_result, max_value=max_trait
-            )
-            db.add(big_five_entry)
-            db.commit()
-            db.refresh(big_five_entry)
+        counts = refresh_big_five_batch(db, [user_id])
+        db.commit()
+        if counts["recomputed"]:
             logger.info("Big Five Traits saved successfully.")
-        except SQLAlchemyError as db_err:
-            db.rollback()
-            logger.error(f"Failed to save Big Five traits: {db_err}")
+        elif counts["failed"]:
+            logger.warning(f"Big Five generation failed for user {user_id}")
+        else:
+            logger.error(f"User {user_id} not found for Big Five generation")
 
     except Exception as e:
+        db.rollback()
         logger.error(f"Unexpected error in generate_user_big_five_traits: {e}")
+
+
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def _generate_in_background(user_id):
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if user is not None:
+            generate_user_big_five_traits(user, db)
+    finally:
+        db.close()
+        with _in_flight_lock:
+            _in_flight.discard(user_id)
+
+
+def request_big_five_generation(background_tasks, user_id, traits):
+    """
+    Queue trait generation for a user if it is needed and not already running.
+
+    Args:
+        background_tasks (BackgroundTasks): The request's background task queue.
+        user_id (int): The user to generate traits for.
+        traits (BigFiveTraits): The user's current row, or None.
+
+    Returns:
+        bool: True if a generation was queued.
+    """
+    if not needs_big_five_generation(traits):
+        return False
+    with _in_flight_lock:
+        if user_id in _in_flight:
+            return False
+        _in_flight.add(user_id)
+    background_tasks.add_task(_generate_in_background, user_id)
+    return True
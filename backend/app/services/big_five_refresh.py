@@ -0,0 +1,174 @@
+"""
+Incremental Big Five refresh.
+
+Answer and behavior submissions mark the user's traits stale and schedule a
+refresh here. Refreshes are debounced: a user who edits several things in a row
+is recomputed once, BIG_FIVE_REFRESH_DEBOUNCE_SECONDS after their last change.
+A background thread then processes due users in batches and only calls the model
+for those whose feature text actually changed (see `refresh_big_five_batch`).
+
+Scheduled users live in memory, so a periodic sweep also picks up stale rows
+left behind by a restart or by another worker process.
+"""
+
+import os
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from app.database import SessionLocal
+from app.models import BigFiveTraits
+from app.models.big_five_traits import STATUS_STALE
+from app.services.big_five_generator import refresh_big_five_batch
+from app.utils.get_current_time import get_current_time
+from sqlalchemy import or_, select
+
+logger = logging.getLogger(__name__)
+
+BIG_FIVE_REFRESH_ENABLED = os.getenv(
+    "BIG_FIVE_REFRESH_ENABLED", "true"
+).lower() in ("true", "1")
+BIG_FIVE_REFRESH_DEBOUNCE_SECONDS = float(
+    os.getenv("BIG_FIVE_REFRESH_DEBOUNCE_SECONDS", 30)
+)
+BIG_FIVE_REFRESH_BATCH_SIZE = int(os.getenv("BIG_FIVE_REFRESH_BATCH_SIZE", 100))
+BIG_FIVE_REFRESH_CONCURRENCY = int(os.getenv("BIG_FIVE_REFRESH_CONCURRENCY", 4))
+# How often to look for stale rows nobody scheduled; 0 disables the sweep
+BIG_FIVE_REFRESH_SWEEP_SECONDS = float(
+    os.getenv("BIG_FIVE_REFRESH_SWEEP_SECONDS", 300)
+)
+
+_due = {}  # user_id -> monotonic time the refresh may run
+_condition = threading.Condition()
+_thread = None
+
+
+def schedule_big_five_refresh(user_id):
+    """
+    Schedule a debounced trait refresh for a user whose inputs changed.
+
+    Scheduling again before the refresh runs pushes it back, so a burst of
+    edits results in a single recomputation.
+
+    Args:
+        user_id (int): The user to refresh.
+    """
+    if not BIG_FIVE_REFRESH_ENABLED:
+        return
+    with _condition:
+        _due[user_id] = time.monotonic() + BIG_FIVE_REFRESH_DEBOUNCE_SECONDS
+        _condition.notify()
+
+
+def _take_due_users():
+    """
+    Remove and return up to one batch of due users.
+
+    Waits until the earliest scheduled user is due, but never longer than the
+    sweep interval, so the caller may get an empty batch.
+    """
+    with _condition:
+        now = time.monotonic()
+        if not any(due <= now for due in _due.values()):
+            timeout = min(_due.values()) - now if _due else None
+            if BIG_FIVE_REFRESH_SWEEP_SECONDS > 0:
+                timeout = min(
+                    timeout or BIG_FIVE_REFRESH_SWEEP_SECONDS,
+                    BIG_FIVE_REFRESH_SWEEP_SECONDS,
+                )
+            _condition.wait(timeout)
+            now = time.monotonic()
+
+        ready = sorted(user_id for user_id, due in _due.items() if due <= now)
+        batch = ready[:BIG_FIVE_REFRESH_BATCH_SIZE]
+        for user_id in batch:
+            del _due[user_id]
+        return batch
+
+
+def _sweep_stale_users(db):
+    """
+    Schedule stale rows that are not already queued.
+
+    Rows are picked up once they have been stale for a full debounce window and
+    any retry delay from a failed refresh has passed.
+    """
+    now = get_current_time()
+    cutoff = now - timedelta(seconds=BIG_FIVE_REFRESH_DEBOUNCE_SECONDS)
+    user_ids = db.execute(
+        select(BigFiveTraits.user_id)
+        .where(
+            BigFiveTraits.status == STATUS_STALE,
+            BigFiveTraits.updated_at <= cutoff,
+            or_(
+                BigFiveTraits.next_attempt_at.is_(None),
+                BigFiveTraits.next_attempt_at <= now,
+            ),
+        )
+        .order_by(BigFiveTraits.updated_at)
+        .limit(BIG_FIVE_REFRESH_BATCH_SIZE)
+    ).scalars().all()
+    db.rollback()
+
+    with _condition:
+        queued = [user_id for user_id in user_ids if user_id not in _due]
+        for user_id in queued:
+            _due[user_id] = time.monotonic()
+    if queued:
+        logger.info(f"Big Five refresh sweep found {len(queued)} stale users")
+
+
+def _run():
+    last_sweep = float("-inf")  # Sweep once at startup
+    with ThreadPoolExecutor(max_workers=BIG_FIVE_REFRESH_CONCURRENCY) as executor:
+        while True:
+            user_ids = _take_due_users()
+            sweep = (
+                BIG_FIVE_REFRESH_SWEEP_SECONDS > 0
+                and time.monotonic() - last_sweep >= BIG_FIVE_REFRESH_SWEEP_SECONDS
+            )
+            if not user_ids and not sweep:
+                continue
+
+            db = SessionLocal()
+            try:
+                if user_ids:
+                    counts = refresh_big_five_batch(
+                        db, user_ids, map_func=executor.map, skip_unchanged=True
+                    )
+                    db.commit()
+                    logger.info(
+                        f"Big Five refresh of {len(user_ids)} users: "
+                        f"{counts['recomputed']} recomputed, "
+                        f"{counts['skipped']} unchanged, {counts['failed']} failed"
+                    )
+                if sweep:
+                    last_sweep = time.monotonic()
+                    _sweep_stale_users(db)
+            except Exception as e:
+                # Rows stay stale, so the next sweep schedules them again
+                db.rollback()
+                logger.error(f"Big Five refresh failed: {e}")
+            finally:
+                db.close()
+
+
+def start_big_five_refresher():
+    """
+    Start the daemon thread that runs scheduled Big Five refreshes.
+
+    Does nothing when BIG_FIVE_REFRESH_ENABLED is false or it is already running.
+    """
+    global _thread
+    if not BIG_FIVE_REFRESH_ENABLED or _thread is not None:
+        return _thread
+
+    _thread = threading.Thread(target=_run, name="big-five-refresher", daemon=True)
+    _thread.start()
+    logger.info(
+        f"Big Five refresher running (debounce {BIG_FIVE_REFRESH_DEBOUNCE_SECONDS}s, "
+        f"batch {BIG_FIVE_REFRESH_BATCH_SIZE})"
+    )
+    return _thread
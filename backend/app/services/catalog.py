@@ -0,0 +1,299 @@
+"""
+Versioned, hot-reloadable question and behavior catalogs.
+
+The catalog is loaded from one of three sources, chosen with CATALOG_SOURCE:
+
+- "env" (default): QUESTION_<i> / BEHAVIOR_<i> environment variables.
+- "file": a JSON or YAML document at CATALOG_FILE with "questions" and
+  "behaviors" lists.
+- "database": the most recently published row of `catalog_versions`
+  (see scripts/catalog_tool.py).
+
+Requests read an immutable `CatalogSnapshot`. Reloading builds a new snapshot
+off to the side and swaps the module-level reference, so readers never block
+and never see a half-loaded catalog. Each snapshot carries a content hash that
+is stored with submitted answers and behaviors.
+
+With several worker processes, prefer the file or database source with
+CATALOG_RELOAD_INTERVAL set: each worker polls for changes on its own, whereas
+the admin reload endpoint only reaches the worker that serves it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+
+from dotenv import load_dotenv
+
+from app.services.question_catalog import VALIDATORS, QuestionCatalog
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+CATALOG_SOURCE = os.getenv("CATALOG_SOURCE", "env").lower()
+CATALOG_FILE = os.getenv("CATALOG_FILE", "catalog.json")
+# Seconds between checks for a changed catalog file/database row; 0 disables
+CATALOG_RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", 0))
+# Seconds clients may reuse a catalog list before revalidating it with its ETag
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", 86400))
+
+
+class CatalogSnapshot:
+    """An immutable, indexed view of one catalog version."""
+
+    def __init__(self, questions, behaviors, source: str):
+        self.questions = tuple(questions)
+        self.behaviors = tuple(behaviors)
+        check_catalog(self.questions, self.behaviors)
+        self.source = source
+        self.version = catalog_version(self.questions, self.behaviors)
+        self.loaded_at = datetime.now()
+        self.question_catalog = QuestionCatalog(self.questions)
+        self.behaviors_by_id = MappingProxyType(
+            {
+                str(index): behavior
+                for index, behavior in enumerate(self.behaviors, start=1)
+            }
+        )
+        self._rendered = {}
+
+    def rendered(self, name, factory):
+        """
+        Return a derived value (e.g. a serialized response) cached for this version.
+
+        A reload publishes a new snapshot with an empty cache, so cached values
+        can never outlive the catalog they were built from.
+        """
+        value = self._rendered.get(name)
+        if value is None:
+            # Concurrent first calls may both build it; the results are identical
+            value = self._rendered.setdefault(name, factory())
+        return value
+
+    def get_behavior(self, behavior_id):
+        """Return the behavior definition for `behavior_id`, or None."""
+        return self.behaviors_by_id.get(str(behavior_id))
+
+
+def check_catalog(questions, behaviors):
+    """
+    Reject a catalog that would fail at answer time.
+
+    Raises:
+        ValueError: If a question has an unknown type or misses its text, or a
+            behavior misses its title.
+    """
+    for index, question in enumerate(questions, start=1):
+        if not question.get("question_text"):
+            raise ValueError(f"Question {index} has no question_text")
+        if question.get("question_type") not in VALIDATORS:
+            raise ValueError(
+                f"Question {index} has unknown type {question.get('question_type')}"
+            )
+    for index, behavior in enumerate(behaviors, start=1):
+        if not behavior.get("behavior_title"):
+            raise ValueError(f"Behavior {index} has no behavior_title")
+
+
+def catalog_version(questions, behaviors) -> str:
+    """Return a stable content hash identifying a catalog."""
+    canonical = json.dumps(
+        {"questions": list(questions), "behaviors": list(behaviors)},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_env_items(prefix):
+    """
+    Load numbered JSON items (PREFIX_1, PREFIX_2, ...) from the environment.
+
+    Loading stops at the first missing index.
+    """
+    items = []
+    i = 1
+    while True:
+        item_data = os.getenv(f"{prefix}_{i}")
+        if not item_data:
+            break
+        items.append(json.loads(item_data))
+        i += 1
+    return items
+
+
+def _load_document(path: Path) -> dict:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError("YAML catalogs require the PyYAML package") from e
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def _load_database_document():
+    from app.database import SessionLocal
+    from app.models.catalog import CatalogVersion
+
+    db = SessionLocal()
+    try:
+        row = db.query(CatalogVersion).order_by(CatalogVersion.id.desc()).first()
+        if not row:
+            raise RuntimeError("No catalog has been published to catalog_versions")
+        return row.document
+    finally:
+        db.close()
+
+
+def load_snapshot(source: str = None) -> CatalogSnapshot:
+    """
+    Build a new snapshot from the configured source.
+
+    Args:
+        source (str): Override for CATALOG_SOURCE.
+
+    Returns:
+        CatalogSnapshot: The freshly loaded catalog.
+    """
+    source = (source or CATALOG_SOURCE).lower()
+    if source == "env":
+        return CatalogSnapshot(
+            _load_env_items("QUESTION"), _load_env_items("BEHAVIOR"), "env"
+        )
+    if source == "file":
+        document = _load_document(Path(CATALOG_FILE))
+    elif source == "database":
+        document = _load_database_document()
+    else:
+        raise ValueError(f"Unknown CATALOG_SOURCE: {source}")
+
+    return CatalogSnapshot(
+        document.get("questions", []), document.get("behaviors", []), source
+    )
+
+
+_snapshot = None
+_reload_lock = threading.Lock()
+_publish_listeners = []
+_watcher_stop = threading.Event()
+
+
+def get_catalog() -> CatalogSnapshot:
+    """
+    Return the current catalog snapshot, loading it on first use.
+
+    Callers should fetch the snapshot once per request and use it throughout,
+    so a concurrent reload cannot mix two versions within one request.
+    """
+    snapshot = _snapshot
+    if snapshot is None:
+        snapshot, _ = reload_catalog()
+    return snapshot
+
+
+def reload_catalog():
+    """
+    Load the catalog again and atomically publish it if its content changed.
+
+    Returns:
+        tuple: (current CatalogSnapshot, True if a new version was published).
+    """
+    global _snapshot
+    # Only one reload runs at a time; readers never take this lock
+    with _reload_lock:
+        new_snapshot = load_snapshot()
+        current = _snapshot
+        if current is not None and current.version == new_snapshot.version:
+            return current, False
+        _snapshot = new_snapshot
+
+    logger.info(
+        f"Catalog version {new_snapshot.version} loaded from {new_snapshot.source}: "
+        f"{len(new_snapshot.questions)} questions, "
+        f"{len(new_snapshot.behaviors)} behaviors"
+    )
+    for listener in list(_publish_listeners):
+        try:
+            listener(new_snapshot)
+        except Exception as e:
+            logger.error(f"Catalog publish listener {listener!r} failed: {e}")
+    return new_snapshot, True
+
+
+def on_catalog_published(listener):
+    """
+    Call `listener(snapshot)` whenever a new catalog version is published.
+
+    Listeners run on the reloading thread, after the snapshot is live. Use them
+    to build derived values (e.g. `CatalogSnapshot.rendered` bodies) ahead of
+    the first request.
+    """
+    _publish_listeners.append(listener)
+
+
+def _source_marker():
+    """Cheap change indicator for the configured source, or None if unsupported."""
+    if CATALOG_SOURCE == "file":
+        try:
+            stat = os.stat(CATALOG_FILE)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    if CATALOG_SOURCE == "database":
+        from app.database import SessionLocal
+        from app.models.catalog import CatalogVersion
+
+        db = SessionLocal()
+        try:
+            return (
+                db.query(CatalogVersion.id)
+                .order_by(CatalogVersion.id.desc())
+                .scalar()
+            )
+        finally:
+            db.close()
+    return None
+
+
+def start_catalog_watcher():
+    """
+    Start a daemon thread that reloads the catalog when its source changes.
+
+    Does nothing for the env source or when CATALOG_RELOAD_INTERVAL is 0. The
+    thread exits after `stop_catalog_watcher` is called.
+    """
+    if CATALOG_SOURCE == "env" or CATALOG_RELOAD_INTERVAL <= 0:
+        return None
+
+    _watcher_stop.clear()
+
+    def watch():
+        last_marker = _source_marker()
+        while not _watcher_stop.wait(CATALOG_RELOAD_INTERVAL):
+            try:
+                marker = _source_marker()
+                if marker is not None and marker != last_marker:
+                    reload_catalog()
+                    last_marker = marker
+            except Exception as e:
+                logger.error(f"Catalog reload failed, keeping current version: {e}")
+
+    thread = threading.Thread(target=watch, name="catalog-watcher", daemon=True)
+    thread.start()
+    logger.info(
+        f"Watching {CATALOG_SOURCE} catalog every {CATALOG_RELOAD_INTERVAL}s"
+    )
+    return thread
+
+
+def stop_catalog_watcher():
+    """Make the watcher thread exit at its next wake-up instead of polling on."""
+    _watcher_stop.set()
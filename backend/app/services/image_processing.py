@@ -0,0 +1,164 @@
+"""
+Normalisation of uploaded photos before they are stored.
+
+Uploads are re-encoded in a process pool: orientation from EXIF is applied to
+the pixels, all metadata (EXIF, GPS, ICC, XMP) is dropped, the longest side is
+capped, and the result is encoded at a configurable quality and format.
+"""
+
+import asyncio
+import functools
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps, features
+
+from app.utils.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Turn off to store uploads byte-for-byte
+IMAGE_PROCESSING_ENABLED = (
+    os.getenv("IMAGE_PROCESSING_ENABLED", "true").lower() == "true"
+)
+# Longest side, in pixels, of a stored image
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", 2048))
+# Encoder quality (1-95)
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", 82))
+# Output format: JPEG, WEBP or AVIF
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()
+# Worker processes used for decoding and re-encoding
+IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", os.cpu_count() or 2))
+
+# Output format -> (content type, file extension)
+OUTPUT_FORMATS = {
+    "JPEG": ("image/jpeg", "jpg"),
+    "WEBP": ("image/webp", "webp"),
+    "AVIF": ("image/avif", "avif"),
+}
+CONTENT_TYPES_BY_EXTENSION = {ext: ctype for ctype, ext in OUTPUT_FORMATS.values()}
+
+# Byte-size buckets from 16 KB to 16 MB
+SIZE_BUCKETS = tuple(16 * 1024 * 2**i for i in range(11))
+
+IMAGE_BYTES = Histogram(
+    "media_image_bytes",
+    "Size of uploaded food images before and after processing",
+    buckets=SIZE_BUCKETS,
+    labelnames=("stage",),
+)
+
+_pool = None
+
+
+def content_type_for_key(key: str) -> str:
+    """Return the MIME type for a stored image based on its key's extension."""
+    extension = key.rsplit(".", 1)[-1].lower()
+    return CONTENT_TYPES_BY_EXTENSION.get(extension, "image/jpeg")
+
+
+@functools.lru_cache(maxsize=None)
+def output_format() -> str:
+    """
+    Return the configured output format, falling back to JPEG if unsupported.
+
+    Resolved once per process, so a missing codec is only warned about once.
+    """
+    image_format = IMAGE_FORMAT if IMAGE_FORMAT in OUTPUT_FORMATS else "JPEG"
+    if image_format in ("WEBP", "AVIF") and not features.check(image_format.lower()):
+        logger.warning(f"Pillow has no {image_format} support; storing JPEG instead")
+        image_format = "JPEG"
+    return image_format
+
+
+def process_image(
+    data: bytes,
+    image_format: str = "JPEG",
+    max_dimension: int = IMAGE_MAX_DIMENSION,
+    quality: int = IMAGE_QUALITY,
+):
+    """
+    Decode, normalise and re-encode one image. Runs inside a worker process.
+
+    Args:
+        data (bytes): The uploaded image bytes.
+        image_format (str): Output format key from OUTPUT_FORMATS.
+        max_dimension (int): Cap on the longest side in pixels.
+        quality (int): Encoder quality.
+
+    Returns:
+        tuple: (encoded bytes, content type, file extension).
+
+    Raises:
+        ValueError: If the data is not a decodable image.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as e:
+        raise ValueError("Not a valid image") from e
+
+    # Bake EXIF orientation into the pixels before the metadata is discarded
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        # Palette and grayscale images may carry transparency outside an alpha band
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+    options = {"quality": quality}
+    if image_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    elif image_format == "WEBP":
+        options.update(method=4)
+
+    # No exif/icc_profile arguments: the encoder writes a metadata-free file
+    output = io.BytesIO()
+    image.save(output, format=image_format, **options)
+
+    content_type, extension = OUTPUT_FORMATS[image_format]
+    return output.getvalue(), content_type, extension
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned workers avoid inheriting the server's threads and sockets
+        _pool = ProcessPoolExecutor(
+            max_workers=IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def process_upload(data: bytes):
+    """
+    Normalise an uploaded image in the process pool and record its sizes.
+
+    Args:
+        data (bytes): The uploaded image bytes.
+
+    Returns:
+        tuple: (stored bytes, content type, file extension).
+    """
+    IMAGE_BYTES.observe(len(data), stage="original")
+    if not IMAGE_PROCESSING_ENABLED:
+        IMAGE_BYTES.observe(len(data), stage="stored")
+        return data, "image/jpeg", "jpg"
+
+    loop = asyncio.get_running_loop()
+    processed, content_type, extension = await loop.run_in_executor(
+        _get_pool(),
+        process_image,
+        data,
+        output_format(),
+        IMAGE_MAX_DIMENSION,
+        IMAGE_QUALITY,
+    )
+    IMAGE_BYTES.observe(len(processed), stage="stored")
+    return processed, content_type, extension
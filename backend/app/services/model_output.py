@@ -0,0 +1,131 @@
+"""
+Extraction and validation of structured model output.
+
+Models are asked for a bare JSON object but often wrap it in prose, markdown
+fences or a trailing explanation. `extract_json_object` finds the first
+balanced JSON object in the reply; `parse_big_five_output` parses it with
+orjson and checks it against the Big Five schema. Every parse is counted in
+BIG_FIVE_PARSE_RESULTS by outcome so failure rates can be reported.
+"""
+
+import math
+
+import orjson
+
+from app.models.big_five_traits import BIG_FIVE_TRAITS
+from app.utils.metrics import Counter
+
+# Outcomes: ok, no_json, invalid_json, schema, model_error
+BIG_FIVE_PARSE_RESULTS = Counter(
+    "big_five_parse_total",
+    "Big Five model replies by parse outcome",
+    labelnames=("result",),
+)
+
+
+class ModelOutputError(ValueError):
+    """A model reply that does not contain the expected structured output."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+
+
+def extract_json_object(text: str):
+    """
+    Return the first balanced `{...}` substring of `text`, or None.
+
+    Braces inside JSON strings (including escaped quotes) are ignored, so a
+    value such as "a } b" does not end the object early.
+    """
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start : index + 1]
+        # Unbalanced from this brace; try the next one
+        start = text.find("{", start + 1)
+    return None
+
+
+def _validate_big_five(document):
+    if not isinstance(document, dict):
+        raise ModelOutputError("schema", "Model output is not a JSON object")
+
+    scores = {str(key).strip().lower(): value for key, value in document.items()}
+    result = {}
+    for trait in BIG_FIVE_TRAITS:
+        value = scores.get(trait)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ModelOutputError("schema", f"Missing or non-numeric {trait} score")
+        value = float(value)
+        if not math.isfinite(value) or not 0.0 <= value <= 1.0:
+            raise ModelOutputError("schema", f"{trait} score {value} is outside [0, 1]")
+        result[trait] = value
+    return result
+
+
+def parse_big_five_output(text: str) -> dict:
+    """
+    Parse a model reply into the five Big Five scores.
+
+    Args:
+        text (str): The raw model reply.
+
+    Returns:
+        dict: The five trait names mapped to floats in [0, 1]; other keys
+              are dropped.
+
+    Raises:
+        ModelOutputError: With `reason` "no_json", "invalid_json" or "schema".
+    """
+    try:
+        candidate = extract_json_object(text or "")
+        if candidate is None:
+            raise ModelOutputError("no_json", "No JSON object in model output")
+        try:
+            document = orjson.loads(candidate)
+        except orjson.JSONDecodeError as e:
+            raise ModelOutputError("invalid_json", f"Malformed JSON: {e}")
+        scores = _validate_big_five(document)
+    except ModelOutputError as e:
+        BIG_FIVE_PARSE_RESULTS.inc(result=e.reason)
+        raise
+
+    BIG_FIVE_PARSE_RESULTS.inc(result="ok")
+    return scores
+
+
+def parse_stats():
+    """
+    Summarise Big Five parse outcomes since the process started.
+
+    Returns:
+        dict: Counts per outcome, the total and the failure rate.
+    """
+    counts = {key[0]: count for key, count in BIG_FIVE_PARSE_RESULTS.snapshot().items()}
+    total = sum(counts.values())
+    failures = total - counts.get("ok", 0)
+    return {
+        "counts": counts,
+        "total": total,
+        "failure_rate": failures / total if total else 0.0,
+    }
@@ -1,7 +1,9 @@
 import logging
 from models.llm_manager import (
+    TipExtractor,
     generate_tip,
     predict_dominant_trait,
+    stream_tip,
     # predict_dominant_trait_from_text,
 )
 
@@ -9,12 +11,8 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
-def generate_result(prompt: str, model: str) -> str:
-    """
-    Backward-compatible shim for older code that expected Ollama HTTP responses.
-    It now routes requests to local models (SmolLM + MLP).
-    """
-
+def _parse_prompt(prompt: str):
+    """Return (trait, behavior) named in an Ollama-style prompt, or defaults."""
     # Default fallbacks
     trait = "Conscientiousness"
     behavior = "balanced eating"
@@ -29,6 +27,15 @@ def generate_result(prompt: str, model: str) -> str:
                 behavior = ln.split(":", 1)[1].strip() or behavior
     except Exception as e:
         logger.warning(f"Prompt parsing fallback used: {e}")
+    return trait, behavior
+
+
+def generate_result(prompt: str, model: str) -> str:
+    """
+    Backward-compatible shim for older code that expected Ollama HTTP responses.
+    It now routes requests to local models (SmolLM + MLP).
+    """
+    trait, behavior = _parse_prompt(prompt)
 
     try:
         # Generate personalized tip using SmolLM
@@ -39,6 +46,26 @@ def generate_result(prompt: str, model: str) -> str:
         return f"Tip generation failed due to: {str(e)}"
 
 
+def stream_result(prompt: str, model: str):
+    """
+    `generate_result`, streamed: yields the reply in pieces as the LLM writes it.
+
+    Joined, the pieces equal what `generate_result` returns. A failure after the
+    first piece is raised.
+    """
+    trait, behavior = _parse_prompt(prompt)
+    extractor = TipExtractor()
+    for delta in stream_tip(trait, behavior):
+        piece = extractor.feed(delta)
+        if piece:
+            yield piece
+        if extractor.done:
+            break  # Closing the stream lets the server stop generating
+    piece = extractor.finish()
+    if piece:
+        yield piece
+
+
 # Explicit helper for new code
 def generate_mindful_tip(trait: str, behavior_text: str) -> str:
     """Directly generate a mindful eating tip."""
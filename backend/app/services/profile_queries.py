@@ -0,0 +1,188 @@
+"""
+SQL-side filtering over stored answers and Big Five traits.
+
+Predicates are pushed into the database rather than loading every row and
+inspecting it in Python. On Postgres the answer filters are JSONB containment
+(`@>`) served by the GIN indexes on `question_answers.question_data`, and trait
+ranges compare `CAST(big_five_data ->> 'trait' AS FLOAT)`, which matches the
+per-trait expression indexes. SQLite (used by tests and benchmarks) gets an
+equivalent json_each/json_extract translation.
+"""
+
+import math
+
+from sqlalchemy import and_, exists, func, or_, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from app.models import BigFiveTraits, QuestionAnswer
+from app.models.big_five_traits import BIG_FIVE_TRAITS
+
+
+def _json_path_key(key) -> str:
+    key = str(key)
+    if '"' in key or "\\" in key:
+        raise ValueError(f"Unsupported JSON key: {key}")
+    return f'"{key}"'
+
+
+def _sqlite_contains(column, path, value):
+    """
+    SQLite rendition of Postgres `@>` for the value at `path`.
+
+    Dicts match key by key, lists match when every element is present, and a
+    scalar matches either an equal scalar or an array holding it.
+    """
+    if isinstance(value, dict):
+        return and_(
+            *(
+                _sqlite_contains(column, f"{path}.{_json_path_key(k)}", v)
+                for k, v in value.items()
+            )
+        )
+    if isinstance(value, list):
+        return and_(*(_sqlite_contains(column, path, v) for v in value))
+    # json_each yields the scalar itself, or each element of an array
+    elements = func.json_each(column, path).table_valued("value")
+    return exists(select(1).select_from(elements).where(elements.c.value == value))
+
+
+def _answer_forms(answer):
+    """
+    The JSON values a query-string answer may be stored as.
+
+    NUMBER and SLIDER answers are stored as submitted, either "5" or 5, and
+    JSON comparisons are type-strict, so a numeric string also matches the
+    number.
+    """
+    if not isinstance(answer, str):
+        return [answer]
+    for parse in (int, float):
+        try:
+            number = parse(answer)
+        except ValueError:
+            continue
+        # JSON has no NaN or infinity
+        return [answer, number] if math.isfinite(number) else [answer]
+    return [answer]
+
+
+def answer_filter(dialect: str, question_id, answer):
+    """
+    Predicate for "the user's answer to `question_id` contains `answer`".
+
+    Args:
+        dialect (str): The database dialect name.
+        question_id: The question ID answers are stored under.
+        answer: A scalar matches a single answer or one of several selected
+            options; a numeric string also matches the number. A dict matches
+            the given keys of a structured answer.
+    """
+    question_id = str(question_id)
+    column = QuestionAnswer.question_data
+
+    if dialect == "postgresql":
+        document = type_coerce(column, JSONB)
+        predicates = []
+        for form in _answer_forms(answer):
+            predicates.append(document.contains({question_id: {"answer": form}}))
+            if not isinstance(form, (dict, list)):
+                # Containment only unwraps top-level arrays, so match list answers
+                predicates.append(
+                    document.contains({question_id: {"answer": [form]}})
+                )
+        return or_(*predicates)
+
+    path = f"$.{_json_path_key(question_id)}.answer"
+    return or_(
+        *(_sqlite_contains(column, path, form) for form in _answer_forms(answer))
+    )
+
+
+def trait_filter(ranges: dict, dominant: str = None):
+    """
+    Predicate for Big Five scores within inclusive ranges.
+
+    Args:
+        ranges (dict): trait -> (minimum or None, maximum or None).
+        dominant (str): Optionally require this to be the user's highest trait.
+
+    Raises:
+        ValueError: If a trait name is unknown.
+    """
+    conditions = []
+    for trait, (minimum, maximum) in ranges.items():
+        if trait not in BIG_FIVE_TRAITS:
+            raise ValueError(f"Unknown trait: {trait}")
+        score = BigFiveTraits.big_five_data[trait].as_float()
+        if minimum is not None:
+            conditions.append(score >= minimum)
+        if maximum is not None:
+            conditions.append(score <= maximum)
+    if dominant is not None:
+        if dominant not in BIG_FIVE_TRAITS:
+            raise ValueError(f"Unknown trait: {dominant}")
+        conditions.append(BigFiveTraits.max_value == dominant)
+    return and_(*conditions)
+
+
+def _page(db: Session, model, predicate, limit: int, offset: int):
+    total = db.execute(
+        select(func.count()).select_from(model).where(predicate)
+    ).scalar_one()
+    user_ids = (
+        db.execute(
+            select(model.user_id)
+            .where(predicate)
+            .order_by(model.user_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        .scalars()
+        .all()
+    )
+    return {"total": total, "user_ids": user_ids}
+
+
+def find_users_by_answer(
+    db: Session, question_id, answer, limit: int = 100, offset: int = 0
+):
+    """
+    Find users whose answer to a question contains `answer`.
+
+    Returns:
+        dict: The total number of matches and one page of user IDs.
+    """
+    predicate = answer_filter(db.get_bind().dialect.name, question_id, answer)
+    return _page(db, QuestionAnswer, predicate, limit, offset)
+
+
+def find_users_by_traits(
+    db: Session, ranges: dict, dominant: str = None, limit: int = 100, offset: int = 0
+):
+    """
+    Find users whose Big Five scores fall within the given ranges.
+
+    Returns:
+        dict: The total number of matches and one page of user IDs.
+    """
+    return _page(db, BigFiveTraits, trait_filter(ranges, dominant), limit, offset)
+
+
+def answer_distribution(db: Session, question_id):
+    """
+    Count users per answer to one question, extracting only that answer in SQL.
+
+    Multi-select answers are counted per distinct combination.
+
+    Returns:
+        list: (answer, count) pairs, most common first.
+    """
+    answer = QuestionAnswer.question_data[(str(question_id), "answer")].as_string()
+    rows = db.execute(
+        select(answer.label("answer"), func.count().label("count"))
+        .where(answer.is_not(None))
+        .group_by(answer)
+        .order_by(func.count().desc())
+    ).all()
+    return [(row.answer, row.count) for row in rows]
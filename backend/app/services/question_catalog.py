@@ -0,0 +1,214 @@
+"""
+Precompiled question catalog used to validate survey submissions.
+
+Each question is compiled once into a validator for its question type, so
+validating an answer is a dictionary lookup plus one function call.
+"""
+
+from types import MappingProxyType
+from typing import Any, Callable, NamedTuple
+
+
+class AnswerValidationError(Exception):
+    """Raised when a submitted answer does not fit its question."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class CompiledQuestion(NamedTuple):
+    id: str
+    question_text: str
+    question_type: str
+    validate: Callable[[Any], Any]
+
+
+# question_type -> factory(question_json) -> validate(answer) -> stored answer value
+VALIDATORS = {}
+
+
+def register_validator(*question_types):
+    """Register a validator factory for one or more question types."""
+
+    def decorator(factory):
+        for question_type in question_types:
+            VALIDATORS[question_type] = factory
+        return factory
+
+    return decorator
+
+
+def _contains(options: frozenset, value) -> bool:
+    try:
+        return value in options
+    except TypeError:  # Unhashable answer (e.g. a list for a single-choice question)
+        return False
+
+
+@register_validator("TEXT")
+def _text_validator(question):
+    def validate(answer):
+        return answer  # Free text response
+
+    return validate
+
+
+@register_validator("RADIO", "DROPDOWN")
+def _single_choice_validator(question):
+    options = frozenset(question["options"])
+
+    def validate(answer):
+        if not _contains(options, answer):
+            raise AnswerValidationError("Invalid selection")
+        return answer
+
+    return validate
+
+
+@register_validator("MULTI_SELECT_DROPDOWN")
+def _multi_choice_validator(question):
+    options = frozenset(question["options"])
+
+    def validate(answer):
+        # Expecting list input
+        try:
+            valid = options.issuperset(answer)
+        except TypeError:
+            valid = False
+        if not valid:
+            raise AnswerValidationError("Invalid selection")
+        return answer
+
+    return validate
+
+
+@register_validator("NUMBER", "SLIDER")
+def _range_validator(question):
+    min_val, max_val = question["range"]
+
+    def validate(answer):
+        try:
+            value = int(answer)
+        except (TypeError, ValueError):
+            raise AnswerValidationError("Value out of range")
+        if not (min_val <= value <= max_val):
+            raise AnswerValidationError("Value out of range")
+        return answer
+
+    return validate
+
+
+@register_validator("DROPDOWN_TEXT")
+def _dropdown_text_validator(question):
+    options = frozenset(question["options"])
+
+    def validate(answer):
+        # Expecting {selected option, text}
+        try:
+            selected_option, text_value = answer.values()
+        except (AttributeError, ValueError):
+            raise AnswerValidationError("Invalid selection")
+        if not _contains(options, selected_option):
+            raise AnswerValidationError("Invalid selection")
+        return {"selected_option": selected_option, "text": text_value}
+
+    return validate
+
+
+@register_validator("DROPDOWN_CHECKBOX")
+def _dropdown_checkbox_validator(question):
+    options = frozenset(question["options"])
+    checkbox_options = frozenset(question["checkbox_options"])
+
+    def validate(answer):
+        # Expecting {selected option, list of checked values}
+        try:
+            selected_option, checkboxes = answer.values()
+        except (AttributeError, ValueError):
+            raise AnswerValidationError("Invalid selection")
+        if not _contains(options, selected_option):
+            raise AnswerValidationError("Invalid selection")
+        try:
+            valid_checkboxes = checkbox_options.issuperset(checkboxes)
+        except TypeError:
+            valid_checkboxes = False
+        if not valid_checkboxes:
+            raise AnswerValidationError("Invalid checkbox selection")
+        return {"selected_option": selected_option, "checkboxes": checkboxes}
+
+    return validate
+
+
+def _invalid_type_validator(question):
+    def validate(answer):
+        raise AnswerValidationError("Invalid question type")
+
+    return validate
+
+
+def compile_question(question_id: str, question: dict) -> CompiledQuestion:
+    """
+    Compile one question definition into its validator.
+
+    Args:
+        question_id (str): The ID answers refer to.
+        question (dict): The question definition (question_text, question_type, options...).
+
+    Returns:
+        CompiledQuestion: The question with its bound validator.
+    """
+    question_type = question.get("question_type")
+    factory = VALIDATORS.get(question_type, _invalid_type_validator)
+    return CompiledQuestion(
+        id=question_id,
+        question_text=question["question_text"],
+        question_type=question_type,
+        validate=factory(question),
+    )
+
+
+class QuestionCatalog:
+    """Immutable, ID-indexed set of compiled questions."""
+
+    def __init__(self, questions):
+        """
+        Args:
+            questions (list[dict]): Question definitions in display order. The
+                question answered as `question_id` N is the N-th entry.
+        """
+        self.questions = tuple(questions)
+        self._by_id = MappingProxyType(
+            {
+                str(index): compile_question(str(index), question)
+                for index, question in enumerate(self.questions, start=1)
+            }
+        )
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def get(self, question_id):
+        """Return the compiled question for `question_id`, or None."""
+        return self._by_id.get(str(question_id))
+
+    def validate(self, question_id, answer):
+        """
+        Validate one answer.
+
+        Args:
+            question_id (int | str): The answered question's ID.
+            answer: The submitted answer.
+
+        Returns:
+            tuple: (question text, answer value to store).
+
+        Raises:
+            AnswerValidationError: If the question is unknown (404) or the answer
+                is invalid for it (400).
+        """
+        question = self._by_id.get(str(question_id))
+        if question is None:
+            raise AnswerValidationError("Question not found", status_code=404)
+        return question.question_text, question.validate(answer)
@@ -5,11 +5,10 @@ from datetime import datetime, date
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import UserBehavior, UserGoal, UserTips
+from app.pubsub import get_broker, publish
 from app.utils.get_current_time import get_current_time
-from models.llm_manager import (
-    predict_dominant_trait,
-    generate_tip,
-)
+from app.services.trait_resolver import resolve_dominant_trait
+from models.llm_manager import TipExtractor, generate_tip, stream_tip
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,16 +17,45 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 MOCK = os.getenv("MOCK", "false").lower() in ("true", "True")
+# Stream tips from the LLM and publish them piece by piece (see stream_tip)
+TIP_LLM_STREAM = os.getenv("TIP_LLM_STREAM", "true").lower() in ("true", "1")
+
+# A running generation holds a marker on the pub/sub broker, so every worker
+# sharing the broker sees it. It expires after this many seconds should the
+# worker die mid-generation.
+TIP_GENERATION_TTL = float(os.getenv("TIP_GENERATION_TTL", 300))
+
+
+def tips_topic(user_id):
+    """Pub/sub topic on which a user's finished tip generations are announced."""
+    return f"tips:{user_id}"
+
+
+def _generating_key(user_id):
+    return f"tips-generating:{user_id}"
+
+
+def _rerun_key(user_id):
+    """Set when the goal changes while a generation runs."""
+    return f"tips-rerun:{user_id}"
+
+
+def tip_generation_in_progress(user_id):
+    """Whether a worker sharing the broker is generating a tip for `user_id`."""
+    return get_broker().is_claimed(_generating_key(user_id))
+
+
+INVISIBLE_CHARS = r"[\u200b\u200c\u200d\u202a-\u202e]"
+UNUSUAL_SPACES = r"[\xa0\u1680\u180e\u2000-\u200f\u2028-\u202f\u205f\u3000\ufeff]"
+DISALLOWED_CHARS = r"[^a-zA-Z0-9,.!?;:\"'\-–—\s]"
 
 
 def clean_text(text, preserve_paragraphs=False):
     if not text:
         return text
 
-    text = re.sub(r"[\u200b\u200c\u200d\u202a-\u202e]", "", text)
-    text = re.sub(
-        r"[\xa0\u1680\u180e\u2000-\u200f\u2028-\u202f\u205f\u3000\ufeff]", " ", text
-    )
+    text = re.sub(INVISIBLE_CHARS, "", text)
+    text = re.sub(UNUSUAL_SPACES, " ", text)
     text = text.replace("\r\n", "\n").replace("\r", "\n")
 
     if preserve_paragraphs:
@@ -36,10 +64,49 @@ def clean_text(text, preserve_paragraphs=False):
     else:
         text = re.sub(r"\s+", " ", text)
 
-    text = re.sub(r"[^a-zA-Z0-9,.!?;:\"'\-–—\s]", "", text)
+    text = re.sub(DISALLOWED_CHARS, "", text)
     return text.strip()
 
 
+class StreamingCleaner:
+    """
+    `clean_text(text)` applied to text arriving in pieces.
+
+    `feed` each piece and then call `finish`; the returned pieces, joined, equal
+    `clean_text` of the whole text. Only trailing whitespace is held back, so
+    words are returned as soon as they arrive.
+    """
+
+    def __init__(self):
+        self._ends_with_space = False  # Before filtering, for the collapse
+        self._started = False
+        self._held = ""  # Trailing spaces the final strip may remove
+
+    def feed(self, text):
+        text = re.sub(INVISIBLE_CHARS, "", text or "")
+        text = re.sub(r"\s+", " ", re.sub(UNUSUAL_SPACES, " ", text))
+        if self._ends_with_space and text.startswith(" "):
+            text = text[1:]
+        if not text:
+            return ""
+        self._ends_with_space = text.endswith(" ")
+
+        text = re.sub(DISALLOWED_CHARS, "", text)
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        text = self._held + text
+        piece = text.rstrip()
+        self._held = text[len(piece) :]
+        return piece
+
+    def finish(self):
+        self._held = ""
+        return ""
+
+
 def store_tips(user_id, tips_text, db):
     today = date.today()
     existing_tip = (
@@ -65,8 +132,80 @@ def store_tips(user_id, tips_text, db):
         logger.info(f"New tip stored for user {user_id} on {today}.")
 
 
-def generate_user_tips(user_id, db):
-    """Generate tip ONLY if goal exists for today."""
+def generate_user_tips(user_id, db, rerun_if_running=True):
+    """
+    Generate, store and publish today's tip, ONLY if a goal exists for today.
+
+    One generation per user runs at a time across the workers sharing the
+    pub/sub broker. A call made while one is running returns at once; with
+    `rerun_if_running` (a changed goal) the running generation starts over, so
+    the tip matches the latest goal. The outcome is published on
+    `tips_topic(user_id)` as {"event": "tip", "tips_text": ...},
+    {"event": "no_goal"} or {"event": "failed"}.
+
+    With TIP_LLM_STREAM, the first generation streams from the LLM and also
+    publishes each cleaned piece of the tip as {"event": "token", "text": ...}
+    as it arrives. Reruns are not streamed, so the final message is the one
+    carrying the stored text.
+
+    Returns:
+        dict | None: The published message, or None if another generation was
+            running or took over.
+    """
+    broker = get_broker()
+    generating, rerun = _generating_key(user_id), _rerun_key(user_id)
+    token = broker.claim(generating, TIP_GENERATION_TTL)
+    if token is None:
+        if rerun_if_running:
+            broker.claim(rerun, TIP_GENERATION_TTL)
+        logger.info(f"Tip generation already running for user {user_id}.")
+        return None
+    # This run reads the latest goal; earlier rerun requests are covered
+    broker.release(rerun)
+
+    stream = TIP_LLM_STREAM
+    while True:
+        try:
+            message = _generate_user_tip(user_id, db, stream)
+        finally:
+            # Not a newer holder's marker, should this run outlive the TTL
+            broker.release(generating, token)
+        stream = False
+        # Rerun requests can only arrive while the marker is held
+        if not broker.release(rerun):
+            break
+        token = broker.claim(generating, TIP_GENERATION_TTL)
+        if token is None:
+            return None  # Another call started over; it publishes the outcome
+    # After the tip is stored, so late subscribers find it in the database
+    publish(tips_topic(user_id), message)
+    return message
+
+
+def _streamed_tip(user_id, dominant_trait, behavior_title):
+    """Stream a tip through both cleaning steps, publishing each piece."""
+    extractor, cleaner, pieces = TipExtractor(), StreamingCleaner(), []
+
+    def forward(text):
+        piece = cleaner.feed(text)
+        if piece:
+            pieces.append(piece)
+            publish(tips_topic(user_id), {"event": "token", "text": piece})
+
+    if MOCK:
+        forward("Remember to hydrate and appreciate each bite today.")
+    else:
+        for delta in stream_tip(dominant_trait, behavior_title):
+            forward(extractor.feed(delta))
+            if extractor.done:
+                break  # Closing the stream lets the server stop generating
+        forward(extractor.finish())
+    cleaner.finish()
+    return "".join(pieces)
+
+
+def _generate_user_tip(user_id, db, stream=False):
+    """Generate and store one tip; returns the message announcing the outcome."""
     try:
         today = date.today()
 
@@ -83,7 +222,7 @@ def generate_user_tips(user_id, db):
 
         if not goal:
             logger.info(f"No goal found for user {user_id}. Skipping tip generation.")
-            return
+            return {"event": "no_goal"}
 
         user_goal = goal.goal_text or ""
 
@@ -95,31 +234,39 @@ def generate_user_tips(user_id, db):
         )
         behavior_title = behavior.behavior_title if behavior else "general mindful eating"
 
-        # Predict personality
+        # Resolve personality: stored Big Five, cached prediction, or trait service
         try:
-            trait_result = predict_dominant_trait(user_goal or behavior_title)
-            dominant_trait = trait_result["dominant_trait"]
-            logger.info(f"Predicted dominant trait for user {user_id}: {dominant_trait}")
+            dominant_trait, source = resolve_dominant_trait(
+                db, user_id, user_goal or behavior_title
+            )
+            logger.info(
+                f"Dominant trait for user {user_id}: {dominant_trait} (from {source})"
+            )
         except Exception as e:
+            db.rollback()
             dominant_trait = "Conscientiousness"
             logger.warning(f"Trait prediction failed for user {user_id}. Error: {e}")
 
         # Generate tip
         try:
-            if MOCK:
-                tip_text = "Remember to hydrate and appreciate each bite today."
+            if stream:
+                cleaned = _streamed_tip(user_id, dominant_trait, behavior_title)
             else:
-                tip_text = generate_tip(dominant_trait, behavior_title)
-
-            cleaned = clean_text(tip_text)
+                if MOCK:
+                    tip_text = "Remember to hydrate and appreciate each bite today."
+                else:
+                    tip_text = generate_tip(dominant_trait, behavior_title)
+                cleaned = clean_text(tip_text)
             store_tips(user_id, cleaned, db)
 
             logger.info(
                 f"Generated Tip | UserID={user_id} | Trait={dominant_trait} | Behavior='{behavior_title}' | Goal='{user_goal[:60]}' | Tip={cleaned}"
             )
+            return {"event": "tip", "tips_text": cleaned}
 
         except Exception as e:
             logger.error(f"Failed to generate or store tip for user {user_id}: {e}")
 
     except Exception as e:
-        logger.error(f"Unexpected error in generate_user_tips for user {user_id}: {e}")
\ No newline at end of file
+        logger.error(f"Unexpected error in generate_user_tips for user {user_id}: {e}")
+    return {"event": "failed"}
\ No newline at end of file
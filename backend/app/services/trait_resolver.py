@@ -0,0 +1,186 @@
+"""
+Dominant-trait resolution for tip generation.
+
+The user's stored Big Five result is used when there is one. Otherwise the
+remote trait service is asked to predict a trait from the goal text, and its
+answer is cached per user and normalized text for TRAIT_CACHE_TTL_SECONDS, so
+an unchanged goal does not trigger another remote call.
+
+Every resolution is counted per day and source in `trait_resolution_days`;
+resolutions from the Big Five row or the cache are trait-service calls avoided.
+"""
+
+import os
+import re
+import hashlib
+import logging
+from datetime import timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import BigFiveTraits, TraitPrediction, TraitResolutionDay
+from app.models.types import dialect_insert
+from app.utils.get_current_time import get_current_time
+from app.utils.metrics import Counter
+from models.llm_manager import predict_dominant_trait
+
+logger = logging.getLogger(__name__)
+
+TRAIT_CACHE_TTL_SECONDS = int(os.getenv("TRAIT_CACHE_TTL_SECONDS", 7 * 86400))
+TRAIT_PREFER_BIG_FIVE = os.getenv("TRAIT_PREFER_BIG_FIVE", "true").lower() in (
+    "true",
+    "1",
+)
+DEFAULT_DOMINANT_TRAIT = "Conscientiousness"
+
+SOURCE_BIG_FIVE = "big_five"
+SOURCE_CACHE = "cache"
+SOURCE_SERVICE = "service"
+SOURCE_FALLBACK = "fallback"  # The trait service failed; nothing was cached
+AVOIDED_SOURCES = (SOURCE_BIG_FIVE, SOURCE_CACHE)
+
+TRAIT_RESOLUTIONS = Counter(
+    "trait_resolutions_total",
+    "Dominant-trait resolutions for tips, by source",
+    labelnames=("source",),
+)
+
+
+def normalize_goal_text(text):
+    """Lowercase and collapse whitespace so trivial edits share a cache entry."""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def goal_text_hash(text):
+    return hashlib.sha256(normalize_goal_text(text).encode("utf-8")).hexdigest()
+
+
+def _stored_big_five_trait(db: Session, user_id):
+    max_value = db.execute(
+        select(BigFiveTraits.max_value).where(
+            BigFiveTraits.user_id == user_id,
+            BigFiveTraits.big_five_data.is_not(None),
+        )
+    ).scalar()
+    return max_value.capitalize() if max_value else None
+
+
+def _cached_prediction(db: Session, user_id, text_hash):
+    return db.execute(
+        select(TraitPrediction.dominant_trait).where(
+            TraitPrediction.user_id == user_id,
+            TraitPrediction.text_hash == text_hash,
+            TraitPrediction.expires_at > get_current_time(),
+        )
+    ).scalar()
+
+
+def _store_prediction(db: Session, user_id, text_hash, result):
+    now = get_current_time()
+    statement = dialect_insert(db)(TraitPrediction).values(
+        user_id=user_id,
+        text_hash=text_hash,
+        dominant_trait=result["dominant_trait"],
+        trait_scores=result.get("trait_scores"),
+        created_at=now,
+        expires_at=now + timedelta(seconds=TRAIT_CACHE_TTL_SECONDS),
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[TraitPrediction.user_id, TraitPrediction.text_hash],
+            set_={
+                "dominant_trait": statement.excluded.dominant_trait,
+                "trait_scores": statement.excluded.trait_scores,
+                "created_at": statement.excluded.created_at,
+                "expires_at": statement.excluded.expires_at,
+            },
+        )
+    )
+
+
+def _count_resolution(db: Session, source):
+    TRAIT_RESOLUTIONS.inc(source=source)
+    statement = dialect_insert(db)(TraitResolutionDay).values(
+        day=get_current_time().date(), source=source, count=1
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[TraitResolutionDay.day, TraitResolutionDay.source],
+            set_={"count": TraitResolutionDay.count + 1},
+        )
+    )
+
+
+def resolve_dominant_trait(db: Session, user_id, text):
+    """
+    Resolve the dominant trait used to personalize a user's tip.
+
+    Prefers the stored Big Five result, then a fresh cached prediction for the
+    same normalized text, and only then calls the trait service. A failed call
+    falls back to the default trait and is not cached. Commits its writes.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): The user the tip is for.
+        text (str): The goal text (or behavior title) to predict from.
+
+    Returns:
+        tuple: (dominant trait, source it was resolved from).
+    """
+    dominant_trait = None
+    if TRAIT_PREFER_BIG_FIVE:
+        dominant_trait = _stored_big_five_trait(db, user_id)
+    source = SOURCE_BIG_FIVE
+
+    if dominant_trait is None:
+        text_hash = goal_text_hash(text)
+        dominant_trait = _cached_prediction(db, user_id, text_hash)
+        source = SOURCE_CACHE
+
+        if dominant_trait is None:
+            result = predict_dominant_trait(text)
+            # The client reports failures as the default trait without scores
+            if result.get("trait_scores"):
+                _store_prediction(db, user_id, text_hash, result)
+                dominant_trait, source = result["dominant_trait"], SOURCE_SERVICE
+            else:
+                logger.warning(f"Trait service gave no prediction for user {user_id}")
+                dominant_trait, source = DEFAULT_DOMINANT_TRAIT, SOURCE_FALLBACK
+
+    _count_resolution(db, source)
+    db.commit()
+    return dominant_trait, source
+
+
+def trait_resolution_report(db: Session, days=7):
+    """
+    Summarize trait resolutions per day for the last `days` days.
+
+    Returns:
+        list[dict]: One entry per day (newest first) with counts per source,
+        the trait-service calls made and the calls avoided.
+    """
+    since = get_current_time().date() - timedelta(days=days - 1)
+    rows = db.execute(
+        select(
+            TraitResolutionDay.day,
+            TraitResolutionDay.source,
+            TraitResolutionDay.count,
+        )
+        .where(TraitResolutionDay.day >= since)
+        .order_by(TraitResolutionDay.day.desc())
+    ).all()
+
+    report = {}
+    for day, source, count in rows:
+        entry = report.setdefault(day, {"day": day.isoformat(), "sources": {}})
+        entry["sources"][source] = count
+    for entry in report.values():
+        sources = entry["sources"]
+        entry["service_calls"] = sources.get(SOURCE_SERVICE, 0) + sources.get(
+            SOURCE_FALLBACK, 0
+        )
+        entry["calls_avoided"] = sum(sources.get(s, 0) for s in AVOIDED_SOURCES)
+    return list(report.values())
+
@@ -0,0 +1,82 @@
+import hashlib
+import hmac
+import os
+
+from app.storage.base import BlobStorage
+from app.storage.local import LocalStorage
+
+# Which backend holds user media: "local" (filesystem) or "s3" (S3-compatible)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+
+# Root directory for all user media when using the local backend
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "Images")
+
+# Lifetime of presigned/signed media URLs handed to clients, in seconds
+MEDIA_URL_EXPIRES = int(os.getenv("MEDIA_URL_EXPIRES", 3600))
+
+# Key for signing local /media URLs, kept apart from the JWT SECRET_KEY so the
+# two can be rotated independently. Unset, a key derived from SECRET_KEY is used.
+MEDIA_SIGNING_KEY = os.getenv("MEDIA_SIGNING_KEY")
+
+# Keep embedding base64 image bytes in JSON responses alongside the URLs.
+# Turn off once every client loads images from `image_url` instead.
+INLINE_IMAGE_BASE64 = os.getenv("INLINE_IMAGE_BASE64", "true").lower() == "true"
+
+_storage = None
+
+
+def _media_signing_key() -> str:
+    if MEDIA_SIGNING_KEY:
+        return MEDIA_SIGNING_KEY
+    from app.database import settings
+
+    # Never the JWT secret itself: a URL signature must not be a token signature
+    return hmac.new(
+        settings.secret_key.encode("utf-8"), b"media-url-signing", hashlib.sha256
+    ).hexdigest()
+
+
+def _create_storage() -> BlobStorage:
+    if STORAGE_BACKEND == "s3":
+        from app.storage.s3 import S3Storage
+
+        return S3Storage(
+            bucket=os.getenv("S3_BUCKET", "mindful-eating-media"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            access_key=os.getenv("S3_ACCESS_KEY_ID"),
+            secret_key=os.getenv("S3_SECRET_ACCESS_KEY"),
+            region=os.getenv("S3_REGION", "us-east-1"),
+            prefix=os.getenv("S3_PREFIX", ""),
+        )
+    if STORAGE_BACKEND == "local":
+        return LocalStorage(MEDIA_ROOT, signing_key=_media_signing_key())
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
+
+def get_storage() -> BlobStorage:
+    """
+    Return the process-wide media storage backend, creating it on first use.
+
+    Returns:
+        BlobStorage: The configured storage implementation.
+    """
+    global _storage
+    if _storage is None:
+        _storage = _create_storage()
+    return _storage
+
+
+def media_url(key: str):
+    """
+    Return a time-limited URL clients can use to GET the object at `key`.
+
+    Args:
+        key (str): Storage key of the object.
+
+    Returns:
+        str | None: The URL, or None when the backend cannot sign URLs.
+    """
+    try:
+        return get_storage().url(key, MEDIA_URL_EXPIRES)
+    except Exception:
+        return None
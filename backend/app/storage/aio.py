@@ -0,0 +1,111 @@
+"""
+Async wrappers around the media storage backend.
+
+Blocking storage calls run on a dedicated thread pool rather than the request
+threadpool, so slow disks or object stores do not starve request handling.
+Every call records its latency in the `media_io_seconds` histogram.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from app.storage import get_storage
+from app.utils.metrics import MEDIA_IO_SECONDS
+
+# Threads dedicated to media I/O across the whole process
+MEDIA_IO_WORKERS = int(os.getenv("MEDIA_IO_WORKERS", 16))
+
+# Maximum concurrent reads issued while building a single response
+MEDIA_IO_CONCURRENCY = int(os.getenv("MEDIA_IO_CONCURRENCY", 8))
+
+_executor = ThreadPoolExecutor(
+    max_workers=MEDIA_IO_WORKERS, thread_name_prefix="media-io"
+)
+
+
+def _timed(operation, func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        MEDIA_IO_SECONDS.observe(time.perf_counter() - start, operation=operation)
+
+
+async def _run(operation, func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _timed, operation, func, *args)
+
+
+def _read_file(path) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+async def read(key: str) -> bytes:
+    """Read the object stored under `key`."""
+    return await _run("read", get_storage().get, key)
+
+
+async def read_path(path) -> bytes:
+    """Read a plain file by path (used for media saved before the storage backend)."""
+    return await _run("read", _read_file, path)
+
+
+async def write(key: str, data: bytes, content_type: str = "image/jpeg") -> None:
+    """Store `data` under `key`."""
+    await _run("write", get_storage().put, key, data, content_type)
+
+
+async def stage(data: bytes):
+    """Stage `data` for a later `commit_staged` (see BlobStorage.stage)."""
+    return await _run("write", get_storage().stage, data)
+
+
+async def commit_staged(staged, key: str, content_type: str = "image/jpeg") -> None:
+    """Publish a staged object under `key`."""
+    await _run("commit", get_storage().commit_staged, staged, key, content_type)
+
+
+async def discard_staged(staged) -> None:
+    """Drop a staged object."""
+    await _run("delete", get_storage().discard_staged, staged)
+
+
+async def exists(key: str) -> bool:
+    """Return True if an object is stored under `key`."""
+    return await _run("stat", get_storage().exists, key)
+
+
+async def delete(key: str) -> None:
+    """Remove the object stored under `key`."""
+    await _run("delete", get_storage().delete, key)
+
+
+async def read_many(
+    keys: Iterable[str], limit: int = MEDIA_IO_CONCURRENCY
+) -> Dict[str, Optional[bytes]]:
+    """
+    Read several objects concurrently with at most `limit` reads in flight.
+
+    Args:
+        keys (Iterable[str]): Storage keys to read. Duplicates are read once.
+        limit (int): Maximum number of concurrent reads.
+
+    Returns:
+        dict: Mapping of key to bytes, or None for keys that could not be read.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    semaphore = asyncio.Semaphore(limit)
+
+    async def fetch(key):
+        async with semaphore:
+            try:
+                return await read(key)
+            except Exception:
+                return None
+
+    results = await asyncio.gather(*(fetch(key) for key in unique_keys))
+    return dict(zip(unique_keys, results))
@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class BlobStorage(ABC):
+    """
+    Minimal key/value interface over wherever media bytes are kept.
+
+    Keys are forward-slash separated relative paths (e.g. "blobs/ab/cd/abcd....jpg").
+    Implementations must make `put` atomic so readers never observe a partial file.
+    """
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str = "image/jpeg") -> None:
+        """Store `data` under `key`, replacing any existing object."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the bytes stored under `key`. Raises FileNotFoundError if missing."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Return True if an object is stored under `key`."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object stored under `key`. Missing keys are ignored."""
+
+    @abstractmethod
+    def url(self, key: str, expires_in: int) -> Optional[str]:
+        """Return a time-limited GET URL for `key`, or None if unsupported."""
+
+    def stage(self, data: bytes) -> Any:
+        """
+        Prepare `data` for a later `commit_staged` without making it visible.
+
+        The default keeps the bytes in memory; backends with cheap atomic renames
+        override this to write a temporary file up front.
+
+        Returns:
+            Any: An opaque handle for `commit_staged` / `discard_staged`.
+        """
+        return data
+
+    def commit_staged(
+        self, staged: Any, key: str, content_type: str = "image/jpeg"
+    ) -> None:
+        """Publish a staged object under `key`."""
+        self.put(key, staged, content_type=content_type)
+
+    def discard_staged(self, staged: Any) -> None:
+        """Drop a staged object that will not be committed."""
@@ -0,0 +1,204 @@
+import hashlib
+import logging
+from collections import Counter
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.image_blob import ImageBlob
+from app.models.types import dialect_insert
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Content-addressed blobs live under this prefix, sharded two levels deep
+# (blobs/ab/cd/abcd...) so no single directory grows past 65k entries.
+BLOB_PREFIX = "blobs"
+
+
+def blob_digest(data: bytes) -> str:
+    """Return the SHA-256 hex digest used as a blob's identity."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_key(digest: str, extension: str = "jpg") -> str:
+    """
+    Build the sharded storage key for a blob digest.
+
+    Args:
+        digest (str): SHA-256 hex digest of the blob contents.
+        extension (str): File extension to append to the key.
+
+    Returns:
+        str: Storage key such as "blobs/ab/cd/abcd....jpg".
+    """
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+def _upsert_blob_refs(db: Session, rows) -> None:
+    """
+    Insert blob rows, or add their `ref_count` to rows that already exist.
+
+    One INSERT ... ON CONFLICT (hash) DO UPDATE, so concurrent uploads of the
+    same contents never fail on the primary key. Rows are sorted by hash so
+    transactions lock them in the same order. The affected rows stay locked
+    until the caller's transaction ends.
+    """
+    statement = dialect_insert(db)(ImageBlob).values(
+        sorted(rows, key=lambda row: row["hash"])
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ImageBlob.hash],
+            set_={"ref_count": ImageBlob.ref_count + statement.excluded.ref_count},
+        )
+    )
+
+
+def reference_blob(
+    db: Session, digest: str, key: str, size: int, content_type: str = "image/jpeg"
+) -> ImageBlob:
+    """
+    Take a reference to a blob whose bytes are stored under `key`.
+
+    Increments the reference count of an existing `ImageBlob` row, or adds a
+    new row with a count of one. The caller owns the transaction and must commit.
+
+    Args:
+        db (Session): The database session.
+        digest (str): SHA-256 hex digest of the blob contents.
+        key (str): Storage key the bytes are written to.
+        size (int): Size of the blob in bytes.
+        content_type (str): MIME type recorded for the blob.
+
+    Returns:
+        ImageBlob: The referenced blob row.
+    """
+    _upsert_blob_refs(
+        db,
+        [
+            {
+                "hash": digest,
+                "storage_key": key,
+                "content_type": content_type,
+                "size": size,
+                "ref_count": 1,
+            }
+        ],
+    )
+    return db.execute(
+        select(ImageBlob)
+        .where(ImageBlob.hash == digest)
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def reference_blobs(db: Session, blobs) -> None:
+    """
+    Take one reference per entry in `blobs` with a single upsert.
+
+    Existing rows get their reference counts bumped and missing rows are added.
+    The caller owns the transaction and must commit.
+
+    Args:
+        db (Session): The database session.
+        blobs (list[tuple]): (digest, key, size, content_type) per reference.
+                             The same digest may appear more than once.
+    """
+    if not blobs:
+        return
+
+    counts = Counter(digest for digest, _, _, _ in blobs)
+    details = {digest: (key, size, ctype) for digest, key, size, ctype in blobs}
+    _upsert_blob_refs(
+        db,
+        [
+            {
+                "hash": digest,
+                "storage_key": details[digest][0],
+                "size": details[digest][1],
+                "content_type": details[digest][2],
+                "ref_count": count,
+            }
+            for digest, count in counts.items()
+        ],
+    )
+
+
+def discard_unreferenced_blobs(db: Session, blobs) -> set:
+    """
+    Delete the stored bytes of blobs that no committed reference uses.
+
+    Cleans up after an upload whose files were moved into place but whose
+    transaction failed. Each row is locked first, inserted with a count of
+    zero if missing. A concurrent upload of the same contents has then either
+    committed its reference, and the bytes are kept, or waits for this
+    transaction and writes them again. Rows left at zero are deleted. The
+    caller owns the transaction and must commit.
+
+    Args:
+        db (Session): The database session.
+        blobs (list[tuple]): (digest, key, size, content_type) per blob.
+
+    Returns:
+        set: Digests whose bytes were deleted.
+    """
+    if not blobs:
+        return set()
+
+    details = {digest: (key, size, ctype) for digest, key, size, ctype in blobs}
+    _upsert_blob_refs(
+        db,
+        [
+            {
+                "hash": digest,
+                "storage_key": key,
+                "size": size,
+                "content_type": ctype,
+                "ref_count": 0,
+            }
+            for digest, (key, size, ctype) in details.items()
+        ],
+    )
+    unreferenced = db.execute(
+        select(ImageBlob.hash, ImageBlob.storage_key).where(
+            ImageBlob.hash.in_(list(details)), ImageBlob.ref_count <= 0
+        )
+    ).all()
+    storage = get_storage()
+    for _, key in unreferenced:
+        storage.delete(key)
+    digests = {digest for digest, _ in unreferenced}
+    if digests:
+        db.execute(delete(ImageBlob).where(ImageBlob.hash.in_(digests)))
+    return digests
+
+
+def store_blob(
+    db: Session, data: bytes, content_type: str = "image/jpeg", extension: str = "jpg"
+) -> ImageBlob:
+    """
+    Store `data` once and take a reference to it.
+
+    The bytes are only written if no blob with the same contents is stored yet.
+    That is checked after the reference is taken, while the blob row is
+    locked. The caller owns the transaction and must commit.
+
+    Args:
+        db (Session): The database session.
+        data (bytes): Raw blob contents.
+        content_type (str): MIME type recorded for the blob.
+        extension (str): File extension used in the storage key.
+
+    Returns:
+        ImageBlob: The referenced blob row.
+    """
+    storage = get_storage()
+    digest = blob_digest(data)
+    key = blob_key(digest, extension)
+
+    blob = reference_blob(db, digest, key, len(data), content_type)
+    if not storage.exists(blob.storage_key):
+        storage.put(blob.storage_key, data, content_type=content_type)
+    return blob
+
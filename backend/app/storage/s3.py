@@ -0,0 +1,99 @@
+import io
+import logging
+import os
+from typing import Optional
+
+from app.storage.base import BlobStorage
+
+logger = logging.getLogger(__name__)
+
+# Objects larger than this are sent as multipart uploads in chunks of this size
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD", 8 * 1024 * 1024))
+S3_MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE", 8 * 1024 * 1024))
+
+
+class S3Storage(BlobStorage):
+    """
+    Storage on any S3-compatible object store (AWS S3, MinIO, Ceph RGW, ...).
+
+    Set S3_ENDPOINT_URL to point at a non-AWS server such as the MinIO service
+    in docker-compose.storage.yml. Requires the `boto3` package.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: str = None,
+        access_key: str = None,
+        secret_key: str = None,
+        region: str = None,
+        prefix: str = "",
+    ):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+        except ImportError as e:
+            raise RuntimeError(
+                "STORAGE_BACKEND=s3 requires the boto3 package to be installed"
+            ) from e
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+            # Path-style addressing works with MinIO and other local stand-ins
+            config=Config(s3={"addressing_style": "path"}, signature_version="s3v4"),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+        )
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, data: bytes, content_type: str = "image/jpeg") -> None:
+        # upload_fileobj switches to a multipart upload above the threshold;
+        # the object only becomes visible once every part has been completed.
+        self.client.upload_fileobj(
+            io.BytesIO(data),
+            self.bucket,
+            self._object_key(key),
+            ExtraArgs={"ContentType": content_type},
+            Config=self.transfer_config,
+        )
+
+    def get(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self._object_key(key)
+            )
+        except self.client.exceptions.NoSuchKey as e:
+            raise FileNotFoundError(key) from e
+        return response["Body"].read()
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def url(self, key: str, expires_in: int) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=expires_in,
+        )
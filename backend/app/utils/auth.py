@@ -1,5 +1,7 @@
+import hmac
+import os
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer
@@ -128,3 +130,20 @@ def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
+
+
+def require_admin(x_admin_key: str = Header(None)):
+    """
+    Guards operational endpoints with the ADMIN_SECRET_KEY shared secret.
+
+    Args:
+        x_admin_key (str): The value of the `X-Admin-Key` request header.
+
+    Raises:
+        HTTPException: If no admin key is configured or the header does not match it.
+    """
+    admin_key = os.getenv("ADMIN_SECRET_KEY")
+    if not admin_key or not x_admin_key:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    if not hmac.compare_digest(x_admin_key.encode(), admin_key.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
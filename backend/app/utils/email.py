@@ -3,6 +3,7 @@ import smtplib
 from dotenv import load_dotenv
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from app.utils.tracing import KIND_CLIENT, span
 
 load_dotenv()
 
@@ -25,7 +26,9 @@ def send_email(to_email, subject, otp_code):
 
     msg.attach(MIMEText(email_body, "html"))
 
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.sendmail(SMTP_USERNAME, to_email, msg.as_string())
+    smtp_attributes = {"server.address": SMTP_SERVER, "server.port": SMTP_PORT}
+    with span("smtp send", KIND_CLIENT, smtp_attributes):
+        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+            server.starttls()
+            server.login(SMTP_USERNAME, SMTP_PASSWORD)
+            server.sendmail(SMTP_USERNAME, to_email, msg.as_string())
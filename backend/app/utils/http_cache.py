@@ -0,0 +1,97 @@
+"""
+Pre-serialized JSON bodies with strong ETags for rarely changing endpoints.
+
+A `PrecomputedJSON` serializes and compresses its payload once (gzip, plus
+brotli when installed). `cached_json_response` then answers each request with
+those bytes, or with an empty 304 when the client's If-None-Match already names
+the current representation.
+"""
+
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+from app.utils.compression import available_encodings, compress, negotiate_encoding
+
+
+class PrecomputedJSON:
+    """A JSON payload serialized, compressed and tagged ahead of time."""
+
+    def __init__(self, payload):
+        # Same encoding FastAPI's JSONResponse would produce
+        self.body = json.dumps(
+            payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        # Compressed once per payload, so the slowest, densest setting is fine
+        self.brotli_body = None
+        if "br" in available_encodings():
+            self.brotli_body = compress(self.body, "br", 11)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        # Each encoding is a distinct representation, so each gets its own tag
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+        self.brotli_etag = f'"{digest}-br"'
+
+    def encodings(self):
+        """Available content codings, most preferred first."""
+        return ("br", "gzip") if self.brotli_body is not None else ("gzip",)
+
+    def representation(self, encoding):
+        """Return (body, ETag) for a content coding, None meaning identity."""
+        if encoding == "br":
+            return self.brotli_body, self.brotli_etag
+        if encoding == "gzip":
+            return self.gzip_body, self.gzip_etag
+        return self.body, self.etag
+
+
+def _if_none_match_tags(header_value):
+    """Parse an If-None-Match header into opaque tags, ignoring weak prefixes."""
+    tags = set()
+    for tag in header_value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+def cached_json_response(
+    request: Request, precomputed: PrecomputedJSON, max_age: int
+) -> Response:
+    """
+    Serve a precomputed JSON body, honouring If-None-Match and Accept-Encoding.
+
+    Args:
+        request (Request): The incoming request.
+        precomputed (PrecomputedJSON): The serialized payload.
+        max_age (int): Seconds clients and shared caches may reuse the body.
+
+    Returns:
+        Response: 304 if the client's copy is current, otherwise the body.
+    """
+    encoding = negotiate_encoding(
+        request.headers.get("accept-encoding", ""), precomputed.encodings()
+    )
+    body, etag = precomputed.representation(encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = _if_none_match_tags(if_none_match)
+        # Any encoding of the current body is still a valid cached copy
+        current = {precomputed.etag, precomputed.gzip_etag, precomputed.brotli_etag}
+        if "*" in tags or tags & current:
+            return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,222 @@
+"""
+Request, database and upstream-service instrumentation.
+
+`MetricsMiddleware` records latency, response size and status per route
+template. While a request is handled, the SQL hooks installed by
+`instrument_engine` and the `observe_upstream` timers around remote model calls
+also add to that request's usage, so each route reports how much of its time
+went to the database and to the LLM / trait services.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.utils.metrics import DEFAULT_BUCKETS, Histogram
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("true", "1")
+
+SIZE_BUCKETS = (100, 1024, 10 * 1024, 100 * 1024, 1024**2, 10 * 1024**2)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+UPSTREAM_BUCKETS = DEFAULT_BUCKETS + (30, 60)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last response byte, by route",
+    labelnames=("method", "route", "status"),
+)
+HTTP_RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes",
+    "Response body size, by route",
+    buckets=SIZE_BUCKETS,
+    labelnames=("method", "route"),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request, by route",
+    labelnames=("method", "route"),
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "http_request_queries",
+    "SQL statements executed per request, by route",
+    buckets=QUERY_COUNT_BUCKETS,
+    labelnames=("method", "route"),
+)
+HTTP_REQUEST_UPSTREAM_SECONDS = Histogram(
+    "http_request_upstream_seconds",
+    "Time spent waiting on remote model services per request, by route",
+    buckets=UPSTREAM_BUCKETS,
+    labelnames=("method", "route"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Duration of single SQL statements, by statement type",
+    labelnames=("operation",),
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_duration_seconds",
+    "Duration of calls to remote model services, by service and outcome",
+    buckets=UPSTREAM_BUCKETS,
+    labelnames=("service", "outcome"),
+)
+UPSTREAM_FIRST_TOKEN_SECONDS = Histogram(
+    "upstream_first_token_seconds",
+    "Time until a streamed remote model reply sends its first text, by service",
+    buckets=UPSTREAM_BUCKETS,
+    labelnames=("service",),
+)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+class RequestUsage:
+    """Database and upstream time accumulated while handling one request."""
+
+    __slots__ = ("scope", "queries", "db_seconds", "upstream_seconds")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.upstream_seconds = 0.0
+
+
+# Sync endpoints run in a threadpool with a copy of this context; the copy
+# still points at the same RequestUsage, so their statements count too
+_request_usage: ContextVar = ContextVar("request_usage", default=None)
+
+
+def _route_label(scope):
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def current_route():
+    """
+    Route template of the request being handled, or None outside a request.
+
+    The route is known once routing has matched, i.e. inside the endpoint, its
+    dependencies and its background tasks.
+    """
+    usage = _request_usage.get()
+    if usage is None or usage.scope is None:
+        return None
+    return _route_label(usage.scope)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request metrics.
+
+    Latency is measured up to the last body chunk, so background tasks that run
+    after the response is sent are not counted against the route. With
+    METRICS_ENABLED=false nothing is recorded, but the request is still tracked
+    for `current_route` (used by the per-route query statistics).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        usage = RequestUsage(scope)
+        token = _request_usage.set(usage)
+        if not METRICS_ENABLED:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _request_usage.reset(token)
+            return
+
+        started = time.perf_counter()
+        state = {"status": 500, "size": 0, "recorded": False}
+
+        def record():
+            state["recorded"] = True
+            method = scope["method"]
+            route = _route_label(scope)
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=method,
+                route=route,
+                status=state["status"],
+            )
+            HTTP_RESPONSE_BYTES.observe(state["size"], method=method, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(
+                usage.db_seconds, method=method, route=route
+            )
+            HTTP_REQUEST_QUERIES.observe(usage.queries, method=method, route=route)
+            HTTP_REQUEST_UPSTREAM_SECONDS.observe(
+                usage.upstream_seconds, method=method, route=route
+            )
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+                if not message.get("more_body", False) and not state["recorded"]:
+                    record()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            if not state["recorded"]:
+                record()
+            _request_usage.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    words = statement.lstrip()[:7].split()
+    operation = words[0].upper() if words else ""
+    DB_QUERY_SECONDS.observe(
+        elapsed, operation=operation if operation in SQL_OPERATIONS else "OTHER"
+    )
+    usage = _request_usage.get()
+    if usage is not None:
+        usage.queries += 1
+        usage.db_seconds += elapsed
+
+
+def instrument_engine(engine):
+    """Time every SQL statement executed through `engine`."""
+    if not METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def observe_upstream(service):
+    """
+    Time a call to a remote model service.
+
+    The outcome is "error" if the block raises (the exception propagates) and
+    "ok" otherwise.
+
+    Args:
+        service (str): Name of the remote service, e.g. "tip_llm".
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_SECONDS.observe(elapsed, service=service, outcome=outcome)
+        usage = _request_usage.get()
+        if usage is not None:
+            usage.upstream_seconds += elapsed
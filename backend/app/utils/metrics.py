@@ -0,0 +1,206 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Every Histogram and Counter registers itself in REGISTRY when created, and
+`render_text()` serves all of them at /metrics.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+
+
+class Registry:
+    """The set of metrics exposed together, keyed by metric name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, metric):
+        # Re-creating a metric under the same name (e.g. a reloaded module)
+        # replaces the old one instead of exposing it twice
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+
+REGISTRY = Registry()
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram with optional labels.
+
+    Observations are bucketed on write so the memory cost is fixed no matter how
+    many values are recorded.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name,
+        description,
+        buckets=DEFAULT_BUCKETS,
+        labelnames=(),
+        registry=REGISTRY,
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        if registry is not None:
+            registry.register(self)
+
+    def observe(self, value, **labels):
+        """
+        Record one observation.
+
+        Args:
+            value (float): The observed value (e.g. seconds or bytes).
+            **labels: Label values, one per name in `labelnames`.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        """
+        Return a copy of the recorded data.
+
+        Returns:
+            dict: Mapping of label tuple to {"buckets": [(le, cumulative count)...],
+                  "count": int, "sum": float}.
+        """
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+
+        result = {}
+        for key, series in items:
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            result[key] = {"buckets": buckets, "count": cumulative, "sum": series[-1]}
+        return result
+
+    def samples(self):
+        """Yield (suffix, labels, value) exposition samples."""
+        for key, data in sorted(self.snapshot().items()):
+            labels = list(zip(self.labelnames, key))
+            for bound, count in data["buckets"]:
+                yield "_bucket", labels + [("le", _format_value(bound))], count
+            yield "_sum", labels, data["sum"]
+            yield "_count", labels, data["count"]
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter with optional labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name, description, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> count
+        if registry is not None:
+            registry.register(self)
+
+    def inc(self, amount=1, **labels):
+        """
+        Add `amount` to the counter.
+
+        Args:
+            amount (float): Non-negative increment.
+            **labels: Label values, one per name in `labelnames`.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def snapshot(self):
+        """
+        Return a copy of the recorded data.
+
+        Returns:
+            dict: Mapping of label tuple to count.
+        """
+        with self._lock:
+            return dict(self._series)
+
+    def samples(self):
+        """Yield (suffix, labels, value) exposition samples."""
+        for key, count in sorted(self.snapshot().items()):
+            yield "", list(zip(self.labelnames, key)), count
+
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_text(registry=REGISTRY):
+    """
+    Render every registered metric in the Prometheus text format (version 0.0.4).
+
+    Returns:
+        str: The exposition document.
+    """
+    lines = []
+    for metric in sorted(registry.metrics(), key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.type_name}")
+        for suffix, labels, value in metric.samples():
+            label_text = ",".join(
+                f'{name}="{_escape_label(label)}"' for name, label in labels
+            )
+            if label_text:
+                label_text = "{" + label_text + "}"
+            lines.append(f"{metric.name}{suffix}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Latency of individual media reads and writes, measured on the I/O worker
+MEDIA_IO_SECONDS = Histogram(
+    "media_io_seconds",
+    "Duration of a single media file read or write",
+    labelnames=("operation",),
+)
@@ -0,0 +1,272 @@
+"""
+On-demand request profiling.
+
+A background sampler reads the Python stacks of the threads serving requests
+(the event loop and the AnyIO worker threads that run sync endpoints and
+background tasks) every PROFILE_SAMPLE_INTERVAL_MS while a profiled request is
+in flight. Profiles are written in the folded-stack format understood by
+flamegraph.pl, inferno and speedscope: one `frame;frame;frame count` line per
+distinct stack, root first.
+
+Two triggers:
+  - an admin arms a route for its next N requests (`arm_route`);
+  - any request slower than the threshold (`set_slow_threshold`, or
+    PROFILE_SLOW_THRESHOLD_MS) is kept. Every request is sampled while a
+    threshold is set; profiles of faster ones are discarded.
+
+Samples cover all request threads, so requests that overlap a profiled one
+show up in its profile too. Profile under light or isolated traffic when a
+clean attribution matters.
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+PROFILE_KEEP_FILES = int(os.getenv("PROFILE_KEEP_FILES", 200))
+WORKER_THREAD_NAME = "AnyIO worker thread"
+
+# Leaf frames of a thread waiting for work; such samples are dropped
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("threading.py", "wait"),
+}
+
+_lock = threading.Lock()
+_armed = {}  # (method, route template) -> requests left to profile
+_slow_threshold_ms = float(os.getenv("PROFILE_SLOW_THRESHOLD_MS", 0))
+
+
+class Recording:
+    """Stack samples collected while one request was in flight."""
+
+    __slots__ = ("stacks", "samples")
+
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+
+
+_labels = {}  # code object -> folded frame label
+
+
+def _frame_label(code):
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        marker = "site-packages" + os.sep
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+        else:
+            filename = os.path.basename(filename)
+        name = getattr(code, "co_qualname", code.co_name)
+        # ';' separates frames in the folded format
+        label = f"{name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+        _labels[code] = label
+    return label
+
+
+def _fold(frame):
+    leaf = frame.f_code
+    if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+        return None
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    return ";".join(_frame_label(code) for code in reversed(codes))
+
+
+class StackSampler:
+    """Samples request threads into every active recording."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._recordings = set()
+        self._thread = None
+        self.loop_thread_id = None
+
+    def start_recording(self):
+        recording = Recording()
+        with self._condition:
+            self._recordings.add(recording)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="stack-sampler", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        return recording
+
+    def stop_recording(self, recording):
+        with self._condition:
+            self._recordings.discard(recording)
+
+    def _request_thread_ids(self):
+        ids = {self.loop_thread_id}
+        ids.update(
+            thread.ident
+            for thread in threading.enumerate()
+            if thread.name == WORKER_THREAD_NAME
+        )
+        return ids
+
+    def _run(self):
+        interval = PROFILE_SAMPLE_INTERVAL_MS / 1000
+        while True:
+            with self._condition:
+                while not self._recordings:
+                    self._condition.wait()
+
+            thread_ids = self._request_thread_ids()
+            stacks = [
+                _fold(frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id in thread_ids
+            ]
+            stacks = [stack for stack in stacks if stack]
+            # Under the lock, so a stopped recording is never written to again
+            with self._condition:
+                for recording in self._recordings:
+                    recording.samples += 1
+                    recording.stacks.update(stacks)
+            time.sleep(interval)
+
+
+_sampler = StackSampler()
+
+
+def arm_route(method, route, count):
+    """Profile the next `count` requests matching `method` and route template."""
+    with _lock:
+        _armed[(method.upper(), route)] = count
+
+
+def disarm_route(method, route):
+    with _lock:
+        return _armed.pop((method.upper(), route), None) is not None
+
+
+def set_slow_threshold(threshold_ms):
+    """Keep profiles of requests slower than `threshold_ms`; 0 turns this off."""
+    global _slow_threshold_ms
+    _slow_threshold_ms = max(0.0, float(threshold_ms))
+
+
+def profiling_status():
+    with _lock:
+        armed = [
+            {"method": method, "route": route, "remaining": remaining}
+            for (method, route), remaining in _armed.items()
+        ]
+    return {
+        "armed": armed,
+        "slow_threshold_ms": _slow_threshold_ms,
+        "sample_interval_ms": PROFILE_SAMPLE_INTERVAL_MS,
+        "directory": str(PROFILE_DIR),
+        "profiles": list_profiles(),
+    }
+
+
+def profile_path(name):
+    """Path of a stored profile, or None if `name` is not one."""
+    if not re.fullmatch(r"[A-Za-z0-9.\-]+\.folded", name):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
+
+
+def list_profiles(limit=50):
+    if not PROFILE_DIR.is_dir():
+        return []
+    files = sorted(PROFILE_DIR.glob("*.folded"), reverse=True)
+    return [path.name for path in files[:limit]]
+
+
+def _claim_armed(method, route):
+    with _lock:
+        remaining = _armed.get((method, route))
+        if not remaining:
+            return False
+        if remaining <= 1:
+            del _armed[(method, route)]
+        else:
+            _armed[(method, route)] = remaining - 1
+        return True
+
+
+def _write_profile(recording, method, route, duration_ms, reason):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    path = PROFILE_DIR / (
+        f"{stamp}.{int(now * 1000) % 1000:03d}-{method}-{slug}"
+        f"-{duration_ms:.0f}ms-{reason}.folded"
+    )
+    lines = [f"{stack} {count}" for stack, count in recording.stacks.most_common()]
+    path.write_text("\n".join(lines) + "\n")
+
+    # Keep the directory bounded
+    old = sorted(PROFILE_DIR.glob("*.folded"))[:-PROFILE_KEEP_FILES]
+    for stale in old:
+        stale.unlink(missing_ok=True)
+    logger.info(
+        f"Profiled {method} {route} ({duration_ms:.0f} ms, "
+        f"{recording.samples} samples, {reason}): {path}"
+    )
+    return path
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware recording stack samples for armed routes and slow requests.
+
+    The duration covers the whole ASGI call, including background tasks run
+    after the response. Costs nothing while no route is armed and no slow
+    threshold is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (_armed or _slow_threshold_ms):
+            await self.app(scope, receive, send)
+            return
+
+        _sampler.loop_thread_id = threading.get_ident()
+        recording = _sampler.start_recording()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _sampler.stop_recording(recording)
+            duration_ms = (time.perf_counter() - started) * 1000
+            method = scope["method"]
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            reason = None
+            if _claim_armed(method, route):
+                reason = "armed"
+            elif _slow_threshold_ms and duration_ms >= _slow_threshold_ms:
+                reason = "slow"
+            if reason and recording.samples:
+                try:
+                    # Writing and pruning the directory is file I/O
+                    await run_in_threadpool(
+                        _write_profile, recording, method, route, duration_ms, reason
+                    )
+                except OSError as e:
+                    logger.error(f"Could not write profile for {route}: {e}")
@@ -0,0 +1,373 @@
+"""
+SQL statement fingerprints, per-route query statistics and a slow-query log.
+
+Every statement executed through an instrumented engine is normalized into a
+fingerprint: literals and bind parameters become `?`, lists of placeholders
+(`IN (...)`, multi-row `VALUES`) collapse to one, and whitespace is squeezed,
+so the same lookup with different arguments is counted once. Calls, total /
+mean / p95 / max time and rows are aggregated per fingerprint and per
+(route, fingerprint), where the route is the template of the request that ran
+the statement (see `instrumentation.current_route`).
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their
+fingerprint and route. Their EXPLAIN plan is fetched on a separate connection
+by a background thread, at most once per fingerprint every
+SLOW_QUERY_EXPLAIN_INTERVAL seconds, so the request is not delayed. Parameter
+values are only used for the EXPLAIN and are never logged.
+
+Row counts come from the DB-API `rowcount`: rows returned on Postgres, rows
+affected for DML. SQLite does not report rows for SELECT.
+"""
+
+import os
+import re
+import time
+import queue
+import hashlib
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from app.utils.instrumentation import current_route
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() in (
+    "true",
+    "1",
+)
+QUERY_STATS_SAMPLES = int(os.getenv("QUERY_STATS_SAMPLES", 500))
+QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv("QUERY_STATS_MAX_FINGERPRINTS", 2000))
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("true", "1")
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", 300))
+SLOW_QUERY_LOG_SIZE = 100
+
+NO_ROUTE = "(no request)"
+OVERFLOW_FINGERPRINT = "overflow"
+EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+EXPLAINED_OPERATIONS = {"SELECT", "WITH", "UPDATE", "DELETE"}
+SORT_KEYS = {
+    "total": "total_ms",
+    "mean": "mean_ms",
+    "p95": "p95_ms",
+    "max": "max_ms",
+    "calls": "calls",
+    "rows": "rows",
+}
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(
+    r"%\(\w+\)s|%s|(?<![:\w]):\w+|\?|__\[POSTCOMPILE_\w+\]"
+    r"|(?<![\w.])\d+(?:\.\d+)?(?![\w.])"
+)
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+_TABLES = re.compile(r"\b(?:FROM|JOIN|INTO|(?<!DO )UPDATE)\s+\"?(\w+)\"?", re.I)
+
+
+def normalize_statement(statement):
+    """
+    Reduce a SQL statement to its shape, e.g.
+    `SELECT ... WHERE id IN (%(id_1)s, %(id_2)s) LIMIT 5` becomes
+    `SELECT ... WHERE id IN (...) LIMIT ?`.
+    """
+    text = _COMMENTS.sub(" ", statement)
+    text = _STRINGS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(...)", text)
+    text = _REPEATED_LISTS.sub("(...)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class Fingerprint:
+    """A normalized statement and the tables it touches."""
+
+    __slots__ = ("id", "statement", "operation", "tables")
+
+    def __init__(self, normalized):
+        self.id = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+        self.statement = normalized
+        words = normalized[:7].split()
+        self.operation = words[0].upper() if words else ""
+        tables = (table.lower() for table in _TABLES.findall(normalized))
+        self.tables = list(dict.fromkeys(tables))
+
+
+class QueryStats:
+    """
+    Timings of one fingerprint (or one fingerprint within one route).
+
+    The p95 is taken over the last QUERY_STATS_SAMPLES calls, so it follows
+    recent behavior; the other figures cover everything since the last reset.
+    """
+
+    __slots__ = ("calls", "total_seconds", "max_seconds", "rows", "recent")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.recent = deque(maxlen=QUERY_STATS_SAMPLES)
+
+    def add(self, seconds, rows):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if rows > 0:
+            self.rows += rows
+        self.recent.append(seconds)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "mean_ms": round(self.total_seconds * 1000 / self.calls, 3),
+            "p95_ms": round(p95 * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+_lock = threading.Lock()
+_fingerprints = {}  # raw statement -> Fingerprint
+_by_fingerprint = {}  # fingerprint id -> QueryStats
+_by_route = {}  # (route, fingerprint id) -> QueryStats
+_known = {}  # fingerprint id -> Fingerprint
+_slow_log = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_last_explained = {}  # fingerprint id -> time of the last EXPLAIN
+_since = datetime.now(timezone.utc)
+
+# Stands in for new fingerprints once QUERY_STATS_MAX_FINGERPRINTS are tracked
+_overflow = Fingerprint("(further statements)")
+_overflow.id = OVERFLOW_FINGERPRINT
+
+
+def fingerprint(statement):
+    """The (cached) Fingerprint of a raw statement."""
+    found = _fingerprints.get(statement)
+    if found is None:
+        found = Fingerprint(normalize_statement(statement))
+        if len(_fingerprints) >= 4 * QUERY_STATS_MAX_FINGERPRINTS:
+            _fingerprints.clear()
+        _fingerprints[statement] = found
+    return found
+
+
+def _record(found, route, seconds, rows):
+    with _lock:
+        if found.id not in _known:
+            if len(_known) >= QUERY_STATS_MAX_FINGERPRINTS:
+                found = _overflow
+            _known.setdefault(found.id, found)
+        key = found.id
+        stats = _by_fingerprint.get(key)
+        if stats is None:
+            stats = _by_fingerprint[key] = QueryStats()
+        stats.add(seconds, rows)
+        route_stats = _by_route.get((route, key))
+        if route_stats is None:
+            route_stats = _by_route[(route, key)] = QueryStats()
+        route_stats.add(seconds, rows)
+
+
+class _PlanExplainer:
+    """Fetches EXPLAIN plans of slow statements on a daemon thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=SLOW_QUERY_LOG_SIZE)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, engine, statement, parameters, entry):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="slow-query-explain", daemon=True
+                    )
+                    self._thread.start()
+        try:
+            self._queue.put_nowait((engine, statement, parameters, entry))
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            engine, statement, parameters, entry = self._queue.get()
+            try:
+                plan = explain(engine, statement, parameters)
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {type(e).__name__}: {e}"]
+            with _lock:
+                entry["plan"] = plan
+            logger.warning(
+                f"Plan for slow query {entry['fingerprint']}:\n  " + "\n  ".join(plan)
+            )
+
+
+_explainer = _PlanExplainer()
+
+
+def explain(engine, statement, parameters):
+    """
+    EXPLAIN a raw statement with its parameters on a fresh pooled connection.
+
+    Runs at the DB-API level, so the instrumentation does not see it, and
+    rolls back afterwards. Returns the plan as a list of lines.
+    """
+    prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+    if prefix is None:
+        return [f"EXPLAIN is not supported for {engine.dialect.name}"]
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(prefix + statement, parameters or ())
+        plan = [str(row[-1]) for row in cursor.fetchall()]
+        cursor.close()
+        return plan
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def _log_slow(conn, statement, parameters, found, route, seconds, executemany):
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(seconds * 1000, 3),
+        "route": route,
+        "fingerprint": found.id,
+        "statement": found.statement,
+        "plan": None,
+    }
+    logger.warning(
+        f"Slow query ({entry['duration_ms']:.1f} ms) on {route}, "
+        f"fingerprint {found.id}: {found.statement[:500]}"
+    )
+    now = time.monotonic()
+    with _lock:
+        _slow_log.append(entry)
+        last = _last_explained.get(found.id)
+        wanted = (
+            SLOW_QUERY_EXPLAIN
+            and not executemany
+            and found.operation in EXPLAINED_OPERATIONS
+            and (last is None or now - last >= SLOW_QUERY_EXPLAIN_INTERVAL)
+        )
+        if wanted:
+            _last_explained[found.id] = now
+    if wanted:
+        _explainer.submit(conn.engine, statement, parameters, entry)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_stats_started
+    found = fingerprint(statement)
+    route = current_route() or NO_ROUTE
+    _record(found, route, seconds, cursor.rowcount)
+    if SLOW_QUERY_THRESHOLD_MS and seconds * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        _log_slow(conn, statement, parameters, found, route, seconds, executemany)
+
+
+def instrument_engine(engine):
+    """Fingerprint and time every SQL statement executed through `engine`."""
+    if not QUERY_STATS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _describe(key, stats, db_seconds):
+    found = _known[key]
+    summary = stats.summary()
+    return {
+        "fingerprint": key,
+        "operation": found.operation,
+        "tables": found.tables,
+        "statement": found.statement,
+        **summary,
+        "share": round(stats.total_seconds / db_seconds, 4) if db_seconds else 0,
+    }
+
+
+def query_report(limit=20, route=None, sort="total"):
+    """
+    Fingerprints ranked by database time (or by `sort`), overall or for one route.
+
+    Args:
+        limit (int): Fingerprints (and routes) to return.
+        route (str): Only statements run by this route template.
+        sort (str): One of total, mean, p95, max, calls or rows.
+
+    Returns:
+        dict: Totals, the top fingerprints with their share of database time,
+        and each route's database time with its top fingerprints.
+    """
+    sort_key = SORT_KEYS.get(sort, "total_ms")
+    with _lock:
+        if route is None:
+            selected = dict(_by_fingerprint)
+        else:
+            selected = {
+                key: stats for (name, key), stats in _by_route.items() if name == route
+            }
+        db_seconds = sum(stats.total_seconds for stats in selected.values())
+        fingerprints = [
+            _describe(key, stats, db_seconds) for key, stats in selected.items()
+        ]
+
+        routes = {}
+        for (name, key), stats in _by_route.items():
+            if route is not None and name != route:
+                continue
+            entry = routes.setdefault(
+                name, {"route": name, "calls": 0, "total_ms": 0.0, "top": []}
+            )
+            entry["calls"] += stats.calls
+            entry["total_ms"] += stats.total_seconds * 1000
+            entry["top"].append({"fingerprint": key, **stats.summary()})
+
+    fingerprints.sort(key=lambda item: item[sort_key], reverse=True)
+    routes = sorted(routes.values(), key=lambda item: item["total_ms"], reverse=True)
+    for entry in routes:
+        entry["total_ms"] = round(entry["total_ms"], 3)
+        entry["top"].sort(key=lambda item: item[sort_key], reverse=True)
+        del entry["top"][5:]
+    return {
+        "since": _since.isoformat(),
+        "statements": sum(item["calls"] for item in fingerprints),
+        "db_ms": round(db_seconds * 1000, 3),
+        "slow_threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+        "fingerprints": fingerprints[:limit],
+        "routes": routes[:limit],
+    }
+
+
+def slow_queries(limit=50):
+    """The most recent slow statements (newest first), with plans once fetched."""
+    with _lock:
+        return [dict(entry) for entry in reversed(_slow_log)][:limit]
+
+
+def reset_query_stats():
+    """Forget all statistics and the slow-query log."""
+    global _since
+    with _lock:
+        _by_fingerprint.clear()
+        _by_route.clear()
+        _known.clear()
+        _slow_log.clear()
+        _last_explained.clear()
+        _since = datetime.now(timezone.utc)
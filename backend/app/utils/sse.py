@@ -0,0 +1,83 @@
+"""
+Server-sent events (text/event-stream) framing for StreamingResponse bodies.
+
+`iterate_in_thread` feeds such a body from blocking code, e.g. a `requests`
+stream from the LLM server, without blocking the event loop.
+"""
+
+import asyncio
+import json
+from contextvars import copy_context
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# No caching, and no response buffering by nginx-style proxies
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data) -> str:
+    """
+    Frame one event.
+
+    Args:
+        event (str): Event name, dispatched to the client's listener of that name.
+        data: JSON-serializable payload, sent on a single `data:` line.
+
+    Returns:
+        str: The framed event, ending with the blank line that dispatches it.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_comment(text: str = "keep-alive") -> str:
+    """A comment line; clients ignore it, but it keeps idle connections open."""
+    return f": {text}\n\n"
+
+
+_DONE = object()
+
+
+async def iterate_in_thread(func, *args):
+    """
+    Run `func(emit, *args)` on a worker thread and yield what it emits.
+
+    The call runs start to finish in one thread, with a copy of the caller's
+    context, so context managers inside it (metrics, tracing spans) work as in
+    a plain call. Starlette's `iterate_in_threadpool` instead moves between
+    threads and contexts on every item. If the consumer stops early, `func`
+    still runs to completion and later items are dropped.
+
+    Args:
+        func (callable): Blocking function; calls `emit(item)` for each item.
+        *args: Further arguments for `func`.
+
+    Yields:
+        Every emitted item, in order. An exception from `func` is re-raised.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def emit(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+        except RuntimeError:
+            pass  # The loop is closed; nobody is listening any more
+
+    def run():
+        error = None
+        try:
+            func(emit, *args)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (_DONE, error))
+        except RuntimeError:
+            pass
+
+    loop.run_in_executor(None, copy_context().run, run)
+    while True:
+        item, error = await queue.get()
+        if item is _DONE:
+            if error is not None:
+                raise error
+            return
+        yield item
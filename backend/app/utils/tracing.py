@@ -0,0 +1,438 @@
+"""
+Request tracing compatible with OpenTelemetry.
+
+Spans use W3C trace context (`traceparent`) and are exported as OTLP/JSON,
+either appended to a file (one export request per line, readable by the
+collector's `otlpjsonfile` receiver) or POSTed to a collector's
+`/v1/traces` endpoint. Sampling is parent-based with a configurable ratio for
+new traces, so a sampled request records every span below it.
+
+Spans are created automatically for routes (`TracingMiddleware`), SQL
+statements (`instrument_engine`) and background tasks
+(`instrument_background_tasks`, which parents each task to the request that
+scheduled it). Outbound calls use `client_span` and pass its `traceparent` on.
+"""
+
+import os
+import json
+import queue
+import random
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() in ("true", "1")
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", 1.0))
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file").lower()  # file | otlp
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv(
+    "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+)
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "mindful-eating-backend")
+TRACING_EXPORT_INTERVAL = float(os.getenv("TRACING_EXPORT_INTERVAL", 2))
+TRACING_MAX_QUEUE = 10000
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "sampled",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "status",
+        "status_message",
+    )
+
+    def __init__(self, name, kind, trace_id, parent_span_id, sampled, attributes):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key, value):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_error(self, error):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def traceparent(self):
+        """The W3C `traceparent` header value continuing this span's trace."""
+        flags = "01" if self.sampled else "00"
+        return f"00-{self.trace_id}-{self.span_id}-{flags}"
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            _exporter().submit(self)
+
+
+def parse_traceparent(header):
+    """
+    Parse a W3C `traceparent` header.
+
+    Returns:
+        tuple: (trace_id, parent span id, sampled), or None if the header is
+        missing or malformed.
+    """
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+def start_span(name, kind=KIND_INTERNAL, attributes=None, parent=None, remote=None):
+    """
+    Create and return a span without making it current.
+
+    The parent is `parent`, else the remote context `remote` (from
+    `parse_traceparent`), else the current span. A new trace is sampled with
+    probability TRACING_SAMPLE_RATIO; child spans follow their parent's decision.
+    Returns None when tracing is disabled.
+    """
+    if not TRACING_ENABLED:
+        return None
+    parent = parent or (None if remote else _current_span.get())
+    if parent is not None:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    elif remote is not None:
+        trace_id, parent_id, sampled = remote
+    else:
+        trace_id = f"{random.getrandbits(128):032x}"
+        parent_id = None
+        sampled = random.random() < TRACING_SAMPLE_RATIO
+    return Span(name, kind, trace_id, parent_id, sampled, attributes)
+
+
+@contextmanager
+def span(name, kind=KIND_INTERNAL, attributes=None, parent=None):
+    """
+    Run a block inside a new current span, ended when the block exits.
+
+    Exceptions are recorded on the span and re-raised. Yields the span, or
+    None when tracing is disabled.
+    """
+    current = start_span(name, kind, attributes, parent=parent)
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+@contextmanager
+def client_span(name, attributes=None):
+    """
+    Span for an outbound call; yields headers carrying its trace context.
+
+    Usage:
+        with client_span("POST trait_service", {...}) as headers:
+            requests.post(url, json=payload, headers=headers)
+    """
+    with span(name, KIND_CLIENT, attributes) as current:
+        yield {"traceparent": current.traceparent()} if current is not None else {}
+
+
+def current_span():
+    return _current_span.get()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per HTTP request.
+
+    An incoming `traceparent` header continues the caller's trace. The span is
+    named after the matched route template and ends with the last response
+    byte; spans started later (background tasks) still belong to the request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        remote = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                remote = parse_traceparent(value.decode("latin-1"))
+                break
+        method = scope["method"]
+        server_span = start_span(
+            f"{method} {scope['path']}",
+            KIND_SERVER,
+            {"http.request.method": method, "url.path": scope["path"]},
+            remote=remote,
+        )
+        token = _current_span.set(server_span)
+
+        def finish(status):
+            if server_span.end_ns is not None:
+                return
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                server_span.name = f"{method} {route}"
+                server_span.set_attribute("http.route", route)
+            server_span.set_attribute("http.response.status_code", status)
+            if status >= 500:
+                server_span.status = STATUS_ERROR
+            server_span.end()
+
+        status = {"code": 500}
+
+        async def send_with_span(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                finish(status["code"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_span)
+        except BaseException as e:
+            server_span.record_error(e)
+            raise
+        finally:
+            finish(status["code"])
+            _current_span.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is None:
+        return  # Only statements inside a traced operation
+    words = statement.lstrip()[:7].split()
+    context._trace_span = start_span(
+        f"db {words[0].upper() if words else 'statement'}",
+        KIND_CLIENT,
+        {
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:1000],
+            "db.executemany": executemany,
+        },
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_span = getattr(context, "_trace_span", None)
+    if db_span is not None:
+        db_span.set_attribute("db.rowcount", cursor.rowcount)
+        db_span.end()
+
+
+def _handle_error(exception_context):
+    db_span = getattr(exception_context.execution_context, "_trace_span", None)
+    if db_span is not None:
+        db_span.record_error(exception_context.original_exception)
+        db_span.end()
+
+
+def instrument_engine(engine):
+    """Trace every SQL statement executed through `engine` within a span."""
+    if not TRACING_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def instrument_background_tasks():
+    """
+    Run every Starlette background task in its own span.
+
+    Tasks run after the response, inside the request's context, so each task
+    span is a child of the request span that scheduled it.
+    """
+    if not TRACING_ENABLED:
+        return
+    from starlette.background import BackgroundTask
+
+    if getattr(BackgroundTask.__call__, "_traced", False):
+        return
+    call = BackgroundTask.__call__
+
+    async def traced_call(self):
+        name = getattr(self.func, "__qualname__", repr(self.func))
+        with span(f"background {name}", attributes={"code.function": name}):
+            await call(self)
+
+    traced_call._traced = True
+    BackgroundTask.__call__ = traced_call
+
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(item):
+    data = {
+        "traceId": item.trace_id,
+        "spanId": item.span_id,
+        "name": item.name,
+        "kind": item.kind,
+        "startTimeUnixNano": str(item.start_ns),
+        "endTimeUnixNano": str(item.end_ns),
+        "attributes": [
+            {"key": key, "value": _attribute_value(value)}
+            for key, value in item.attributes.items()
+        ],
+        "status": {"code": item.status, "message": item.status_message},
+    }
+    if item.parent_span_id:
+        data["parentSpanId"] = item.parent_span_id
+    return data
+
+
+def otlp_document(spans):
+    """Wrap finished spans in an OTLP/JSON `ExportTraceServiceRequest`."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": {"stringValue": TRACING_SERVICE_NAME},
+                        }
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [_otlp_span(item) for item in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """
+    Batches finished spans on a daemon thread and writes them out.
+
+    Spans are dropped (and counted) when the queue is full rather than slowing
+    down requests.
+    """
+
+    def __init__(self, exporter=TRACING_EXPORTER):
+        self.exporter = exporter
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=TRACING_MAX_QUEUE)
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, finished):
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self):
+        batch = []
+        while len(batch) < 512:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            time.sleep(TRACING_EXPORT_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            try:
+                self._write(otlp_document(batch))
+            except Exception as e:
+                logger.warning(f"Dropped {len(batch)} spans, export failed: {e}")
+
+    def _write(self, document):
+        if self.exporter == "otlp":
+            import requests
+
+            response = requests.post(TRACING_OTLP_ENDPOINT, json=document, timeout=5)
+            response.raise_for_status()
+        else:
+            with open(TRACING_FILE, "a") as f:
+                f.write(json.dumps(document, separators=(",", ":")) + "\n")
+
+
+_exporter_instance = None
+_exporter_lock = threading.Lock()
+
+
+def _exporter():
+    global _exporter_instance
+    if _exporter_instance is None:
+        with _exporter_lock:
+            if _exporter_instance is None:
+                _exporter_instance = SpanExporter()
+    return _exporter_instance
+
+
+def flush_spans():
+    """Export all queued spans now (e.g. at shutdown)."""
+    if _exporter_instance is not None:
+        _exporter_instance.flush()
@@ -0,0 +1,251 @@
+"""
+Benchmark Big Five feature loading and prompt building over batch sizes.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_big_five_features [--users 10000] [--repeat 3]
+
+"legacy" is the previous per-user path: one query each for the user, their
+answers and their behaviors, then the prompt built with repeated string
+concatenation. "single query" is `load_big5_inputs` (one statement per batch)
+followed by the template-based `build_big5_prompt`. Both produce identical
+prompts for complete profiles, which is checked before timing, along with a
+recorded failure storing SQL NULL scores.
+"""
+
+import argparse
+import random
+
+from benchmarks import common
+
+from sqlalchemy import event
+
+common.load_example_env()
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+
+
+def legacy_input_text(user, formatted_answers, formatted_behavior):
+    """The string-concatenation builder `prepare_big5_input_text` used to be."""
+    full_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
+    occupation = user.get("occupation", "N/A")
+    age = user.get("age", "N/A")
+    gender = user.get("current_gender", user.get("gender_of_birth", "N/A"))
+    city = user.get("city", "")
+    country = user.get("country", "")
+    location = f"{city}, {country}".strip(", ")
+    lifestyle = user.get("lifestyle_type", "N/A")
+    diet = user.get("cultural_religious_dietary_influence", "N/A")
+
+    description = (
+        f"{full_name} is a {age}-year-old {occupation.lower()} from {location}. "
+        f"They lead a {lifestyle.lower()} lifestyle and follow a {diet} diet."
+    )
+
+    demographics = f"""Demographics:
+Age: {age}
+Gender: {gender}
+Location: {location}
+Occupation: {occupation}
+Lifestyle: {lifestyle}
+Dietary Influence: {diet}"""
+
+    qa_section = "\nSome Questions and Answers about the user:\n"
+    for qa in formatted_answers:
+        qa_section += f"Q: {qa['question']}\nA: {qa['answer']}\n"
+
+    behavior_section = "Observed Behaviors of the user:\n"
+    for b in formatted_behavior:
+        priority = "High Priority" if b["high_priority"] else "Normal Priority"
+        behavior_section += f"- {b['behavior_title']} ({priority})\n"
+
+    return f"""{full_name}, {occupation}
+Description: {description}
+
+{demographics}
+
+{qa_section}
+
+{behavior_section}
+"""
+
+
+def legacy_prompts(db, user_ids):
+    from app.models import QuestionAnswer, User, UserBehavior
+    from app.services.big_five_generator import generate_big5_personality_prompt
+
+    excluded = {"_sa_instance_state", "hashed_password", "id", "profile_picture"}
+    prompts = []
+    for user_id in user_ids:
+        user = db.query(User).filter(User.id == user_id).first()
+        user_data = {k: v for k, v in user.__dict__.items() if k not in excluded}
+        answers = []
+        user_question = (
+            db.query(QuestionAnswer).filter(QuestionAnswer.user_id == user_id).first()
+        )
+        if user_question and user_question.question_data:
+            for answer_info in user_question.question_data.values():
+                answers.append(
+                    {
+                        "question": answer_info.get("question", ""),
+                        "answer": answer_info.get("answer", ""),
+                    }
+                )
+        behaviors = [
+            {"behavior_title": b.behavior_title, "high_priority": b.high_priority}
+            for b in db.query(UserBehavior)
+            .filter(UserBehavior.user_id == user_id)
+            .order_by(UserBehavior.id)
+        ]
+        prompts.append(
+            generate_big5_personality_prompt(
+                legacy_input_text(user_data, answers, behaviors)
+            )
+        )
+    return prompts
+
+
+def single_query_prompts(db, user_ids):
+    from app.services.big_five_generator import build_big5_prompt, load_big5_inputs
+
+    inputs = load_big5_inputs(db, user_ids)
+    return [build_big5_prompt(*inputs[user_id]) for user_id in user_ids]
+
+
+def seed(db, users):
+    from sqlalchemy import insert
+
+    from app.models import QuestionAnswer, User, UserBehavior
+    from app.services.catalog import get_catalog
+
+    catalog = get_catalog()
+    rng = random.Random(11)
+    db.execute(
+        insert(User),
+        [
+            {
+                "id": i,
+                "first_name": "Bench",
+                "last_name": f"User{i}",
+                "email": f"user{i}@example.com",
+                "hashed_password": "x",
+                "age": rng.randint(18, 80),
+                "occupation": rng.choice(["Engineer", "Teacher", "Nurse"]),
+                "current_gender": rng.choice(["Female", "Male"]),
+                "city": "Toronto",
+                "country": "Canada",
+                "lifestyle_type": rng.choice(["Active", "Sedentary"]),
+                "cultural_religious_dietary_influence": "None",
+            }
+            for i in range(1, users + 1)
+        ],
+    )
+    db.execute(
+        insert(QuestionAnswer),
+        [
+            {
+                "user_id": i,
+                "question_data": {
+                    str(index): {
+                        "question": question["question_text"],
+                        "answer": rng.choice(question.get("options") or ["Sometimes"]),
+                    }
+                    for index, question in enumerate(catalog.questions, start=1)
+                },
+            }
+            for i in range(1, users + 1)
+        ],
+    )
+    db.execute(
+        insert(UserBehavior),
+        [
+            {
+                "user_id": i,
+                "behavior_id": str(index),
+                "behavior_title": behavior["behavior_title"],
+                "first_priority": index == 1,
+                "high_priority": rng.random() < 0.5,
+            }
+            for i in range(1, users + 1)
+            for index, behavior in enumerate(catalog.behaviors[:3], start=1)
+        ],
+    )
+    db.commit()
+
+
+def check_failed_rows_are_null(db, user_id):
+    """A recorded failure must have SQL NULL scores, which `IS NULL` finds."""
+    from app.models import BigFiveTraits
+    from app.services.big_five_generator import record_big_five_failures
+
+    record_big_five_failures(db, {user_id: "benchmark check"})
+    failed = (
+        db.query(BigFiveTraits)
+        .filter(
+            BigFiveTraits.user_id == user_id,
+            BigFiveTraits.big_five_data.is_(None),
+        )
+        .count()
+    )
+    db.rollback()
+    assert failed == 1, "failed Big Five row does not store SQL NULL scores"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Big Five feature loading benchmark")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, engine
+
+    common.reset_database()
+    db = SessionLocal()
+    seed(db, args.users)
+
+    sample = list(range(1, min(args.users, 50) + 1))
+    assert legacy_prompts(db, sample) == single_query_prompts(db, sample), (
+        "prompt output changed"
+    )
+    check_failed_rows_are_null(db, sample[0])
+
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(1)
+    )
+
+    rows = []
+    for batch_size in (size for size in BATCH_SIZES if size <= args.users):
+        user_ids = list(range(1, batch_size + 1))
+        for variant, build in (
+            ("legacy", legacy_prompts),
+            ("single query", single_query_prompts),
+        ):
+
+            def run():
+                build(db, user_ids)
+                db.expunge_all()
+
+            statements.clear()
+            run()
+            statement_count = len(statements)
+            timing = common.measure(run, repeat=args.repeat, warmup=0)
+            rows.append(
+                {
+                    "batch": batch_size,
+                    "variant": variant,
+                    "queries": statement_count,
+                    "mean_ms": timing["mean_ms"],
+                    "us_per_user": timing["mean_ms"] * 1000 / batch_size,
+                }
+            )
+    db.close()
+
+    common.print_table(
+        "Big Five feature loading and prompt building",
+        rows,
+        ["batch", "variant", "queries", "mean_ms", "us_per_user"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Throughput of the catalog list endpoints before and after precomputed bodies.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_catalog_endpoints [--duration 3]
+
+"before" mounts the previous handler shape (the controller dict, validated
+and serialized by FastAPI on every call) next to the real routes. Each variant
+is hammered through an in-process ASGI client for `--duration` seconds and
+reported as requests/sec along with the bytes sent per response.
+"""
+
+import argparse
+import time
+
+from benchmarks import common
+
+common.load_example_env()
+
+
+def requests_per_second(client, url, headers, duration):
+    """Issue GETs for `duration` seconds; return (requests/sec, response bytes)."""
+    response = client.get(url, headers=headers)
+    size = int(response.headers.get("content-length", len(response.content)))
+    count = 0
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        client.get(url, headers=headers)
+        count += 1
+    return count / (time.perf_counter() - start), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog endpoint benchmark")
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from app.controllers.behavior_controller import get_behaviors
+    from app.controllers.question_controller import get_questions
+    from main import app
+
+    @app.get("/bench-legacy/question-list", response_model=dict)
+    def legacy_question_list():
+        return get_questions()
+
+    @app.get("/bench-legacy/behavior-list", response_model=dict)
+    def legacy_behavior_list():
+        return get_behaviors()
+
+    client = TestClient(app)
+    identity = {"Accept-Encoding": "identity"}
+    gzip = {"Accept-Encoding": "gzip"}
+
+    rows = []
+    endpoints = (("question-list", "/question"), ("behavior-list", "/behavior"))
+    for name, prefix in endpoints:
+        url = f"{prefix}/{name}"
+        etag = client.get(url, headers=gzip).headers["etag"]
+        variants = [
+            ("before", f"/bench-legacy/{name}", identity),
+            ("precomputed", url, identity),
+            ("precomputed gzip", url, gzip),
+            ("304 If-None-Match", url, {**gzip, "If-None-Match": etag}),
+        ]
+        for variant, variant_url, headers in variants:
+            rps, size = requests_per_second(client, variant_url, headers, args.duration)
+            rows.append(
+                {
+                    "endpoint": name,
+                    "variant": variant,
+                    "req_per_s": rps,
+                    "bytes": size,
+                }
+            )
+
+    common.print_table(
+        "Catalog list endpoints", rows, ["endpoint", "variant", "req_per_s", "bytes"]
+    )
+
+
+if __name__ == "__main__":
+    main()
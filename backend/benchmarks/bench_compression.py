@@ -0,0 +1,123 @@
+"""
+Bytes on the wire and CPU cost of response compression, per endpoint.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_compression [--posts 5] [--images 2]
+        [--image-px 1200] [--repeat 20]
+
+Seeds one user with answers and `--posts` food updates, then fetches the food
+update, answers, catalog and profile endpoints with `Accept-Encoding: identity`,
+`gzip` and (when the brotli package is installed) `br`. For each it reports the
+response bytes as sent, process CPU time per request (`time.process_time`,
+which includes the in-process client decoding the body) and the CPU spent in
+the compressor alone, taken from the `http_compression_seconds` histogram.
+
+Catalog lists are compressed once per catalog version, so their gzip/br rows
+show no compression time. Inline base64 images compress by only about a
+quarter; compare the food update rows before changing COMPRESSION_MIN_SIZE or
+the levels.
+"""
+
+import argparse
+import time
+
+from benchmarks import common
+from benchmarks.bench_food_update_create import random_jpeg
+from benchmarks.bench_hot_paths import build_answers
+
+common.load_example_env()
+
+
+def compression_seconds():
+    """Total compressor CPU seconds recorded so far, over all encodings."""
+    from app.utils.compression import COMPRESSION_SECONDS
+
+    return sum(data["sum"] for data in COMPRESSION_SECONDS.snapshot().values())
+
+
+def measure_endpoint(client, url, headers, repeat):
+    """Return (wire bytes, CPU ms p50, compressor ms mean) over `repeat` GETs."""
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    size = int(response.headers.get("content-length", len(response.content)))
+    cpu = []
+    compressor_before = compression_seconds()
+    for _ in range(repeat):
+        started = time.process_time()
+        client.get(url, headers=headers)
+        cpu.append(time.process_time() - started)
+    compressor_ms = (compression_seconds() - compressor_before) / repeat * 1000
+    cpu.sort()
+    return size, cpu[len(cpu) // 2] * 1000, compressor_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response compression benchmark")
+    parser.add_argument("--posts", type=int, default=5)
+    parser.add_argument("--images", type=int, default=2, help="Images per post")
+    parser.add_argument("--image-px", type=int, default=1200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    common.reset_database()
+
+    from fastapi.testclient import TestClient
+
+    from app.services.catalog import get_catalog
+    from app.utils.compression import available_encodings
+    from main import app
+
+    # The lifespan runs the startup hooks, which precompress the catalog lists
+    with TestClient(app) as client:
+        auth = common.create_user(client)
+        client.post(
+            "/question/submit-answers",
+            json={"answer_list": build_answers(get_catalog().questions)},
+            headers=auth,
+        )
+        for _ in range(args.posts):
+            images = [
+                {"base64_file": random_jpeg(args.image_px)}
+                for _ in range(args.images)
+            ]
+            response = client.post(
+                "/food-update/food-update",
+                json={"description": "benchmark " * 20, "images": images},
+                headers=auth,
+            )
+            assert response.status_code == 200, response.text
+
+        endpoints = (
+            "/food-update/user-food-updates",
+            "/question/get-answers",
+            "/question/question-list",
+            "/behavior/behavior-list",
+            "/auth/profile-details",
+        )
+        rows = []
+        for url in endpoints:
+            for encoding in ("identity",) + available_encodings():
+                headers = {**auth, "Accept-Encoding": encoding}
+                size, cpu_ms, compressor_ms = measure_endpoint(
+                    client, url, headers, args.repeat
+                )
+                rows.append(
+                    {
+                        "endpoint": url,
+                        "encoding": encoding,
+                        "bytes": size,
+                        "cpu_ms": cpu_ms,
+                        "compress_ms": compressor_ms,
+                    }
+                )
+
+    common.print_table(
+        f"GET per request ({args.posts} posts x {args.images} images, "
+        f"{args.image_px}px)",
+        rows,
+        ["endpoint", "encoding", "bytes", "cpu_ms", "compress_ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
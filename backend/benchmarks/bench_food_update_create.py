@@ -0,0 +1,98 @@
+"""
+Benchmark food update creation with 1-10 images per post.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_food_update_create [--image-px 1200] [--repeat 20]
+        [--max-images 10]
+
+Each post uses freshly generated `--image-px` square JPEGs (random noise, so
+blob deduplication does not skew the results and every upload is
+recompressed). Reports latency per image count and the number of SQL
+statements and commits issued per post.
+"""
+
+import argparse
+import base64
+import io
+import os
+
+from benchmarks import common
+
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import event
+
+
+def random_jpeg(size):
+    """Return a base64 JPEG of `size` x `size` random pixels."""
+    image = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return base64.b64encode(output.getvalue()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Food update creation benchmark")
+    parser.add_argument("--image-px", type=int, default=1200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-images", type=int, default=10)
+    args = parser.parse_args()
+
+    common.reset_database()
+
+    import main as app_main
+    from app.database import engine
+
+    counters = {"statements": 0, "commits": 0}
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda *a, **k: counters.__setitem__("statements", counters["statements"] + 1),
+    )
+    event.listen(
+        engine,
+        "commit",
+        lambda *a, **k: counters.__setitem__("commits", counters["commits"] + 1),
+    )
+
+    client = TestClient(app_main.app)
+    headers = common.create_user(client)
+
+    rows = []
+    for image_count in range(1, args.max_images + 1):
+
+        def post():
+            images = [
+                {"base64_file": random_jpeg(args.image_px)}
+                for _ in range(image_count)
+            ]
+            response = client.post(
+                "/food-update/food-update",
+                json={"description": "benchmark", "images": images},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+
+        counters.update(statements=0, commits=0)
+        post()
+        per_post = dict(counters)
+
+        result = common.measure(post, repeat=args.repeat)
+        rows.append(
+            {
+                "images": image_count,
+                **result,
+                "sql/post": per_post["statements"],
+                "commits/post": per_post["commits"],
+            }
+        )
+
+    common.print_table(
+        f"POST /food-update/food-update ({args.image_px}px images)",
+        rows,
+        ["images", "mean_ms", "p50_ms", "p95_ms", "sql/post", "commits/post"],
+    )
+
+
+if __name__ == "__main__":
+    main()
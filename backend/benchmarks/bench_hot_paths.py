@@ -0,0 +1,219 @@
+"""
+Microbenchmarks for controller hot paths, tracked across commits.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_hot_paths [--repeat 30] [--only jwt]
+        [--save] [--compare HEAD~1] [--threshold 0.1] [--fail-on-regression]
+
+Times, per call:
+  - `submit_answers` validation of a full questionnaire, and the controller
+    itself against SQLite;
+  - `prepare_big5_input_text` for a realistic profile;
+  - `tips_generator.clean_text` on a model reply;
+  - JWT creation (`app.utils.auth.create_access_token`) and decoding as done
+    by `get_current_user`;
+  - base64 data URIs for food images, as built by the food update controllers;
+  - `profile_details_controller` plus the JSON encoding FastAPI applies to it.
+
+Runs against the throwaway SQLite database with MOCK inference. `--save`
+stores the results under benchmarks/results/hot_paths/<git revision>.json,
+and `--compare <revision>` prints the change in p50 against a saved run, so
+record a baseline before a change and compare after it. Compare runs from the
+same machine only.
+"""
+
+import argparse
+import base64
+import os
+import sys
+
+from benchmarks import common
+
+common.load_example_env()
+
+BENCHMARK = "hot_paths"
+
+MODEL_REPLY = (
+    "Tip: Before your next meal, pause for three breaths — notice the "
+    "colours and smells on your plate!​\r\nThen eat the first few bites "
+    "slowly \U0001f37d️ and put your fork down between them.   "
+)
+
+
+def build_answers(questions):
+    """One valid answer per catalog question."""
+    answers = []
+    for index, question in enumerate(questions, start=1):
+        options = question.get("options")
+        if question["question_type"] == "MULTI_SELECT_DROPDOWN":
+            answer = options[:2]
+        elif options:
+            answer = options[0]
+        else:
+            answer = "I usually eat at my desk while working"
+        answers.append({"question_id": index, "answer": answer})
+    return answers
+
+
+def cases(args):
+    """Yield (name, callable, calls per sample) for every benchmarked path."""
+    from fastapi.encoders import jsonable_encoder
+    from jose import jwt
+
+    from app.controllers.food_update_controller import food_image_data_uri
+    from app.controllers.question_controller import submit_answers
+    from app.controllers.user_controller import profile_details_controller
+    from app.database import SessionLocal, settings
+    from app.models import FoodImage, User
+    from app.schemas.question import SubmitAnswersRequest
+    from app.services.big_five_generator import (
+        format_answers,
+        prepare_big5_input_text,
+    )
+    from app.services.catalog import get_catalog
+    from app.services.tips_generator import clean_text
+    from app.utils.auth import create_access_token
+
+    catalog = get_catalog()
+    answers = build_answers(catalog.questions)
+    payload = SubmitAnswersRequest(answer_list=answers)
+
+    common.reset_database()
+    db = SessionLocal()
+    user = User(
+        first_name="Bench",
+        last_name="User",
+        email="bench@example.com",
+        hashed_password="x",
+        age=34,
+        occupation="Nurse",
+        lifestyle_type="Active",
+        city="Leeds",
+        country="UK",
+        current_gender="Female",
+        cultural_religious_dietary_influence="Vegetarian",
+        profile_submission=True,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+    def validate_answers():
+        validate = catalog.question_catalog.validate
+        for item in payload.answer_list:
+            validate(item.question_id, item.answer)
+
+    yield "submit_answers validation", validate_answers, 20
+    yield "submit_answers (SQLite)", lambda: submit_answers(payload, db, user), 1
+
+    profile = {
+        column: getattr(user, column)
+        for column in ("first_name", "last_name", "age", "occupation", "city")
+    }
+    profile.update(
+        lifestyle_type=user.lifestyle_type,
+        country=user.country,
+        current_gender=user.current_gender,
+        cultural_religious_dietary_influence=user.cultural_religious_dietary_influence,
+    )
+    formatted_answers = format_answers(
+        {
+            str(item["question_id"]): {"question": q["question_text"], **item}
+            for item, q in zip(answers, catalog.questions)
+        }
+    )
+    behaviors = [
+        {"behavior_title": b["behavior_title"], "high_priority": i % 2 == 0}
+        for i, b in enumerate(catalog.behaviors[:5])
+    ]
+    yield (
+        "prepare_big5_input_text",
+        lambda: prepare_big5_input_text(profile, formatted_answers, behaviors),
+        200,
+    )
+
+    yield "clean_text", lambda: clean_text(MODEL_REPLY), 500
+    yield (
+        "clean_text (paragraphs)",
+        lambda: clean_text(MODEL_REPLY * 10, preserve_paragraphs=True),
+        100,
+    )
+
+    claims = {"sub": user.email}
+    token = create_access_token(claims)
+    yield "jwt create", lambda: create_access_token(claims), 200
+    yield (
+        "jwt decode",
+        lambda: jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm]),
+        200,
+    )
+
+    image = FoodImage(id=1, food_update_id=1, image_path="blobs/ab/abcdef.jpg")
+    data = os.urandom(args.image_kb * 1024)
+    yield (
+        f"food image base64 ({args.image_kb} KB)",
+        lambda: food_image_data_uri(image, base64.b64encode(data).decode("utf-8")),
+        10,
+    )
+
+    yield (
+        "profile_details_controller",
+        lambda: jsonable_encoder(profile_details_controller(user)),
+        200,
+    )
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot path microbenchmarks")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--image-kb", type=int, default=300)
+    parser.add_argument("--only", help="Only cases whose name contains this")
+    parser.add_argument("--save", action="store_true", help="Store the results")
+    parser.add_argument("--compare", help="Git revision or results file to compare")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    rows = []
+    for name, func, number in cases(args):
+        if args.only and args.only not in name:
+            continue
+        timing = common.measure(func, repeat=args.repeat, warmup=2, number=number)
+        rows.append(
+            {
+                "case": name,
+                **timing,
+                "p50_us": timing["p50_ms"] * 1000,
+                "min_us": timing["min_ms"] * 1000,
+            }
+        )
+
+    common.print_table(
+        f"Hot paths at {common.git_revision()} (per call)",
+        rows,
+        ["case", "p50_us", "min_us"],
+    )
+    if args.save:
+        print(f"\nSaved to {common.save_results(BENCHMARK, rows)}")
+
+    if args.compare:
+        baseline = common.load_results(BENCHMARK, args.compare)
+        compared = common.compare_results(
+            rows, baseline["rows"], "case", threshold=args.threshold
+        )
+        for row in compared:
+            row["baseline"] *= 1000
+            row["current"] *= 1000
+        common.print_table(
+            f"p50 in us against {baseline['revision']}",
+            compared,
+            ["case", "baseline", "current", "change", "verdict"],
+        )
+        regressions = [row for row in compared if row["verdict"] == "regression"]
+        if regressions and args.fail_on_regression:
+            sys.exit(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+CPU time per request of the JSON-heavy read endpoints, before and after orjson.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_json_responses [--posts 10] [--images 2]
+        [--image-px 1200] [--repeat 20]
+
+Seeds one user with `--posts` food updates of `--images` random JPEGs each,
+so the gallery endpoints return the base64 payload the app shows. "before"
+mounts the previous handler shape next to the real routes: the controller
+dict under `response_model=dict`, rendered by the stdlib `JSONResponse`.
+"after" is the real route (typed response model, `ORJSONResponse`).
+
+Reports process CPU time per request (`time.process_time`), which is what
+limits a worker, along with wall time and the response size. The in-process
+client adds the same overhead to both variants.
+"""
+
+import argparse
+import time
+
+from benchmarks import common
+from benchmarks.bench_food_update_create import random_jpeg
+
+common.load_example_env()
+
+
+def cpu_per_request(client, url, headers, repeat):
+    """Return (CPU ms p50, wall ms p50, response bytes) over `repeat` GETs."""
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    cpu, wall = [], []
+    for _ in range(repeat):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        client.get(url, headers=headers)
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+    cpu.sort()
+    wall.sort()
+    return cpu[len(cpu) // 2] * 1000, wall[len(wall) // 2] * 1000, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON response benchmark")
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument("--images", type=int, default=2, help="Images per post")
+    parser.add_argument("--image-px", type=int, default=1200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    common.reset_database()
+
+    from fastapi import Depends
+    from fastapi.responses import JSONResponse
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+
+    from app.controllers.food_update_controller import (
+        get_user_food_updates_controller,
+        get_user_uploaded_images_controller,
+    )
+    from app.controllers.user_controller import profile_details_controller
+    from app.database import get_db
+    from app.models import User
+    from app.utils.auth import get_current_user
+    from main import app
+
+    legacy = {"response_model": dict, "response_class": JSONResponse}
+
+    @app.get("/bench-legacy/user-food-updates", **legacy)
+    async def legacy_food_updates(
+        db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    ):
+        return await get_user_food_updates_controller(current_user, db)
+
+    @app.get("/bench-legacy/user-uploaded-images", **legacy)
+    async def legacy_uploaded_images(
+        db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    ):
+        return await get_user_uploaded_images_controller(current_user, db)
+
+    @app.get("/bench-legacy/profile-details", **legacy)
+    def legacy_profile_details(current_user: User = Depends(get_current_user)):
+        return profile_details_controller(current_user)
+
+    client = TestClient(app)
+    headers = common.create_user(client)
+    for _ in range(args.posts):
+        images = [
+            {"base64_file": random_jpeg(args.image_px)} for _ in range(args.images)
+        ]
+        response = client.post(
+            "/food-update/food-update",
+            json={"description": "benchmark", "images": images},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+
+    rows = []
+    endpoints = (
+        ("user-uploaded-images", "/food-update/user-uploaded-images"),
+        ("user-food-updates", "/food-update/user-food-updates"),
+        ("profile-details", "/auth/profile-details"),
+    )
+    for name, url in endpoints:
+        variants = (("before", f"/bench-legacy/{name}"), ("after", url))
+        for variant, variant_url in variants:
+            cpu_ms, wall_ms, size = cpu_per_request(
+                client, variant_url, headers, args.repeat
+            )
+            rows.append(
+                {
+                    "endpoint": name,
+                    "variant": variant,
+                    "cpu_ms": cpu_ms,
+                    "wall_ms": wall_ms,
+                    "bytes": size,
+                }
+            )
+
+    common.print_table(
+        f"GET per request ({args.posts} posts x {args.images} images, "
+        f"{args.image_px}px)",
+        rows,
+        ["endpoint", "variant", "cpu_ms", "wall_ms", "bytes"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Cost of the metrics subsystem.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_metrics_overhead [--requests 2000] [--queries 20000]
+        [--rounds 3]
+
+Measures a single histogram observation, a `/metrics` render, a trivial SQL
+statement with and without the engine hooks, and full requests through the
+in-process ASGI client with the middleware switched on and off. The request
+endpoints are a precomputed catalog list (worst case: almost no work besides
+the middleware) and an authenticated read that runs SQL.
+"""
+
+import argparse
+import time
+
+from benchmarks import common
+
+common.load_example_env()
+
+
+def per_call_us(func, count):
+    """Call `func` `count` times; return the mean cost in microseconds."""
+    func()
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, text
+
+    import main as app_main
+    from app.database import engine
+    from app.utils import instrumentation
+    from app.utils.metrics import Histogram, Registry, render_text
+
+    common.reset_database()
+    client = TestClient(app_main.app)
+    auth = common.create_user(client)
+    client.post(
+        "/question/submit-answers",
+        json={"answer_list": [{"question_id": 1, "answer": "Yes"}]},
+        headers=auth,
+    )
+
+    def set_enabled(enabled):
+        instrumentation.METRICS_ENABLED = enabled
+        hooks = (
+            ("before_cursor_execute", instrumentation._before_cursor_execute),
+            ("after_cursor_execute", instrumentation._after_cursor_execute),
+        )
+        for name, hook in hooks:
+            if enabled and not event.contains(engine, name, hook):
+                event.listen(engine, name, hook)
+            if not enabled and event.contains(engine, name, hook):
+                event.remove(engine, name, hook)
+
+    histogram = Histogram(
+        "bench_seconds",
+        "Benchmark",
+        labelnames=("method", "route"),
+        registry=Registry(),
+    )
+    rows = [
+        {
+            "operation": "histogram observe (2 labels)",
+            "off_us": 0.0,
+            "on_us": per_call_us(
+                lambda: histogram.observe(0.01, method="GET", route="/x"), 200000
+            ),
+        },
+        {
+            "operation": "render /metrics",
+            "off_us": 0.0,
+            "on_us": per_call_us(render_text, 200),
+        },
+    ]
+
+    with engine.connect() as connection:
+
+        def select_one():
+            connection.execute(text("SELECT 1"))
+
+        set_enabled(False)
+        off = per_call_us(select_one, args.queries)
+        set_enabled(True)
+        on = per_call_us(select_one, args.queries)
+    rows.append({"operation": "SQL statement (SELECT 1)", "off_us": off, "on_us": on})
+
+    endpoints = (
+        ("GET /behavior/behavior-list", "/behavior/behavior-list", {}),
+        ("GET /question/get-answers", "/question/get-answers", auth),
+    )
+    for name, url, headers in endpoints:
+        # Alternate off/on rounds and keep the best of each to damp noise
+        results = {False: float("inf"), True: float("inf")}
+        for _ in range(args.rounds):
+            for enabled in (False, True):
+                set_enabled(enabled)
+                cost = per_call_us(
+                    lambda: client.get(url, headers=headers), args.requests
+                )
+                results[enabled] = min(results[enabled], cost)
+        rows.append(
+            {"operation": name, "off_us": results[False], "on_us": results[True]}
+        )
+
+    for row in rows:
+        if row["off_us"]:
+            row["overhead_%"] = (row["on_us"] / row["off_us"] - 1) * 100
+    common.print_table(
+        "Metrics overhead (microseconds per call)",
+        rows,
+        ["operation", "off_us", "on_us", "overhead_%"],
+    )
+
+
+if __name__ == "__main__":
+    main()
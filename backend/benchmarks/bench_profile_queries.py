@@ -0,0 +1,179 @@
+"""
+Benchmark answer and trait filtering in SQL against loading rows into Python.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_profile_queries [--users 100000] [--repeat 5]
+
+Seeds `--users` users with answers to every catalog question and Big Five
+scores, then compares the query API in app/services/profile_queries.py with
+the previous approach of fetching every document and filtering in Python.
+Runs on the throwaway SQLite database by default; point DATABASE_URL at a
+Postgres database migrated to head to measure the JSONB/GIN path.
+"""
+
+import argparse
+import random
+
+from benchmarks import common
+
+common.load_example_env()
+
+SEED_CHUNK = 5000
+
+
+def seed(db, users, questions):
+    """Bulk insert `users` users with random answers and trait scores."""
+    from sqlalchemy import insert
+
+    from app.models import BigFiveTraits, QuestionAnswer, User
+    from app.services.profile_queries import BIG_FIVE_TRAITS
+
+    rng = random.Random(7)
+    for start in range(1, users + 1, SEED_CHUNK):
+        ids = range(start, min(start + SEED_CHUNK, users + 1))
+        db.execute(
+            insert(User),
+            [
+                {
+                    "id": i,
+                    "first_name": "Bench",
+                    "last_name": str(i),
+                    "email": f"user{i}@example.com",
+                    "hashed_password": "x",
+                }
+                for i in ids
+            ],
+        )
+        answers, traits = [], []
+        for i in ids:
+            document = {}
+            for index, question in enumerate(questions, start=1):
+                options = question.get("options")
+                if question["question_type"] == "MULTI_SELECT_DROPDOWN":
+                    answer = rng.sample(options, k=min(2, len(options)))
+                elif options:
+                    answer = rng.choice(options)
+                else:
+                    answer = f"free text {rng.randint(0, 50)}"
+                document[str(index)] = {
+                    "question": question["question_text"],
+                    "answer": answer,
+                }
+            answers.append({"user_id": i, "question_data": document})
+            scores = {trait: rng.random() for trait in BIG_FIVE_TRAITS}
+            traits.append(
+                {
+                    "user_id": i,
+                    "big_five_data": scores,
+                    "max_value": max(scores, key=scores.get),
+                }
+            )
+        db.execute(insert(QuestionAnswer), answers)
+        db.execute(insert(BigFiveTraits), traits)
+        db.commit()
+
+
+def python_answer_scan(db, question_id, answer):
+    from app.models import QuestionAnswer
+
+    matches = []
+    rows = db.query(QuestionAnswer.user_id, QuestionAnswer.question_data)
+    for user_id, document in rows:
+        value = (document.get(str(question_id)) or {}).get("answer")
+        if value == answer or (isinstance(value, list) and answer in value):
+            matches.append(user_id)
+    return matches
+
+
+def python_trait_scan(db, trait, minimum):
+    from app.models import BigFiveTraits
+
+    rows = db.query(BigFiveTraits.user_id, BigFiveTraits.big_five_data)
+    return [user_id for user_id, scores in rows if scores.get(trait, 0) >= minimum]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON answer/trait query benchmark")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+    from app.services.catalog import get_catalog
+    from app.services.profile_queries import (
+        answer_distribution,
+        find_users_by_answer,
+        find_users_by_traits,
+    )
+
+    questions = get_catalog().questions
+    types = [question["question_type"] for question in questions]
+    single = types.index("RADIO") + 1
+    single_answer = questions[single - 1]["options"][0]
+    text = types.index("TEXT") + 1
+
+    common.reset_database()
+    db = SessionLocal()
+    print(f"Seeding {args.users} users into {db.get_bind().dialect.name}...")
+    seed(db, args.users, questions)
+
+    cases = [
+        (
+            f"answer Q{single}={single_answer!r}",
+            lambda: python_answer_scan(db, single, single_answer),
+            lambda: find_users_by_answer(db, single, single_answer, limit=100),
+        ),
+        (
+            f"answer Q{text}='free text 7'",
+            lambda: python_answer_scan(db, text, "free text 7"),
+            lambda: find_users_by_answer(db, text, "free text 7", limit=100),
+        ),
+    ]
+    if "MULTI_SELECT_DROPDOWN" in types:
+        multi = types.index("MULTI_SELECT_DROPDOWN") + 1
+        multi_answer = questions[multi - 1]["options"][0]
+        cases.append(
+            (
+                f"answer Q{multi} has {multi_answer!r}",
+                lambda: python_answer_scan(db, multi, multi_answer),
+                lambda: find_users_by_answer(db, multi, multi_answer, limit=100),
+            )
+        )
+    cases += [
+        (
+            "openness >= 0.9",
+            lambda: python_trait_scan(db, "openness", 0.9),
+            lambda: find_users_by_traits(db, {"openness": (0.9, None)}, limit=100),
+        ),
+    ]
+
+    rows = []
+    for name, python_scan, sql_query in cases:
+        for variant, func in (("python scan", python_scan), ("sql", sql_query)):
+            rows.append(
+                {
+                    "query": name,
+                    "variant": variant,
+                    **common.measure(func, repeat=args.repeat, warmup=1),
+                }
+            )
+    rows.append(
+        {
+            "query": f"distribution Q{single}",
+            "variant": "sql",
+            **common.measure(
+                lambda: answer_distribution(db, single), repeat=args.repeat, warmup=1
+            ),
+        }
+    )
+    db.close()
+
+    common.print_table(
+        f"Profile queries over {args.users} users",
+        rows,
+        ["query", "variant", "mean_ms", "p50_ms", "p95_ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Microbenchmark for `submit_answers` validation over large submissions.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_submit_answers [--answers 1000] [--repeat 50]
+
+Compares validating every answer through the precompiled QuestionCatalog with
+the previous approach (os.getenv + json.loads + rebuilding option sets per
+answer), and times the full controller call against SQLite.
+"""
+
+import argparse
+import json
+import os
+
+from benchmarks import common
+
+common.load_example_env()
+
+
+def legacy_validate(question_id, answer):
+    """The per-answer lookup and validation `submit_answers` used to perform."""
+    question_json = json.loads(os.getenv(f"QUESTION_{question_id}"))
+    question_type = question_json.get("question_type")
+    if question_type == "TEXT":
+        return question_json["question_text"], answer
+    if question_type in ["RADIO", "DROPDOWN"]:
+        if answer not in question_json["options"]:
+            raise ValueError("Invalid selection")
+        return question_json["question_text"], answer
+    if question_type == "MULTI_SELECT_DROPDOWN":
+        if not set(answer).issubset(set(question_json["options"])):
+            raise ValueError("Invalid selection")
+        return question_json["question_text"], answer
+    raise ValueError("Invalid question type")
+
+
+def build_answers(questions, count):
+    """Build `count` valid (question_id, answer) pairs cycling through the catalog."""
+    answers = []
+    for i in range(count):
+        index = i % len(questions)
+        question = questions[index]
+        options = question.get("options")
+        answer = options[i % len(options)] if options else f"free text answer {i}"
+        answers.append((index + 1, answer))
+    return answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="submit_answers microbenchmark")
+    parser.add_argument("--answers", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    from app.controllers.question_controller import submit_answers
+    from app.services.catalog import get_catalog
+    from app.database import SessionLocal
+    from app.models import User
+    from app.schemas.question import SubmitAnswersRequest
+
+    catalog = get_catalog()
+    answers = build_answers(catalog.questions, args.answers)
+
+    def run_legacy():
+        for question_id, answer in answers:
+            legacy_validate(question_id, answer)
+
+    def run_catalog():
+        validate = catalog.question_catalog.validate
+        for question_id, answer in answers:
+            validate(question_id, answer)
+
+    common.reset_database()
+    db = SessionLocal()
+    user = User(
+        first_name="Bench", last_name="User", email="b@x.com", hashed_password="x"
+    )
+    db.add(user)
+    db.commit()
+    payload = SubmitAnswersRequest(
+        answer_list=[{"question_id": qid, "answer": answer} for qid, answer in answers]
+    )
+
+    rows = [
+        {"variant": "legacy validate", **common.measure(run_legacy, args.repeat)},
+        {"variant": "catalog validate", **common.measure(run_catalog, args.repeat)},
+        {
+            "variant": "submit_answers",
+            **common.measure(lambda: submit_answers(payload, db, user), args.repeat),
+        },
+    ]
+    db.close()
+
+    common.print_table(
+        f"Validation of {args.answers} answers",
+        rows,
+        ["variant", "mean_ms", "p50_ms", "p95_ms", "min_ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database and media directory so they
+need no Postgres, GPU services or SMTP server. Import this module before any
+`app` module: it fills in the environment the application reads at import time.
+Results can be saved per git revision and compared with `save_results`,
+`load_results` and `compare_results`.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+WORK_DIR = Path(os.getenv("BENCH_WORK_DIR") or tempfile.mkdtemp(prefix="me-bench-"))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{WORK_DIR / 'bench.db'}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("SMTP_SERVER", "localhost")
+os.environ.setdefault("SMTP_PORT", "2525")
+os.environ.setdefault("MEDIA_ROOT", str(WORK_DIR / "media"))
+os.environ.setdefault("MOCK", "True")
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def load_example_env():
+    """Load QUESTION_*/BEHAVIOR_* catalog entries from .example.env if unset."""
+    example_env = BACKEND_DIR / ".example.env"
+    for line in example_env.read_text().splitlines():
+        if line.startswith(("QUESTION_", "BEHAVIOR_")) and "=" in line:
+            key, value = line.split("=", 1)
+            os.environ.setdefault(key, value)
+
+
+def reset_database():
+    """Drop and recreate every table in the benchmark database."""
+    from app.database import Base, engine
+    import app.models  # noqa: F401  (registers all models)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def create_user(client, email="bench@example.com", password="benchmark"):
+    """
+    Register and log in a user through the API.
+
+    Returns:
+        dict: Authorization header for the new user.
+    """
+    client.post(
+        "/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "first_name": "Bench",
+            "last_name": "User",
+        },
+    )
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    token = response.json()["data"]["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def measure(func, repeat=20, warmup=2, number=1):
+    """
+    Time `func` and summarise the samples.
+
+    Args:
+        func (callable): Zero-argument callable to time.
+        repeat (int): Number of timed samples.
+        warmup (int): Untimed calls made first.
+        number (int): Calls per sample, for functions too fast to time one by
+            one; each sample is the mean of its calls.
+
+    Returns:
+        dict: mean, p50, p95 and min in milliseconds per call.
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    calls = range(number)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in calls:
+            func()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+    }
+
+
+def print_table(title, rows, columns):
+    """Print benchmark rows as an aligned text table."""
+
+    def fmt(value):
+        return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+    widths = [
+        max([len(str(col))] + [len(fmt(row.get(col, ""))) for row in rows])
+        for col in columns
+    ]
+    print(f"\n{title}")
+    print("  ".join(str(col).ljust(w) for col, w in zip(columns, widths)))
+    for row in rows:
+        print(
+            "  ".join(fmt(row.get(col, "")).ljust(w) for col, w in zip(columns, widths))
+        )
+
+
+def git_revision():
+    """Short hash of HEAD, suffixed with "-dirty" when the tree has changes."""
+    revision = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    if not revision:
+        return "unknown"
+    changes = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=no"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    return f"{revision}-dirty" if changes else revision
+
+
+def save_results(benchmark, rows):
+    """
+    Store benchmark rows under results/<benchmark>/<revision>.json.
+
+    Returns:
+        Path: The file written.
+    """
+    path = RESULTS_DIR / benchmark / f"{git_revision()}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "revision": git_revision(),
+                "python": sys.version.split()[0],
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "rows": rows,
+            },
+            indent=2,
+        )
+    )
+    return path
+
+
+def load_results(benchmark, revision):
+    """
+    Load rows saved by `save_results` for a git revision (any ref git can
+    resolve, e.g. HEAD~1 or main) or from a results file path.
+    """
+    path = Path(revision)
+    if not path.is_file():
+        resolved = subprocess.run(
+            ["git", "rev-parse", "--short", revision],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        path = RESULTS_DIR / benchmark / f"{resolved or revision}.json"
+    if not path.is_file():
+        raise FileNotFoundError(
+            f"No saved {benchmark} results for {revision} (run with --save there)"
+        )
+    return json.loads(path.read_text())
+
+
+def compare_results(rows, baseline_rows, key, metric="p50_ms", threshold=0.10):
+    """
+    Compare `metric` of each row with the baseline row of the same `key`.
+
+    Returns:
+        list[dict]: key, baseline, current, relative change and a verdict of
+        "regression", "improvement" or "" beyond +/- `threshold`.
+    """
+    baseline = {row[key]: row for row in baseline_rows}
+    compared = []
+    for row in rows:
+        before = baseline.get(row[key])
+        if before is None or not before[metric]:
+            continue
+        change = row[metric] / before[metric] - 1
+        verdict = ""
+        if change > threshold:
+            verdict = "regression"
+        elif change < -threshold:
+            verdict = "improvement"
+        compared.append(
+            {
+                key: row[key],
+                "baseline": before[metric],
+                "current": row[metric],
+                "change": f"{change:+.1%}",
+                "verdict": verdict,
+            }
+        )
+    return compared
@@ -0,0 +1,5 @@
+"""
+Load testing with local stand-ins for every external dependency.
+
+See `loadtest.run` for usage.
+"""
@@ -0,0 +1,318 @@
+"""
+Run a load test against a local server with every dependency stubbed.
+
+Usage (from the backend directory):
+    python -m loadtest.run [--users 20] [--duration 60] [--ramp-up 5]
+        [--scenarios daily=3,browse=2,password_reset=1] [--accounts 1000]
+        [--llm-latency-ms 800] [--trait-latency-ms 50] [--workers 1]
+        [--database-url postgresql://... --reset-db] [--output results.json]
+
+One command does everything. It starts stub inference servers (tip LLM and
+trait server) with the configured latency and an SMTP sink, then seeds a
+database: a throwaway SQLite file unless `--database-url` is given. It then
+launches `uvicorn main:app` pointed at all of them and runs the scenario mix
+from `--users` concurrent virtual users. Each iteration logs in as the next
+seeded account and runs one scenario picked by weight.
+
+The report gives throughput and latency percentiles per route, stub call
+counts and the top SQL fingerprints from /admin/queries. A fixed `--seed`
+makes the data and the scenario sequence reproducible. Latencies still depend
+on the machine. The client runs in the same Python process as the stubs, so
+on a small machine compare runs rather than reading absolute numbers.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from loadtest import scenarios
+from loadtest.seed import seed_database, user_email
+from loadtest.stubs import (
+    InferenceStub,
+    Latency,
+    SmtpSink,
+    make_self_signed_certificate,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+PASSWORD = "loadtest-password"
+ADMIN_KEY = "loadtest-admin"
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_mix(value):
+    """`daily=3,browse=1` -> {"daily": 3.0, "browse": 1.0}."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in scenarios.SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario {name!r}; choose from {sorted(scenarios.SCENARIOS)}"
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def catalog_environment():
+    """QUESTION_*/BEHAVIOR_* catalog entries from .example.env."""
+    entries = {}
+    for line in (BACKEND_DIR / ".example.env").read_text().splitlines():
+        if line.startswith(("QUESTION_", "BEHAVIOR_")) and "=" in line:
+            key, value = line.split("=", 1)
+            entries[key] = value
+    return entries
+
+
+def server_environment(args, work_dir, stub, sink):
+    environment = {
+        **catalog_environment(),
+        "DATABASE_URL": args.database_url or f"sqlite:///{work_dir / 'loadtest.db'}",
+        "SECRET_KEY": "loadtest-secret",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+        "ADMIN_SECRET_KEY": ADMIN_KEY,
+        "MEDIA_ROOT": str(work_dir / "media"),
+        "MOCK": "false",
+        "TIP_LLM_URL": stub.tip_url,
+        "TRAIT_SERVER_URL": stub.trait_url,
+        "SMTP_SERVER": sink.host,
+        "SMTP_PORT": str(sink.port),
+        "SMTP_USERNAME": "loadtest@example.com",
+        "SMTP_PASSWORD": "loadtest",
+        "PYTHONUNBUFFERED": "1",
+    }
+    os.environ.update(environment)  # The seeder imports the app in this process
+    return {**os.environ, **environment}
+
+
+def start_server(environment, port, workers, log_path):
+    log_file = open(log_path, "w")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=environment,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if requests.get(base_url + "/", timeout=1).ok:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    log_tail = Path(log_path).read_text()[-3000:]
+    sys.exit(f"Server did not start, see {log_path}:\n{log_tail}")
+
+
+def run_load(args, base_url, sink):
+    """Run virtual users until the duration is over; returns the Recorder."""
+    recorder = scenarios.Recorder()
+    accounts = itertools.count()
+    accounts_lock = threading.Lock()
+    names = list(args.scenarios)
+    weights = [args.scenarios[name] for name in names]
+    deadline = time.monotonic() + args.ramp_up + args.duration
+
+    def virtual_user(number):
+        rng = random.Random(args.seed * 1000 + number)
+        time.sleep(args.ramp_up * number / max(args.users, 1))
+        user = scenarios.VirtualUser(
+            base_url, recorder, PASSWORD, args.image_px, smtp_sink=sink
+        )
+        while time.monotonic() < deadline:
+            with accounts_lock:
+                account = next(accounts) % args.accounts + 1
+            if user.login(user_email(account)):
+                scenario = rng.choices(names, weights)[0]
+                scenarios.SCENARIOS[scenario](user)
+            user.iteration += 1
+            time.sleep(args.think_ms / 1000)
+
+    threads = [
+        threading.Thread(target=virtual_user, args=(number,), daemon=True)
+        for number in range(args.users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def summarize(recorder, elapsed):
+    rows = []
+    for name, samples in sorted(recorder.samples.items()):
+        samples = sorted(samples)
+        row = {
+            "route": name,
+            "requests": len(samples),
+            "errors": recorder.errors[name],
+            "rps": len(samples) / elapsed,
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "max_ms": samples[-1] * 1000,
+            "statuses": dict(recorder.statuses[name]),
+        }
+        for p in PERCENTILES:
+            row[f"p{p}_ms"] = percentile(samples, p) * 1000
+        rows.append(row)
+    return rows
+
+
+def print_report(rows, elapsed, stub, sink, queries):
+    columns = ["route", "requests", "errors", "rps", "mean_ms"]
+    columns += [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+
+    def fmt(value):
+        return f"{value:.1f}" if isinstance(value, float) else str(value)
+
+    widths = [
+        max([len(column)] + [len(fmt(row[column])) for row in rows])
+        for column in columns
+    ]
+    print()
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print(
+            "  ".join(fmt(row[column]).ljust(w) for column, w in zip(columns, widths))
+        )
+
+    http_rows = [row for row in rows if not row["route"].startswith("(")]
+    total = sum(row["requests"] for row in http_rows)
+    errors = sum(row["errors"] for row in http_rows)
+    print(
+        f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+        f"{errors} errors ({errors / max(total, 1):.1%})"
+    )
+    print(f"Stub calls: {dict(stub.calls)}; emails received: {sink.received}")
+    if queries:
+        print("\nTop SQL by database time:")
+        for item in queries["fingerprints"][:5]:
+            print(
+                f"  {item['total_ms']:>9.0f} ms  {item['calls']:>6} calls  "
+                f"p95 {item['p95_ms']:.1f} ms  {item['statement'][:90]}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load test")
+    parser.add_argument("--users", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds")
+    parser.add_argument("--scenarios", type=parse_mix, default=parse_mix("daily"))
+    parser.add_argument("--think-ms", type=float, default=500)
+    parser.add_argument("--accounts", type=int, default=1000, help="Seeded users")
+    parser.add_argument("--big-five-share", type=float, default=0.5)
+    parser.add_argument("--image-px", type=int, default=640)
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--trait-latency-ms", type=float, default=50)
+    parser.add_argument("--trait-jitter-ms", type=float, default=10)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--database-url", help="Defaults to a throwaway SQLite file")
+    parser.add_argument(
+        "--reset-db",
+        action="store_true",
+        help="Confirm --database-url may be dropped and reseeded",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--work-dir", help="Keep the database, media and logs here")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if args.database_url and not args.reset_db:
+        sys.exit("--database-url is dropped and reseeded; pass --reset-db to confirm")
+    random.seed(args.seed)
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="me-loadtest-"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    stub = InferenceStub(
+        Latency(args.llm_latency_ms, args.llm_jitter_ms, args.stub_error_rate),
+        Latency(args.trait_latency_ms, args.trait_jitter_ms, args.stub_error_rate),
+    ).start()
+    sink = SmtpSink(make_self_signed_certificate(work_dir)).start()
+    environment = server_environment(args, work_dir, stub, sink)
+
+    print(f"Seeding {args.accounts} users into {environment['DATABASE_URL']}")
+    seed_database(args.accounts, PASSWORD, args.big_five_share, args.seed)
+
+    log_path = work_dir / "server.log"
+    server, base_url = start_server(environment, free_port(), args.workers, log_path)
+    print(
+        f"Server at {base_url} (log: {log_path}); {args.users} users for "
+        f"{args.duration:.0f}s after {args.ramp_up:.0f}s ramp-up"
+    )
+    try:
+        started = time.monotonic()
+        recorder = run_load(args, base_url, sink)
+        elapsed = time.monotonic() - started  # Includes the ramp-up
+        try:
+            queries = requests.get(
+                base_url + "/admin/queries",
+                headers={"X-Admin-Key": ADMIN_KEY},
+                timeout=10,
+            ).json()["data"]
+        except (requests.RequestException, ValueError, KeyError):
+            queries = None
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stub.stop()
+        sink.stop()
+
+    rows = summarize(recorder, elapsed)
+    print_report(rows, elapsed, stub, sink, queries)
+    if args.output:
+        settings = {
+            key: value for key, value in vars(args).items() if key != "database_url"
+        }
+        Path(args.output).write_text(
+            json.dumps(
+                {
+                    "settings": settings,
+                    "elapsed_seconds": elapsed,
+                    "routes": rows,
+                    "stub_calls": dict(stub.calls),
+                    "emails": sink.received,
+                    "queries": queries,
+                },
+                indent=2,
+            )
+        )
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
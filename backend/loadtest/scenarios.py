@@ -0,0 +1,221 @@
+"""
+User journeys run by the load test.
+
+A scenario is a function taking a logged-in `VirtualUser`; each call is one
+iteration of the journey for one seeded account. Requests are recorded under a
+stable name (method and route template), so results aggregate per route.
+"""
+
+import base64
+import io
+import os
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from PIL import Image
+
+TIPS_STREAM_TIMEOUT = 120
+OTP_WAIT_SECONDS = 5
+GOALS = (
+    "Eat slowly and put the fork down between bites",
+    "No screens during dinner",
+    "Stop eating when I feel 80% full",
+    "Drink a glass of water before each meal",
+)
+
+
+class Recorder:
+    """Thread-safe latency samples and outcomes per request name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, seconds, status, ok):
+        with self._lock:
+            self.samples[name].append(seconds)
+            self.statuses[name][status] += 1
+            if not ok:
+                self.errors[name] += 1
+
+
+class VirtualUser:
+    """An HTTP session acting as one seeded account at a time."""
+
+    def __init__(self, base_url, recorder, password, image_px=640, smtp_sink=None):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.password = password
+        self.image_px = image_px
+        self.smtp_sink = smtp_sink
+        self.session = requests.Session()
+        self.email = None
+        self.iteration = 0
+
+    def request(self, name, method, path, expect=(200,), **kwargs):
+        """Send one request, record it under `name` and return the response."""
+        kwargs.setdefault("timeout", 120)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(name, time.perf_counter() - started, 0, False)
+            return None
+        elapsed = time.perf_counter() - started
+        self.recorder.record(
+            name, elapsed, response.status_code, response.status_code in expect
+        )
+        return response
+
+    def login(self, email):
+        self.email = email
+        self.session.headers.pop("Authorization", None)
+        response = self.request(
+            "POST /auth/login",
+            "POST",
+            "/auth/login",
+            json={"email": email, "password": self.password},
+        )
+        if response is None or response.status_code != 200:
+            return False
+        token = response.json()["data"]["access_token"]
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        return True
+
+    def wait_for_event(self, name, path, first_token_name=None):
+        """
+        Read a server-sent event stream until its first event other than `token`.
+
+        Records the request under `name` from start to that event and returns
+        the event name, or None if the stream failed or ended without one. With
+        `first_token_name`, the time to the first `token` event, if any, is
+        recorded under that name too.
+        """
+        started = time.perf_counter()
+        status, event = 0, None
+        first_token = True
+        try:
+            with self.session.get(
+                self.base_url + path, stream=True, timeout=TIPS_STREAM_TIMEOUT
+            ) as response:
+                status = response.status_code
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("event:"):
+                        continue
+                    event = line.split(":", 1)[1].strip()
+                    if event != "token":
+                        break
+                    if first_token and first_token_name:
+                        self.recorder.record(
+                            first_token_name, time.perf_counter() - started, 200, True
+                        )
+                    first_token, event = False, None
+        except requests.RequestException:
+            pass
+        self.recorder.record(
+            name, time.perf_counter() - started, status, event is not None
+        )
+        return event
+
+    def random_jpeg(self):
+        """A fresh base64 JPEG, so blob deduplication never short-circuits it."""
+        size = self.image_px
+        image = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=85)
+        return base64.b64encode(output.getvalue()).decode()
+
+
+def daily(user):
+    """Set today's goal, wait for the tip, post a meal, open the gallery."""
+    user.request(
+        "POST /goal/submit-user-goal",
+        "POST",
+        "/goal/submit-user-goal",
+        json={"goal_text": GOALS[user.iteration % len(GOALS)]},
+    )
+
+    # The goal schedules tip generation; wait for it on the push stream
+    started = time.perf_counter()
+    event = user.wait_for_event(
+        "GET /tips/stream-user-tip",
+        "/tips/stream-user-tip",
+        first_token_name="(first tip token on stream)",
+    )
+    user.recorder.record(
+        "(tip ready after goal)", time.perf_counter() - started, 200, event == "tip"
+    )
+
+    user.request(
+        "POST /food-update/food-update",
+        "POST",
+        "/food-update/food-update",
+        json={
+            "description": "Load test meal",
+            "images": [{"base64_file": user.random_jpeg()}],
+        },
+    )
+    user.request(
+        "GET /food-update/user-uploaded-images",
+        "GET",
+        "/food-update/user-uploaded-images",
+    )
+    user.request(
+        "GET /food-update/user-food-updates", "GET", "/food-update/user-food-updates"
+    )
+
+
+def browse(user):
+    """Read-only screens: profile, catalogs, today's goal and tip."""
+    user.request("GET /auth/profile-details", "GET", "/auth/profile-details")
+    user.request("GET /question/question-list", "GET", "/question/question-list")
+    user.request("GET /behavior/behavior-list", "GET", "/behavior/behavior-list")
+    user.request("GET /goal/get-user-goal", "GET", "/goal/get-user-goal")
+    # Users seeded without Big Five scores get a 404
+    user.request(
+        "GET /big-five/get-details",
+        "GET",
+        "/big-five/get-details",
+        expect=(200, 404),
+    )
+
+
+def password_reset(user):
+    """Request an OTP, read it from the SMTP sink and reset the password."""
+    requested_at = time.time()
+    sent = user.request(
+        "POST /auth/forget-password",
+        "POST",
+        "/auth/forget-password",
+        json={"email": user.email},
+    )
+    if sent is None or not sent.ok or user.smtp_sink is None:
+        return
+
+    deadline = time.monotonic() + OTP_WAIT_SECONDS
+    otp = user.smtp_sink.latest_otp(user.email, since=requested_at)
+    while otp is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+        otp = user.smtp_sink.latest_otp(user.email, since=requested_at)
+    if otp is None:
+        user.recorder.record("(otp delivered)", OTP_WAIT_SECONDS, 0, False)
+        return
+
+    # Same password again, so the account keeps working for other scenarios
+    user.request(
+        "POST /auth/password-reset",
+        "POST",
+        "/auth/password-reset",
+        json={"email": user.email, "otp": otp, "new_password": user.password},
+    )
+
+
+SCENARIOS = {
+    "daily": daily,
+    "browse": browse,
+    "password_reset": password_reset,
+}
@@ -0,0 +1,116 @@
+"""
+Seed the load test database with users ready to log in.
+
+Every user gets answers to the catalog questions and a first-priority behavior;
+a share of them also get stored Big Five scores, so tip generation exercises
+both the Big Five path and the trait-service path of the trait resolver.
+"""
+
+import random
+
+from sqlalchemy import insert
+
+SEED_CHUNK = 1000
+
+
+def user_email(index):
+    return f"loadtest{index}@example.com"
+
+
+def _answer(rng, question):
+    options = question.get("options")
+    if question["question_type"] == "MULTI_SELECT_DROPDOWN":
+        return rng.sample(options, k=min(2, len(options)))
+    if options:
+        return rng.choice(options)
+    return f"free text {rng.randint(0, 50)}"
+
+
+def seed_database(users, password, big_five_share=0.5, seed=7):
+    """
+    Recreate all tables and insert `users` users sharing one password.
+
+    The password is hashed once: bcrypt hashing each user would dominate the
+    seeding time.
+
+    Args:
+        users (int): Number of users, emailed loadtest1..N@example.com.
+        password (str): Plain password of every user.
+        big_five_share (float): Fraction of users with stored Big Five scores.
+        seed (int): Random seed, so runs are reproducible.
+    """
+    from app.database import Base, SessionLocal, engine
+    from app.models import BigFiveTraits, QuestionAnswer, User, UserBehavior
+    from app.models.big_five_traits import BIG_FIVE_TRAITS, STATUS_READY
+    from app.services.catalog import get_catalog
+    from app.utils.auth import pwd_context
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    catalog = get_catalog()
+    hashed_password = pwd_context.hash(password)
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        for start in range(1, users + 1, SEED_CHUNK):
+            ids = range(start, min(start + SEED_CHUNK, users + 1))
+            db.execute(
+                insert(User),
+                [
+                    {
+                        "id": i,
+                        "first_name": "Load",
+                        "last_name": f"Test {i}",
+                        "email": user_email(i),
+                        "hashed_password": hashed_password,
+                        "profile_submission": True,
+                    }
+                    for i in ids
+                ],
+            )
+            answers, behaviors, traits = [], [], []
+            for i in ids:
+                answers.append(
+                    {
+                        "user_id": i,
+                        "question_data": {
+                            str(index): {
+                                "question": question["question_text"],
+                                "answer": _answer(rng, question),
+                            }
+                            for index, question in enumerate(catalog.questions, 1)
+                        },
+                        "catalog_version": catalog.version,
+                    }
+                )
+                behavior_id = rng.randint(1, len(catalog.behaviors))
+                behaviors.append(
+                    {
+                        "user_id": i,
+                        "behavior_id": str(behavior_id),
+                        "behavior_title": catalog.behaviors[behavior_id - 1][
+                            "behavior_title"
+                        ],
+                        "first_priority": True,
+                        "high_priority": False,
+                        "catalog_version": catalog.version,
+                    }
+                )
+                if rng.random() < big_five_share:
+                    scores = {trait: rng.random() for trait in BIG_FIVE_TRAITS}
+                    traits.append(
+                        {
+                            "user_id": i,
+                            "big_five_data": scores,
+                            "max_value": max(scores, key=scores.get),
+                            "status": STATUS_READY,
+                        }
+                    )
+            db.execute(insert(QuestionAnswer), answers)
+            db.execute(insert(UserBehavior), behaviors)
+            if traits:
+                db.execute(insert(BigFiveTraits), traits)
+            db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,328 @@
+"""
+Local stand-ins for the remote services the backend calls.
+
+`InferenceStub` answers like the GPU tip LLM (`POST /generate`) and the trait
+server (`POST /predict-trait`) after a configurable delay. A tip request with
+`"stream": true` is answered token by token in newline-delimited JSON, the
+first token after a fifth of the delay. `SmtpSink` accepts
+the STARTTLS + AUTH + SENDMAIL exchange of `app.utils.email.send_email` and
+keeps the messages it receives. All of them run on daemon threads.
+"""
+
+import email
+import hashlib
+import json
+import logging
+import random
+import re
+import socketserver
+import ssl
+import subprocess
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+TRAITS = (
+    "openness",
+    "conscientiousness",
+    "extraversion",
+    "agreeableness",
+    "neuroticism",
+)
+OTP_PATTERN = re.compile(r"OTP Code: <strong>(\d+)</strong>")
+TIP_SENTENCES = (
+    "Put your fork down between bites and notice the texture of your food.",
+    "Take three slow breaths before you start eating.",
+    "Eat your next meal without your phone and check in with your hunger halfway.",
+    "Serve a smaller portion and wait ten minutes before deciding on seconds.",
+)
+
+
+class Latency:
+    """A delay of `mean_ms` +/- `jitter_ms` (uniform), failing at `error_rate`."""
+
+    def __init__(self, mean_ms=0.0, jitter_ms=0.0, error_rate=0.0):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+
+    def sample(self):
+        """Draw one call: (delay in seconds, whether it succeeds)."""
+        delay = self.mean_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(delay, 0) / 1000, random.random() >= self.error_rate
+
+    def wait(self):
+        """Sleep for one delay; returns False if this call should fail."""
+        delay, ok = self.sample()
+        time.sleep(delay)
+        return ok
+
+
+class _InferenceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reply(self, text, delay):
+        # Prefill takes a fifth of the delay, decoding the rest, evenly per token
+        tokens = re.findall(r"\s*\S+", text) or [text]
+        time.sleep(delay * 0.2)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        # A client that stops reading early drops the connection anyway
+        self.send_header("Connection", "close")
+        self.close_connection = True
+        self.end_headers()
+        chunks = [{"response": token, "done": False} for token in tokens]
+        chunks.append({"response": "", "done": True})
+        try:
+            for i, chunk in enumerate(chunks):
+                if i:
+                    time.sleep(delay * 0.8 / len(tokens))
+                line = json.dumps(chunk).encode() + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client stopped reading, e.g. at the "###" marker
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._reply(400, {"detail": "invalid JSON"})
+            return
+
+        if self.path == "/generate":
+            service, latency, answer = "tip_llm", stub.llm_latency, stub.tip_reply
+        elif self.path == "/predict-trait":
+            service, latency, answer = "trait", stub.trait_latency, stub.trait_reply
+        else:
+            self._reply(404, {"detail": "not found"})
+            return
+
+        if service == "tip_llm" and payload.get("stream"):
+            delay, ok = latency.sample()
+            stub.count(service, ok)
+            if not ok:
+                time.sleep(delay * 0.2)
+                self._reply(503, {"detail": "stub failure"})
+                return
+            self._stream_reply(answer(payload)["response"], delay)
+            return
+
+        ok = latency.wait()
+        stub.count(service, ok)
+        if not ok:
+            self._reply(503, {"detail": "stub failure"})
+            return
+        self._reply(200, answer(payload))
+
+
+class InferenceStub:
+    """HTTP server standing in for both the tip LLM and the trait server."""
+
+    def __init__(self, llm_latency, trait_latency, host="127.0.0.1", port=0):
+        self.llm_latency = llm_latency
+        self.trait_latency = trait_latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _InferenceHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.host, self.port = self._server.server_address[:2]
+
+    @property
+    def tip_url(self):
+        return f"http://{self.host}:{self.port}/generate"
+
+    @property
+    def trait_url(self):
+        return f"http://{self.host}:{self.port}/predict-trait"
+
+    def count(self, service, ok):
+        with self._lock:
+            self.calls[f"{service}_{'ok' if ok else 'error'}"] += 1
+
+    def tip_reply(self, payload):
+        # Shaped like the real model output, trailing section included
+        tip = random.choice(TIP_SENTENCES)
+        return {"response": f"Tip: {tip}\n### Input:\nDominant Trait: ..."}
+
+    def trait_reply(self, payload):
+        # Deterministic per text, like a real model
+        digest = hashlib.sha256(payload.get("text", "").encode()).digest()
+        scores = {trait: digest[i] / 255 for i, trait in enumerate(TRAITS)}
+        total = sum(scores.values()) or 1
+        scores = {trait: value / total for trait, value in scores.items()}
+        return {
+            "dominant_trait": max(scores, key=scores.get).capitalize(),
+            "trait_scores": scores,
+        }
+
+    def start(self):
+        threading.Thread(
+            target=self._server.serve_forever, name="inference-stub", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_self_signed_certificate(directory):
+    """
+    Create a throwaway certificate for STARTTLS with the `openssl` CLI.
+
+    `smtplib.starttls()` does not verify certificates by default, so any
+    certificate works. Returns (certfile, keyfile), or None without openssl.
+    """
+    certfile = Path(directory) / "smtp-cert.pem"
+    keyfile = Path(directory) / "smtp-key.pem"
+    try:
+        subprocess.run(
+            [
+                "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+                "-keyout", str(keyfile), "-out", str(certfile),
+                "-days", "1", "-subj", "/CN=localhost",
+            ],
+            check=True,
+            capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"No STARTTLS in the SMTP sink, certificate failed: {e}")
+        return None
+    return str(certfile), str(keyfile)
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, STARTTLS, AUTH, MAIL, RCPT, DATA."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+        self.wfile.flush()
+
+    def handle(self):
+        sink = self.server.sink
+        self.reply("220 localhost ESMTP load test sink")
+        sender, recipients = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            command = line[:4].upper()
+
+            if command in ("EHLO", "HELO"):
+                features = ["localhost", "AUTH PLAIN"]
+                if sink.tls_context is not None:
+                    features.append("STARTTLS")
+                for feature in features[:-1]:
+                    self.reply(f"250-{feature}")
+                self.reply(f"250 {features[-1]}")
+            elif line.upper() == "STARTTLS" and sink.tls_context is not None:
+                self.reply("220 Ready to start TLS")
+                self.connection = sink.tls_context.wrap_socket(
+                    self.connection, server_side=True
+                )
+                self.rfile = self.connection.makefile("rb")
+                self.wfile = self.connection.makefile("wb")
+            elif command == "AUTH":
+                # smtplib sends PLAIN credentials inline; any are accepted
+                self.reply("235 Authentication successful")
+            elif command == "MAIL":
+                sender, recipients = line.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(line.split(":", 1)[1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    body.append(data_line.decode("utf-8", "replace"))
+                sink.store(sender, recipients, "".join(body))
+                self.reply("250 OK: queued")
+            elif command == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SmtpSink:
+    """SMTP server that accepts every message and keeps the latest ones."""
+
+    def __init__(self, certificate=None, host="127.0.0.1", port=0, keep=1000):
+        self.tls_context = None
+        if certificate is not None:
+            self.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.tls_context.load_cert_chain(*certificate)
+        self.received = 0
+        self.messages = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._server = _ThreadingTCPServer((host, port), _SmtpHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address[:2]
+
+    def store(self, sender, recipients, body):
+        with self._lock:
+            self.received += 1
+            self.messages.append(
+                {"from": sender, "to": recipients, "body": body, "at": time.time()}
+            )
+
+    def latest_otp(self, recipient, since=0.0):
+        """The newest OTP code mailed to `recipient` after `since`, or None."""
+        with self._lock:
+            messages = list(self.messages)
+        for message in reversed(messages):
+            if message["at"] < since or recipient not in message["to"]:
+                continue
+            parsed = email.message_from_string(message["body"])
+            for part in parsed.walk():
+                payload = part.get_payload(decode=True) or b""
+                match = OTP_PATTERN.search(payload.decode("utf-8", "replace"))
+                if match:
+                    return match.group(1)
+        return None
+
+    def start(self):
+        threading.Thread(
+            target=self._server.serve_forever, name="smtp-sink", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,13 +1,39 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 import asyncio
 import logging
 
 # Routes
-from app.routes import user, question, food_update, behavior, goal, tips, big_five
+from app.routes import (
+    user,
+    question,
+    food_update,
+    behavior,
+    goal,
+    tips,
+    big_five,
+    media,
+    admin,
+)
 
 # Model preload manager
 from models import llm_manager
+from app.controllers.behavior_controller import get_behaviors_body
+from app.controllers.question_controller import get_questions_body
+from app.services.catalog import (
+    get_catalog,
+    on_catalog_published,
+    start_catalog_watcher,
+    stop_catalog_watcher,
+)
+from app.services.big_five_refresh import start_big_five_refresher
+from app.database import engine
+from app.utils.compression import CompressionMiddleware
+from app.utils.instrumentation import MetricsMiddleware, instrument_engine
+from app.utils.metrics import render_text
+from app.utils import query_stats, tracing
+from app.utils.profiling import ProfilingMiddleware
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,7 +41,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Mindful Eating Backend", version="1.0")
+# orjson renders every JSON response; several times faster than the stdlib on
+# the large base64 image payloads
+app = FastAPI(
+    title="Mindful Eating Backend",
+    version="1.0",
+    default_response_class=ORJSONResponse,
+)
 
 # CORS
 origins = [
@@ -35,6 +67,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for JSON and text bodies; inside the metrics middleware, so the
+# recorded response sizes are the bytes actually sent
+app.add_middleware(CompressionMiddleware)
+
+# Metrics: per-route latency/size/status, SQL statement timings
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+# Statement fingerprints per route and the slow-query log (see /admin/queries)
+query_stats.instrument_engine(engine)
+
+# Tracing (TRACING_ENABLED): request, SQL and background task spans
+app.add_middleware(tracing.TracingMiddleware)
+tracing.instrument_engine(engine)
+tracing.instrument_background_tasks()
+
+# Stack sampling of admin-armed routes and slow requests (see /admin/profiling)
+app.add_middleware(ProfilingMiddleware)
+
 # Routes
 app.include_router(user.router, prefix="/auth", tags=["Authentication"])
 app.include_router(question.router, prefix="/question", tags=["Question"])
@@ -43,6 +94,8 @@ app.include_router(goal.router, prefix="/goal", tags=["Goal"])
 app.include_router(tips.router, prefix="/tips", tags=["Tips"])
 app.include_router(food_update.router, prefix="/food-update", tags=["Food Update"])
 app.include_router(big_five.router, prefix="/big-five", tags=["Big Five Traits"])
+app.include_router(media.router, prefix="/media", tags=["Media"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 
 @app.get("/")
@@ -50,6 +103,44 @@ def root():
     return {"message": "API is running ======= "}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of all application metrics."""
+    return PlainTextResponse(
+        render_text(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def precompute_catalog_bodies(catalog):
+    """Serialize and compress the catalog list responses of a new version."""
+    get_questions_body(catalog)
+    get_behaviors_body(catalog)
+
+
+@app.on_event("startup")
+def load_catalog():
+    """Load the question/behavior catalog and watch its source for changes."""
+    on_catalog_published(precompute_catalog_bodies)
+    precompute_catalog_bodies(get_catalog())
+    start_catalog_watcher()
+
+
+@app.on_event("shutdown")
+def stop_watching_catalog():
+    stop_catalog_watcher()
+
+
+@app.on_event("startup")
+def start_background_refresh():
+    """Recompute Big Five traits in the background when users' inputs change."""
+    start_big_five_refresher()
+
+
+@app.on_event("shutdown")
+def export_pending_spans():
+    tracing.flush_spans()
+
+
 @app.on_event("startup")
 async def preload_models():
     """Load heavy models BEFORE dashboard or login is hit."""
@@ -0,0 +1,39 @@
+"""Store missing Big Five scores and trait scores as SQL NULL, not JSON null
+
+Revision ID: 0e6a2c9d4f71
+Revises: 6f3c2a8e9b14
+Create Date: 2026-10-19 19:12:40.518227
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0e6a2c9d4f71"
+down_revision: Union[str, None] = "6f3c2a8e9b14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    ("big_five_traits", "big_five_data"),
+    ("trait_predictions", "trait_scores"),
+)
+
+
+def upgrade() -> None:
+    # Rows written before the columns were declared with none_as_null
+    postgres = op.get_bind().dialect.name == "postgresql"
+    for table, column in COLUMNS:
+        if postgres:
+            condition = f"jsonb_typeof({column}) = 'null'"
+        else:
+            condition = f"{column} = 'null'"
+        op.execute(f"UPDATE {table} SET {column} = NULL WHERE {condition}")
+
+
+def downgrade() -> None:
+    # SQL NULL is also what the earlier revisions expect for missing scores
+    pass
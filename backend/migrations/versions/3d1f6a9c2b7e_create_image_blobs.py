@@ -0,0 +1,52 @@
+"""Create image blobs for content-addressed food images
+
+Revision ID: 3d1f6a9c2b7e
+Revises: f27d89c1c1fa
+Create Date: 2026-10-19 09:12:03.418227
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3d1f6a9c2b7e"
+down_revision: Union[str, None] = "f27d89c1c1fa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "image_blobs",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("storage_key", sa.String(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.add_column(
+        "food_images", sa.Column("blob_hash", sa.String(length=64), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_food_images_blob_hash"), "food_images", ["blob_hash"], unique=False
+    )
+    op.create_foreign_key(
+        "fk_food_images_blob_hash",
+        "food_images",
+        "image_blobs",
+        ["blob_hash"],
+        ["hash"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_food_images_blob_hash", "food_images", type_="foreignkey")
+    op.drop_index(op.f("ix_food_images_blob_hash"), table_name="food_images")
+    op.drop_column("food_images", "blob_hash")
+    op.drop_table("image_blobs")
@@ -0,0 +1,41 @@
+"""Make (user_id, behavior_id) unique in user_behaviors
+
+Revision ID: 5b8e0f3a6c21
+Revises: a41c7d2e9f10
+Create Date: 2026-10-19 13:05:44.218604
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8e0f3a6c21"
+down_revision: Union[str, None] = "a41c7d2e9f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of any duplicate pair so the constraint can be added
+    op.execute(
+        """
+        DELETE FROM user_behaviors
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM user_behaviors GROUP BY user_id, behavior_id
+        )
+        """
+    )
+    op.create_unique_constraint(
+        "uq_user_behaviors_user_behavior",
+        "user_behaviors",
+        ["user_id", "behavior_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_user_behaviors_user_behavior", "user_behaviors", type_="unique"
+    )
@@ -0,0 +1,58 @@
+"""Cache trait-service predictions and count trait resolutions per day
+
+Revision ID: 6f3c2a8e9b14
+Revises: e4b8d1f62a93
+Create Date: 2026-10-19 18:22:15.640913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6f3c2a8e9b14"
+down_revision: Union[str, None] = "e4b8d1f62a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trait_predictions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("text_hash", sa.String(length=64), nullable=False),
+        sa.Column("dominant_trait", sa.String(), nullable=False),
+        sa.Column(
+            "trait_scores",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "text_hash", name="uq_trait_predictions_user_text"
+        ),
+    )
+    op.create_index(
+        op.f("ix_trait_predictions_id"), "trait_predictions", ["id"], unique=False
+    )
+    op.create_table(
+        "trait_resolution_days",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("source", sa.String(length=16), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "source"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("trait_resolution_days")
+    op.drop_index(op.f("ix_trait_predictions_id"), table_name="trait_predictions")
+    op.drop_table("trait_predictions")
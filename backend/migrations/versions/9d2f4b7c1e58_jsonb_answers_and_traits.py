@@ -0,0 +1,90 @@
+"""Store answers and Big Five data as JSONB with GIN indexes
+
+Revision ID: 9d2f4b7c1e58
+Revises: 5b8e0f3a6c21
+Create Date: 2026-10-19 14:21:09.613370
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d2f4b7c1e58"
+down_revision: Union[str, None] = "5b8e0f3a6c21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRAITS = (
+    "extraversion",
+    "agreeableness",
+    "conscientiousness",
+    "neuroticism",
+    "openness",
+)
+
+
+def upgrade() -> None:
+    # JSONB and its indexes are Postgres features; other databases keep JSON
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.alter_column(
+        "question_answers",
+        "question_data",
+        type_=postgresql.JSONB(),
+        postgresql_using="question_data::jsonb",
+    )
+    op.alter_column(
+        "big_five_traits",
+        "big_five_data",
+        type_=postgresql.JSONB(),
+        postgresql_using="big_five_data::jsonb",
+    )
+    op.create_index(
+        "ix_question_answers_question_data",
+        "question_answers",
+        ["question_data"],
+        postgresql_using="gin",
+        postgresql_ops={"question_data": "jsonb_path_ops"},
+    )
+    op.create_index(
+        "ix_big_five_traits_big_five_data",
+        "big_five_traits",
+        ["big_five_data"],
+        postgresql_using="gin",
+        postgresql_ops={"big_five_data": "jsonb_path_ops"},
+    )
+    # GIN cannot serve range predicates; these match the
+    # CAST(big_five_data ->> 'trait' AS FLOAT) expressions the query API emits
+    for trait in TRAITS:
+        op.execute(
+            f"CREATE INDEX ix_big_five_traits_{trait} ON big_five_traits "
+            f"((CAST(big_five_data ->> '{trait}' AS FLOAT)))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for trait in TRAITS:
+        op.drop_index(f"ix_big_five_traits_{trait}", table_name="big_five_traits")
+    op.drop_index("ix_big_five_traits_big_five_data", table_name="big_five_traits")
+    op.drop_index("ix_question_answers_question_data", table_name="question_answers")
+    op.alter_column(
+        "big_five_traits",
+        "big_five_data",
+        type_=sa.JSON(),
+        postgresql_using="big_five_data::json",
+    )
+    op.alter_column(
+        "question_answers",
+        "question_data",
+        type_=sa.JSON(),
+        postgresql_using="question_data::json",
+    )
@@ -0,0 +1,49 @@
+"""Add catalog versions and record the catalog version on answers
+
+Revision ID: a41c7d2e9f10
+Revises: 3d1f6a9c2b7e
+Create Date: 2026-10-19 11:40:27.905113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a41c7d2e9f10"
+down_revision: Union[str, None] = "3d1f6a9c2b7e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_versions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.String(length=64), nullable=False),
+        sa.Column("document", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("version"),
+    )
+    op.create_index(
+        op.f("ix_catalog_versions_id"), "catalog_versions", ["id"], unique=False
+    )
+    op.add_column(
+        "question_answers",
+        sa.Column("catalog_version", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "user_behaviors",
+        sa.Column("catalog_version", sa.String(length=64), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_behaviors", "catalog_version")
+    op.drop_column("question_answers", "catalog_version")
+    op.drop_index(op.f("ix_catalog_versions_id"), table_name="catalog_versions")
+    op.drop_table("catalog_versions")
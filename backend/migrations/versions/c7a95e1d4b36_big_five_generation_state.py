@@ -0,0 +1,56 @@
+"""Track Big Five generation status, failures and retry time
+
+Revision ID: c7a95e1d4b36
+Revises: 9d2f4b7c1e58
+Create Date: 2026-10-19 15:48:52.377120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7a95e1d4b36"
+down_revision: Union[str, None] = "9d2f4b7c1e58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "big_five_traits",
+        sa.Column(
+            "status", sa.String(length=16), nullable=False, server_default="ready"
+        ),
+    )
+    op.add_column(
+        "big_five_traits",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("big_five_traits", sa.Column("last_error", sa.String(), nullable=True))
+    op.add_column(
+        "big_five_traits", sa.Column("next_attempt_at", sa.DateTime(), nullable=True)
+    )
+    op.add_column(
+        "big_five_traits", sa.Column("updated_at", sa.DateTime(), nullable=True)
+    )
+    # Failed generations have no scores yet
+    op.alter_column("big_five_traits", "big_five_data", nullable=True)
+    op.alter_column("big_five_traits", "max_value", nullable=True)
+
+
+def downgrade() -> None:
+    op.execute(
+        "DELETE FROM big_five_traits "
+        "WHERE big_five_data IS NULL OR max_value IS NULL"
+    )
+    op.alter_column("big_five_traits", "max_value", nullable=False)
+    op.alter_column("big_five_traits", "big_five_data", nullable=False)
+    op.drop_column("big_five_traits", "updated_at")
+    op.drop_column("big_five_traits", "next_attempt_at")
+    op.drop_column("big_five_traits", "last_error")
+    op.drop_column("big_five_traits", "attempts")
+    op.drop_column("big_five_traits", "status")
@@ -0,0 +1,37 @@
+"""Store the feature-text fingerprint Big Five scores were computed from
+
+Revision ID: e4b8d1f62a93
+Revises: c7a95e1d4b36
+Create Date: 2026-10-19 17:06:41.902385
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b8d1f62a93"
+down_revision: Union[str, None] = "c7a95e1d4b36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "big_five_traits",
+        sa.Column("input_fingerprint", sa.String(length=64), nullable=True),
+    )
+    op.create_index(
+        "ix_big_five_traits_status_updated_at",
+        "big_five_traits",
+        ["status", "updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_big_five_traits_status_updated_at", table_name="big_five_traits")
+    op.drop_column("big_five_traits", "input_fingerprint")
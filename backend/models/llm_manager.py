@@ -182,12 +182,16 @@
 #     }
 
 import os
+import json
 import time
 import logging
 from typing import Dict, Optional, List
 
 import requests
 
+from app.utils.instrumentation import UPSTREAM_FIRST_TOKEN_SECONDS, observe_upstream
+from app.utils.tracing import client_span
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -281,9 +285,10 @@ def wait_until_models_ready():
 #         logger.error(f"Error calling remote GPU LLM: {e}")
 #         return "Tip: Try eating slowly and paying attention to each bite today."
 
-def generate_tip(trait: str, behavior_text: str) -> str:
-    wait_until_models_ready()
+FALLBACK_TIP = "Tip: Try eating slowly and paying attention to each bite today."
 
+
+def _tip_request(trait: str, behavior_text: str, stream: bool = False) -> dict:
     prompt = f"""
     ### Instruction:
     Generate a short, personalized mindful eating tip based on the user's dominant trait and selected eating behavior.
@@ -295,21 +300,33 @@ def generate_tip(trait: str, behavior_text: str) -> str:
     ### Response:
     Tip:
     """.strip()
+    request = {
+        "prompt": prompt,
+        "max_new_tokens": 80,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "repetition_penalty": 1.1
+    }
+    if stream:
+        request["stream"] = True
+    return request
+
+
+def generate_tip(trait: str, behavior_text: str) -> str:
+    wait_until_models_ready()
 
     try:
-        response = requests.post(
-            TIP_LLM_URL,
-            json={
-                "prompt": prompt,
-                "max_new_tokens": 80,
-                "temperature": 0.7,
-                "top_p": 0.9,
-                "repetition_penalty": 1.1
-            },
-            timeout=60
-        )
-        response.raise_for_status()
-        result = response.json().get("response", "").strip()
+        with observe_upstream("tip_llm"), client_span(
+            "POST tip_llm", {"http.request.method": "POST", "url.full": TIP_LLM_URL}
+        ) as trace_headers:
+            response = requests.post(
+                TIP_LLM_URL,
+                json=_tip_request(trait, behavior_text),
+                headers=trace_headers,
+                timeout=60
+            )
+            response.raise_for_status()
+            result = response.json().get("response", "").strip()
 
         # === Cleaning exactly like Colab ===
         if "Tip:" in result:
@@ -323,7 +340,133 @@ def generate_tip(trait: str, behavior_text: str) -> str:
 
     except Exception as e:
         logger.error(f"Error calling remote GPU LLM: {e}")
-        return "Tip: Try eating slowly and paying attention to each bite today."
+        return FALLBACK_TIP
+
+
+class TipExtractor:
+    """
+    The cleaning of `generate_tip`, applied to a streamed reply as it arrives.
+
+    `feed` each text delta, then call `finish`. Joined, the returned pieces
+    equal what `generate_tip` returns for the whole reply. Text after the first
+    "Tip:" is returned as soon as it cannot be part of a "###" marker or of
+    trailing whitespace. A reply without any "Tip:" is held back until it ends,
+    because `generate_tip` keeps only the text after a "Tip:" found anywhere.
+    """
+
+    def __init__(self):
+        self._preamble = ""  # The reply until "Tip:" is seen, then None
+        self._body = ""  # The reply after the first "Tip:"
+        self._emitted = 0  # Characters of the cleaned body returned so far
+        self._started = False
+        self.done = False  # "###" was reached; later text is ignored
+
+    def feed(self, delta: str) -> str:
+        if self.done or not delta:
+            return ""
+        if self._preamble is not None:
+            self._preamble += delta
+            if "Tip:" not in self._preamble:
+                return ""
+            delta = self._preamble.split("Tip:", 1)[1]
+            self._preamble = None
+        self._body += delta
+
+        if "###" in self._body:
+            self.done = True
+            return self._emit(self._body.split("###")[0].strip())
+        # A trailing "#" or "##" may start a marker; trailing space may be cut
+        return self._emit(self._body.lstrip().rstrip("#").rstrip())
+
+    def finish(self) -> str:
+        if self._preamble is not None:
+            self._body = self._preamble
+        if not self.done:
+            self.done = True
+            return self._emit(self._body.split("###")[0].strip(), final=True)
+        return self._emit("", final=True) if not self._started else ""
+
+    def _emit(self, cleaned: str, final: bool = False) -> str:
+        piece = cleaned[self._emitted :]
+        self._emitted = max(self._emitted, len(cleaned))
+        if not self._started and (piece or final or self.done):
+            self._started = True
+            piece = "Tip: " + piece
+        return piece
+
+
+def _stream_deltas(response):
+    """Text deltas of a streamed LLM reply, or its whole text if not streamed."""
+    if response.headers.get("content-type", "").startswith("application/json"):
+        # A server without streaming support answers as for generate_tip
+        yield response.json().get("response", "")
+        return
+    # NDJSON is UTF-8, and without a charset requests would yield bytes
+    response.encoding = response.encoding or "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        line = (line or "").strip()
+        if line.startswith("data:"):
+            line = line[5:].strip()
+        if not line:
+            continue
+        chunk = json.loads(line)
+        yield chunk.get("response") or ""
+        if chunk.get("done"):
+            return
+
+
+def stream_tip(trait: str, behavior_text: str):
+    """
+    Stream a tip from the remote LLM as raw text deltas.
+
+    Sends the `generate_tip` request with `"stream": true`; the server answers
+    with newline-delimited JSON chunks `{"response": "<delta>", "done": false}`
+    (the Ollama format; `data: ` prefixes of SSE framing are ignored), ending
+    with `"done": true`. A plain `application/json` reply is taken as a single
+    delta. Run the deltas through `TipExtractor` for the cleaned tip. If the
+    call fails before any text arrived, yields `FALLBACK_TIP` instead, like
+    `generate_tip`; a failure mid-stream is raised.
+
+    Yields:
+        str: Raw text deltas in arrival order.
+    """
+    wait_until_models_ready()
+
+    received = False
+    started = time.perf_counter()
+    try:
+        with observe_upstream("tip_llm"), client_span(
+            "POST tip_llm",
+            {"http.request.method": "POST", "url.full": TIP_LLM_URL, "stream": True},
+        ) as trace_headers:
+            with requests.post(
+                TIP_LLM_URL,
+                json=_tip_request(trait, behavior_text, stream=True),
+                headers=trace_headers,
+                timeout=60,
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                for delta in _stream_deltas(response):
+                    if not delta:
+                        continue
+                    if not received:
+                        received = True
+                        UPSTREAM_FIRST_TOKEN_SECONDS.observe(
+                            time.perf_counter() - started, service="tip_llm"
+                        )
+                    try:
+                        yield delta
+                    except GeneratorExit:
+                        # The caller stopped early; closing the response lets
+                        # the server stop generating
+                        return
+    except Exception as e:
+        if received:
+            logger.error(f"Remote GPU LLM stream failed mid-reply: {e}")
+            raise
+        logger.error(f"Error calling remote GPU LLM: {e}")
+        yield FALLBACK_TIP
 
 
 def predict_dominant_trait(
@@ -339,9 +482,15 @@ def predict_dominant_trait(
         payload["raw_traits"] = raw_traits
 
     try:
-        resp = requests.post(TRAIT_SERVER_URL, json=payload, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
+        with observe_upstream("trait_service"), client_span(
+            "POST trait_service",
+            {"http.request.method": "POST", "url.full": TRAIT_SERVER_URL},
+        ) as trace_headers:
+            resp = requests.post(
+                TRAIT_SERVER_URL, json=payload, headers=trace_headers, timeout=30
+            )
+            resp.raise_for_status()
+            data = resp.json()
 
         dominant = data.get("dominant_trait", "Conscientiousness")
         scores = data.get("trait_scores", {})
@@ -0,0 +1,113 @@
+"""
+Export and publish question/behavior catalogs.
+
+Usage (from the backend directory):
+    python -m scripts.catalog_tool export catalog.json [--source env]
+    python -m scripts.catalog_tool publish catalog.json
+
+`export` writes the catalog loaded from a source (the env variables by default)
+as a JSON document, ready to be edited and served with CATALOG_SOURCE=file.
+`publish` validates a JSON/YAML document and stores it as a new version in
+`catalog_versions`, where workers running with CATALOG_SOURCE=database pick it
+up on their next poll or admin reload.
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from app.database import SessionLocal
+from app.models import CatalogVersion
+from app.services.catalog import CatalogSnapshot, _load_document, load_snapshot
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def export_catalog(path, source="env"):
+    """
+    Write the catalog loaded from `source` to a JSON file.
+
+    Returns:
+        str: The exported catalog version.
+    """
+    snapshot = load_snapshot(source)
+    document = {
+        "questions": list(snapshot.questions),
+        "behaviors": list(snapshot.behaviors),
+    }
+    Path(path).write_text(
+        json.dumps(document, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+    logger.info(f"Exported catalog {snapshot.version} to {path}")
+    return snapshot.version
+
+
+def publish_catalog(path):
+    """
+    Store the catalog document at `path` as the newest database version.
+
+    The document is compiled first, so a catalog with an unknown question type
+    is rejected before any worker can load it.
+
+    Returns:
+        str: The published catalog version.
+    """
+    document = _load_document(Path(path))
+    snapshot = CatalogSnapshot(
+        document.get("questions", []), document.get("behaviors", []), "file"
+    )
+
+    db = SessionLocal()
+    try:
+        existing = (
+            db.query(CatalogVersion)
+            .filter(CatalogVersion.version == snapshot.version)
+            .first()
+        )
+        latest_id = (
+            db.query(CatalogVersion.id).order_by(CatalogVersion.id.desc()).scalar()
+        )
+        if existing and existing.id == latest_id:
+            logger.info(f"Catalog {snapshot.version} is already the latest version")
+            return snapshot.version
+        if existing:
+            # Re-publishing an older version (a rollback) makes it the newest row
+            db.delete(existing)
+            db.flush()
+        db.add(
+            CatalogVersion(
+                version=snapshot.version,
+                document={
+                    "questions": list(snapshot.questions),
+                    "behaviors": list(snapshot.behaviors),
+                },
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info(f"Published catalog {snapshot.version} from {path}")
+    return snapshot.version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write a catalog to JSON")
+    export_parser.add_argument("path")
+    export_parser.add_argument(
+        "--source", default="env", choices=["env", "file", "database"]
+    )
+    publish_parser = commands.add_parser("publish", help="Publish a catalog file")
+    publish_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_catalog(args.path, args.source)
+    else:
+        publish_catalog(args.path)
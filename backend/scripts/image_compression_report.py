@@ -0,0 +1,101 @@
+"""
+Report how much storage the upload processing stage saves on a sample corpus.
+
+Usage (from the backend directory):
+    python -m scripts.image_compression_report <directory> [--format JPEG] [--quality 82] [--max-dimension 2048]
+
+Every image file under the directory is run through the same `process_image`
+step used for food update uploads, and the original and processed sizes are
+compared. Nothing is written to disk.
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from app.services.image_processing import (
+    IMAGE_MAX_DIMENSION,
+    IMAGE_QUALITY,
+    IMAGE_FORMAT,
+    process_image,
+)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".heic", ".bmp", ".tif", ".tiff"}
+
+
+def _process_file(path, image_format, max_dimension, quality):
+    data = Path(path).read_bytes()
+    try:
+        processed, _, _ = process_image(data, image_format, max_dimension, quality)
+    except ValueError:
+        return path, len(data), None
+    return path, len(data), len(processed)
+
+
+def human_size(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image compression savings report")
+    parser.add_argument("directory")
+    parser.add_argument("--format", default=IMAGE_FORMAT)
+    parser.add_argument("--quality", type=int, default=IMAGE_QUALITY)
+    parser.add_argument("--max-dimension", type=int, default=IMAGE_MAX_DIMENSION)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    files = sorted(
+        str(path)
+        for path in Path(args.directory).rglob("*")
+        if path.suffix.lower() in IMAGE_SUFFIXES
+    )
+    if not files:
+        print(f"No images found under {args.directory}")
+        return
+
+    image_format = args.format.upper()
+    start = time.perf_counter()
+    with ProcessPoolExecutor() as pool:
+        results = list(
+            pool.map(
+                _process_file,
+                files,
+                [image_format] * len(files),
+                [args.max_dimension] * len(files),
+                [args.quality] * len(files),
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    original_total = stored_total = skipped = 0
+    for path, original, stored in results:
+        if stored is None:
+            skipped += 1
+            continue
+        original_total += original
+        stored_total += stored
+        if args.verbose:
+            print(f"{human_size(original):>10} -> {human_size(stored):>10}  {path}")
+
+    processed = len(results) - skipped
+    saved = original_total - stored_total
+    print(
+        f"Settings: format={image_format} quality={args.quality} "
+        f"max_dimension={args.max_dimension}"
+    )
+    print(f"Images processed: {processed} (skipped {skipped} undecodable)")
+    print(f"Original total:   {human_size(original_total)}")
+    print(f"Stored total:     {human_size(stored_total)}")
+    if original_total:
+        print(f"Saved:            {human_size(saved)} ({saved / original_total:.1%})")
+        print(f"Mean per image:   {human_size(stored_total / max(processed, 1))}")
+    print(f"Processing time:  {elapsed:.2f}s ({processed / elapsed:.1f} images/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Show which SQL statements dominate database time on a running server.
+
+Usage (from the backend directory):
+    python -m scripts.query_report [--url http://localhost:8000]
+        [--route /tips/get-user-tips] [--sort total|mean|p95|max|calls|rows]
+        [--limit 20] [--tables user_goals,user_tips] [--slow] [--verbose]
+
+Reads /admin/queries (and /admin/queries/slow with --slow) with the
+ADMIN_SECRET_KEY from the environment. Statistics cover the server process
+since it started or since the last `DELETE /admin/queries`.
+"""
+
+import argparse
+import os
+import sys
+
+import requests
+
+
+def fetch(url, path, admin_key, **params):
+    response = requests.get(
+        f"{url.rstrip('/')}/admin{path}",
+        params={key: value for key, value in params.items() if value is not None},
+        headers={"X-Admin-Key": admin_key},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()["data"]
+
+
+def print_fingerprints(fingerprints, verbose):
+    print(
+        f"{'fingerprint':<17}{'calls':>8}{'total ms':>11}{'mean ms':>10}"
+        f"{'p95 ms':>10}{'max ms':>10}{'rows':>9}{'share':>7}  tables"
+    )
+    for item in fingerprints:
+        print(
+            f"{item['fingerprint']:<17}{item['calls']:>8}{item['total_ms']:>11.1f}"
+            f"{item['mean_ms']:>10.2f}{item['p95_ms']:>10.2f}{item['max_ms']:>10.2f}"
+            f"{item['rows']:>9}{item['share']:>7.1%}  {','.join(item['tables'])}"
+        )
+        if verbose:
+            print(f"    {item['statement'][:300]}")
+
+
+def print_routes(routes):
+    print(f"{'route':<44}{'statements':>11}{'db ms':>11}  top fingerprints (ms)")
+    for entry in routes:
+        top = ", ".join(
+            f"{item['fingerprint']} ({item['total_ms']:.0f})"
+            for item in entry["top"][:3]
+        )
+        print(
+            f"{entry['route']:<44}{entry['calls']:>11}"
+            f"{entry['total_ms']:>11.1f}  {top}"
+        )
+
+
+def print_slow(entries):
+    for entry in entries:
+        print(
+            f"{entry['at']}  {entry['duration_ms']:.0f} ms  {entry['route']}  "
+            f"{entry['fingerprint']}\n    {entry['statement'][:300]}"
+        )
+        for line in entry["plan"] or ["(plan pending)"]:
+            print(f"      {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQL fingerprint report")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--route")
+    parser.add_argument("--sort", default="total")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--tables", help="Only fingerprints touching one of these tables"
+    )
+    parser.add_argument("--slow", action="store_true", help="Show the slow-query log")
+    parser.add_argument("--verbose", action="store_true", help="Print statements")
+    args = parser.parse_args()
+
+    admin_key = os.getenv("ADMIN_SECRET_KEY")
+    if not admin_key:
+        sys.exit("ADMIN_SECRET_KEY is not set")
+
+    if args.slow:
+        print_slow(fetch(args.url, "/queries/slow", admin_key, limit=args.limit))
+        sys.exit(0)
+
+    report = fetch(
+        args.url,
+        "/queries",
+        admin_key,
+        route=args.route,
+        sort=args.sort,
+        limit=500 if args.tables else args.limit,
+    )
+    fingerprints = report["fingerprints"]
+    if args.tables:
+        wanted = set(args.tables.split(","))
+        fingerprints = [f for f in fingerprints if wanted & set(f["tables"])]
+        fingerprints = fingerprints[: args.limit]
+
+    print(
+        f"{report['statements']} statements, {report['db_ms']:.0f} ms of database time "
+        f"since {report['since']}"
+        + (f" on {args.route}" if args.route else "")
+    )
+    print()
+    print_fingerprints(fingerprints, args.verbose)
+    if not args.route:
+        print()
+        print_routes(report["routes"])
@@ -0,0 +1,210 @@
+"""
+Recompute Big Five traits for every user, e.g. after a model update.
+
+Usage (from the backend directory):
+    python -m scripts.recompute_big_five [--chunk-size 500] [--concurrency 8]
+        [--checkpoint big_five_recompute.json] [--resume] [--only-missing]
+        [--only-stale] [--skip-unchanged] [--limit N]
+
+Users are streamed in id order. Each chunk has its answers and behaviors
+loaded in bulk and its prompts built up front. Inference requests go out with
+bounded concurrency, and the results are written with one upsert per chunk.
+After every committed chunk the last user id is saved to the checkpoint file,
+so `--resume` continues where a stopped run left off.
+
+`--skip-unchanged` leaves users alone whose inputs still match the fingerprint
+stored with their scores; use it to catch up on changed users without paying
+for a full recompute. Omit it after a model update, when every user needs new
+scores regardless of their inputs.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import exists, select
+
+from app.database import SessionLocal
+from app.models import BigFiveTraits, User
+from app.models.big_five_traits import STATUS_STALE
+from app.services.big_five_generator import refresh_big_five_batch
+from app.services.model_output import parse_stats
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(path, state):
+    """Write the checkpoint atomically so a crash never leaves it half written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def stream_user_chunks(db, query, chunk_size):
+    """
+    Yield lists of user ids from `query` (ordered by id), `chunk_size` at a time.
+
+    On Postgres this is a server-side cursor, so rows arrive as they are
+    consumed. SQLite keeps a read lock while a cursor is open, which would block
+    the upserts, so there the users are paged by id instead.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        result = db.execute(query.execution_options(yield_per=chunk_size))
+        for partition in result.scalars().partitions():
+            yield list(partition)
+        return
+
+    last_user_id = None
+    while True:
+        page = query if last_user_id is None else query.where(User.id > last_user_id)
+        user_ids = db.execute(page.limit(chunk_size)).scalars().all()
+        db.rollback()  # Release the read lock before the chunk is written
+        if not user_ids:
+            return
+        last_user_id = user_ids[-1]
+        yield user_ids
+
+
+def recompute_big_five(
+    chunk_size=500,
+    concurrency=8,
+    checkpoint_path="big_five_recompute.json",
+    resume=False,
+    only_missing=False,
+    only_stale=False,
+    skip_unchanged=False,
+    limit=None,
+):
+    """
+    Recompute and store Big Five traits for all (or only untraited) users.
+
+    Args:
+        chunk_size (int): Users loaded, inferred and upserted together.
+        concurrency (int): Inference requests in flight at once.
+        checkpoint_path (str): File recording progress after each chunk.
+        resume (bool): Continue after the user id saved in the checkpoint.
+        only_missing (bool): Skip users that already have traits.
+        only_stale (bool): Only users whose traits are marked stale.
+        skip_unchanged (bool): Do not recompute users whose inputs match the
+            fingerprint stored with their scores.
+        limit (int): Stop after this many users.
+
+    Returns:
+        dict: The final checkpoint state (counts and last user id).
+    """
+    state = {
+        "last_user_id": 0,
+        "processed": 0,
+        "saved": 0,
+        "skipped": 0,
+        "failed": 0,
+    }
+    if resume:
+        saved_state = read_checkpoint(checkpoint_path)
+        if saved_state:
+            state.update(saved_state)
+            logger.info(f"Resuming after user {state['last_user_id']}")
+
+    query = select(User.id).where(User.id > state["last_user_id"]).order_by(User.id)
+    if only_missing:
+        query = query.where(~exists().where(BigFiveTraits.user_id == User.id))
+    if only_stale:
+        query = query.where(
+            exists().where(
+                BigFiveTraits.user_id == User.id,
+                BigFiveTraits.status == STATUS_STALE,
+            )
+        )
+
+    reader = SessionLocal()
+    writer = SessionLocal()
+    started = time.perf_counter()
+    run_processed = 0
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="big-five"
+        ) as pool:
+            for user_ids in stream_user_chunks(reader, query, chunk_size):
+                if limit is not None:
+                    user_ids = user_ids[: limit - run_processed]
+                if not user_ids:
+                    break
+
+                # One input query per chunk; unchanged users skipped if asked
+                counts = refresh_big_five_batch(
+                    writer, user_ids, map_func=pool.map, skip_unchanged=skip_unchanged
+                )
+                writer.commit()
+
+                run_processed += len(user_ids)
+                state["last_user_id"] = user_ids[-1]
+                state["processed"] += len(user_ids)
+                state["saved"] += counts["recomputed"]
+                state["skipped"] += counts["skipped"]
+                state["failed"] += counts["failed"]
+                write_checkpoint(checkpoint_path, state)
+
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"{state['processed']} users processed (last id "
+                    f"{state['last_user_id']}), {run_processed / elapsed:.1f} users/sec"
+                )
+                if limit is not None and run_processed >= limit:
+                    break
+    finally:
+        reader.close()
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Done: {run_processed} users in {elapsed:.1f}s "
+        f"({run_processed / elapsed if elapsed else 0:.1f} users/sec), "
+        f"{state['saved']} saved, {state['skipped']} unchanged, "
+        f"{state['failed']} failed in total"
+    )
+    stats = parse_stats()
+    if stats["total"]:
+        logger.info(
+            f"Model output failure rate {stats['failure_rate']:.1%}: {stats['counts']}"
+        )
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute Big Five traits")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--checkpoint", default="big_five_recompute.json")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--only-missing", action="store_true")
+    parser.add_argument("--only-stale", action="store_true")
+    parser.add_argument("--skip-unchanged", action="store_true")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    recompute_big_five(
+        chunk_size=args.chunk_size,
+        concurrency=args.concurrency,
+        checkpoint_path=args.checkpoint,
+        resume=args.resume,
+        only_missing=args.only_missing,
+        only_stale=args.only_stale,
+        skip_unchanged=args.skip_unchanged,
+        limit=args.limit,
+    )
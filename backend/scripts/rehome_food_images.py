@@ -0,0 +1,106 @@
+"""
+Move food images saved under the old flat layout into the content-addressed blob store.
+
+Usage (from the backend directory):
+    python -m scripts.rehome_food_images [--batch-size 200] [--delete-source] [--dry-run]
+
+Each legacy `FoodImage` row (one with no `blob_hash`) has its file read, stored
+through `store_blob` (which deduplicates identical photos), and repointed at the
+blob's storage key. Rows are committed in batches so the tool can be stopped and
+re-run safely; already migrated rows are skipped.
+"""
+
+import argparse
+import logging
+import os
+
+from app.database import SessionLocal
+from app.models import FoodImage
+from app.storage.blobs import store_blob
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def rehome_food_images(batch_size=200, delete_source=False, dry_run=False):
+    """
+    Migrate legacy food images into the blob store.
+
+    Args:
+        batch_size (int): Number of rows to migrate per transaction.
+        delete_source (bool): Remove the old flat file after its batch commits.
+        dry_run (bool): Only report what would be migrated.
+
+    Returns:
+        dict: Counts of migrated, missing and failed images.
+    """
+    stats = {"migrated": 0, "missing": 0, "failed": 0}
+    db = SessionLocal()
+    last_id = 0
+    try:
+        while True:
+            batch = (
+                db.query(FoodImage)
+                .filter(FoodImage.blob_hash.is_(None), FoodImage.id > last_id)
+                .order_by(FoodImage.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            migrated_sources = []
+            for image in batch:
+                source_path = image.image_path
+                if not os.path.isfile(source_path):
+                    logger.warning(f"FoodImage {image.id}: missing file {source_path}")
+                    stats["missing"] += 1
+                    continue
+                if dry_run:
+                    stats["migrated"] += 1
+                    continue
+                try:
+                    # A savepoint per image: a failed read or write rolls back
+                    # only that image's blob reference, not the whole batch
+                    with db.begin_nested():
+                        with open(source_path, "rb") as file:
+                            blob = store_blob(db, file.read())
+                        image.blob_hash = blob.hash
+                        image.image_path = blob.storage_key
+                    migrated_sources.append(source_path)
+                    stats["migrated"] += 1
+                except Exception as e:
+                    logger.error(f"FoodImage {image.id}: failed to migrate: {e}")
+                    stats["failed"] += 1
+
+            if dry_run:
+                continue
+            db.commit()
+
+            # Only drop the originals once the rows pointing at the blobs are durable
+            if delete_source:
+                for source_path in migrated_sources:
+                    try:
+                        os.remove(source_path)
+                    except OSError as e:
+                        logger.warning(f"Could not remove {source_path}: {e}")
+
+            logger.info(f"Migrated up to FoodImage {last_id}: {stats}")
+    finally:
+        db.close()
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--delete-source", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    result = rehome_food_images(args.batch_size, args.delete_source, args.dry_run)
+    logger.info(f"Done: {result}")